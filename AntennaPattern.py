@@ -0,0 +1,245 @@
+"""
+AntennaPattern.py
+功能：
+1. 天线方向图：ITU-R S.1528（非静止轨道卫星天线，建议1.2）、ITU-R S.465（地球站天线参考方向图，主瓣按 AP8 抛物近似）、
+   均匀照射圆口面（Bessel，[2J1(u)/u]^2）和相控阵单元 cos^n 扫描滚降。
+2. 方向图在均匀离轴角网格上预计算为 GainTable（默认 0.01° 间隔），查表时按网格下标线性插值，
+   10^6 个离轴角的查表约 30 ms（方向图零点和跳变处有插值误差），可用于多波束覆盖区研究；InterferenceEngine 的 pattern 参数可直接使用 GainTable.relative_gain。
+3. 由几何得到的离轴角/扫描角推导损耗，代替手工输入的 beam_edge_loss / scan_loss：
+   - input_params["beam_pattern"] = {"type": "S.1528", "max_gain": 40, "half_beamwidth": 1.5} 时，
+     beam_edge_loss = 最大增益 - 终端离轴角处增益；离轴角由卫星链路的终端扫描角与波束指向 beam_scan_angle
+     （及方位角 terminal_azimuth / beam_azimuth）按 off_axis_angle() 计算，也可直接给出 off_axis_angle（度）；
+   - input_params["scan_roll_off"] = n 时，卫星链路 scan_loss = -10*n*log10(cos(扫描角))。
+   方向图描述（字典）按内容缓存对应的 GainTable，相同描述只建表一次。
+
+方向图描述的 "type" 取 PATTERN_TYPES 的键，其余键为对应类的构造参数，如
+{"type": "S.465", "max_gain": 45, "diameter_over_wavelength": 60}
+{"type": "Bessel", "diameter_over_wavelength": 30}
+{"type": "cos^n", "max_gain": 30, "exponent": 1.2}
+
+单位约定：角度为度，增益为 dBi，损耗为 dB。
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+def aperture_gain(diameter_over_wavelength, efficiency=0.65):
+    """圆口面天线最大增益 (dBi)：10*log10(η (π D/λ)^2)"""
+    return 10 * np.log10(efficiency * (np.pi * np.asarray(diameter_over_wavelength, dtype=float)) ** 2)
+
+
+def bessel_j1(x):
+    """
+    一阶 Bessel 函数 J1(x)
+    安装 scipy 时用 scipy.special.j1，否则用积分表示 J1(x) = (1/π)∫cos(τ - x sinτ)dτ（0~π），
+    被积函数周期光滑，梯形公式取 |x| + 40 个点即可达到机器精度
+    """
+    x = np.asarray(x, dtype=float)
+    try:
+        # 按需导入，避免 import LinkCalculator 时加载 scipy
+        from scipy.special import j1
+    except ImportError:  # scipy 为可选依赖，未安装时用积分表示计算 J1
+        j1 = None
+    if j1 is not None:
+        return j1(x)
+    points = int(np.max(np.abs(x), initial=0.0)) + 40
+    tau = (np.arange(points) + 0.5) * np.pi / points
+    result = np.empty(x.shape)
+    flat_x, flat_result = x.ravel(), result.ravel()
+    for start in range(0, flat_x.size, 4096):
+        block = flat_x[start:start + 4096, None]
+        flat_result[start:start + 4096] = np.cos(tau - block * np.sin(tau)).mean(axis=1)
+    return flat_result.reshape(x.shape)
+
+
+class GainTable:
+    """均匀离轴角网格上的增益表，查表时线性插值，超出网格的角度取最后一个网格点，NaN/无穷角度的增益为 NaN"""
+
+    def __init__(self, angles, gain, max_gain):
+        self.angles = angles
+        self.gain_values = gain
+        self.max_gain = float(max_gain)
+        self.resolution = float(angles[1] - angles[0])
+
+    def gain(self, angle):
+        """离轴角 (度) 处的增益 (dBi)"""
+        angle = np.asarray(angle, dtype=float)
+        # 非有限角度不能换算为网格下标，先按 0° 查表，插值后置为 NaN
+        valid = np.isfinite(angle)
+        position = np.minimum(np.abs(np.where(valid, angle, 0.0)) / self.resolution, len(self.angles) - 1)
+        index = np.minimum(position.astype(np.intp), len(self.angles) - 2)
+        fraction = position - index
+        table = self.gain_values
+        return np.where(valid, table[index] * (1 - fraction) + table[index + 1] * fraction, np.nan)
+
+    def relative_gain(self, angle):
+        """相对最大增益的增益 (dB，≤0)，可作为 InterferenceEngine 的 pattern"""
+        return self.gain(angle) - self.max_gain
+
+    def loss(self, angle):
+        """相对最大增益的损耗 (dB，≥0)，即波束边缘损耗 / 扫描损耗"""
+        return self.max_gain - self.gain(angle)
+
+
+class AntennaPattern:
+    """方向图基类：子类给出 max_gain 属性和 gain(angle) 方法（离轴角，度）"""
+
+    def gain(self, angle):
+        raise NotImplementedError
+
+    def relative_gain(self, angle):
+        return self.gain(angle) - self.max_gain
+
+    def loss(self, angle):
+        return self.max_gain - self.gain(angle)
+
+    def table(self, resolution=0.01, max_angle=180.0):
+        """在 0~max_angle 的均匀网格上预计算增益表"""
+        angles = np.linspace(0.0, max_angle, int(round(max_angle / resolution)) + 1)
+        return GainTable(angles, self.gain(angles), self.max_gain)
+
+
+@dataclass
+class S1528Pattern(AntennaPattern):
+    """
+    ITU-R S.1528 建议1.2 卫星天线方向图
+    max_gain: 最大增益 Gm (dBi)；half_beamwidth: 半功率波束宽度的一半 ψb (度)
+    near_sidelobe: 近旁瓣电平 LN (dB，相对主瓣)；far_sidelobe: 远旁瓣电平 LF (dBi)；z: 长短轴比
+    主瓣取 Gm - 3(ψ/ψb)^2，a 取主瓣与近旁瓣连续的值（LN = -20、z = 1 时 a = 2.58，与建议书一致），b = 6.32
+    """
+    max_gain: float
+    half_beamwidth: float
+    near_sidelobe: float = -20.0
+    far_sidelobe: float = 0.0
+    z: float = 1.0
+
+    @classmethod
+    def from_aperture(cls, diameter_over_wavelength, efficiency=0.65, **kwargs):
+        """由口径波长比得到 Gm 和 ψb = sqrt(1200) / (D/λ) / 2"""
+        return cls(float(aperture_gain(diameter_over_wavelength, efficiency)),
+                   math.sqrt(1200) / diameter_over_wavelength / 2, **kwargs)
+
+    def gain(self, angle):
+        psi = np.abs(np.asarray(angle, dtype=float))
+        gm, psi_b, ln, lf = self.max_gain, self.half_beamwidth, self.near_sidelobe, self.far_sidelobe
+        near = gm + ln + 20 * math.log10(self.z)
+        a = math.sqrt((gm - near) / 3)
+        b = 6.32
+        x = gm + ln + 25 * math.log10(b * psi_b)
+        y = b * psi_b * 10 ** (0.04 * (gm + ln - lf))
+        back = max(15 + ln + 0.25 * gm + 5 * math.log10(self.z), 0.0)
+        with np.errstate(divide="ignore"):
+            far = x - 25 * np.log10(psi)
+        return np.select(
+            [psi <= a * psi_b, psi <= 0.5 * b * psi_b, psi <= b * psi_b, psi <= y, psi <= 90],
+            [gm - 3 * (psi / psi_b) ** 2, near, gm + ln, far, lf],
+            back,
+        )
+
+
+@dataclass
+class S465Pattern(AntennaPattern):
+    """
+    ITU-R S.465 地球站天线参考方向图
+    旁瓣包络 32 - 25log(φ)（φmin ≤ φ < 48°），48°~180° 为 -10 dBi；主瓣按 AP8 取 Gmax - 2.5e-3 (D/λ φ)^2，
+    增益取主瓣与旁瓣包络的较大值
+    """
+    max_gain: float
+    diameter_over_wavelength: float
+
+    def gain(self, angle):
+        phi = np.abs(np.asarray(angle, dtype=float))
+        d = self.diameter_over_wavelength
+        phi_min = max(1.0, 100 / d) if d >= 50 else max(2.0, 114 * d ** -1.09)
+        envelope = np.where(phi < 48, 32 - 25 * np.log10(np.maximum(phi, phi_min)), -10.0)
+        main_lobe = self.max_gain - 2.5e-3 * (d * phi) ** 2
+        return np.maximum(main_lobe, np.minimum(envelope, self.max_gain))
+
+
+@dataclass
+class BesselPattern(AntennaPattern):
+    """
+    均匀照射圆口面（抛物面）方向图：G(θ) = Gmax [2 J1(u)/u]^2，u = π (D/λ) sinθ
+    floor: 相对最大增益的最低电平 (dB)，用于截断零点
+    """
+    diameter_over_wavelength: float
+    efficiency: float = 0.65
+    floor: float = -60.0
+
+    @property
+    def max_gain(self):
+        return float(aperture_gain(self.diameter_over_wavelength, self.efficiency))
+
+    def gain(self, angle):
+        u = np.pi * self.diameter_over_wavelength * np.sin(np.radians(np.minimum(np.abs(angle), 90.0)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            field = np.where(u == 0, 1.0, 2 * bessel_j1(u) / u)
+            relative = 20 * np.log10(np.abs(field))
+        return self.max_gain + np.maximum(relative, self.floor)
+
+
+@dataclass
+class CosineRollOff(AntennaPattern):
+    """
+    相控阵扫描滚降：阵列增益随扫描角按单元方向图 cos^n 下降，G(θ) = Gmax + 10 n log10(cosθ)
+    floor: 相对最大增益的最低电平 (dB)，90° 以外取该值
+    """
+    max_gain: float = 0.0
+    exponent: float = 1.2
+    floor: float = -30.0
+
+    def gain(self, angle):
+        cosine = np.cos(np.radians(np.minimum(np.abs(angle), 90.0)))
+        with np.errstate(divide="ignore"):
+            relative = 10 * self.exponent * np.log10(cosine)
+        return self.max_gain + np.maximum(relative, self.floor)
+
+
+PATTERN_TYPES = {
+    "S.1528": S1528Pattern,
+    "S.465": S465Pattern,
+    "Bessel": BesselPattern,
+    "cos^n": CosineRollOff,
+}
+
+
+def build_pattern(spec):
+    """由方向图描述（字典）构造方向图对象"""
+    params = dict(spec)
+    pattern_type = params.pop("type")
+    if pattern_type not in PATTERN_TYPES:
+        raise ValueError(f"不支持的方向图类型: {pattern_type}，可选: {list(PATTERN_TYPES)}")
+    return PATTERN_TYPES[pattern_type](**params)
+
+
+@lru_cache(maxsize=64)
+def _cached_table(items, resolution):
+    return build_pattern(dict(items)).table(resolution)
+
+
+def pattern_table(spec, resolution=0.01):
+    """方向图描述 → GainTable，相同描述和分辨率只建表一次"""
+    if isinstance(spec, (GainTable, AntennaPattern)):
+        return spec if isinstance(spec, GainTable) else spec.table(resolution)
+    return _cached_table(tuple(sorted(spec.items())), resolution)
+
+
+def off_axis_angle(scan_angle, beam_scan_angle, azimuth=0.0, beam_azimuth=0.0):
+    """
+    卫星处终端方向与波束指向之间的夹角 (度)
+    两个方向均以 (相对天底的扫描角, 方位角) 表示：cosθ = cos s1 cos s2 + sin s1 sin s2 cos(φ1 - φ2)
+    """
+    s1, s2 = np.radians(np.asarray(scan_angle, dtype=float)), np.radians(np.asarray(beam_scan_angle, dtype=float))
+    dphi = np.radians(np.asarray(azimuth, dtype=float) - np.asarray(beam_azimuth, dtype=float))
+    cosine = np.cos(s1) * np.cos(s2) + np.sin(s1) * np.sin(s2) * np.cos(dphi)
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def scan_roll_off_loss(scan_angle, exponent):
+    """相控阵扫描损耗 (dB)：-10 n log10(cos(扫描角))"""
+    cosine = np.cos(np.radians(np.asarray(scan_angle, dtype=float)))
+    with np.errstate(divide="ignore"):
+        return -10 * np.asarray(exponent, dtype=float) * np.log10(cosine)
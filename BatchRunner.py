@@ -0,0 +1,443 @@
+"""
+BatchRunner.py
+功能：
+1. 无界面（headless）批量链路预算计算入口，不依赖 customtkinter / tkinter 界面。
+2. 从 CSV（安装 pyarrow 时也支持 Parquet）逐块读取场景行，映射到 PARAM_MAPPING 参数和链路类型，
+   通过 LinkCalculator.perform_calculations_batch 分块计算，并把结果流式写入输出文件。
+3. 输出文件为 .xlsx 时用 ReportWriter.StreamingReportWriter（openpyxl write-only）逐行写出多场景报告，
+   内存占用不随行数增长；报告的结果列按 --link-type（缺省取场景的链路类型或 星-地下行）对应的链路类别选择。
+
+输入列名：
+- PARAM_MAPPING 的参数键（如 satellite_eirp）或中文名（如 卫星EIRP）；
+- 收发端通用键 tx_eirp、rx_antenna_gain、rx_noise_figure、rx_noise_temp（优先于按链路类型选择的参数）；
+- link_type / 链路类型、scenario / 地面场景、los_condition / 链路状态。
+缺省的参数取 PARAM_MAPPING 的默认值；可选参数按 FLAG_DEFAULTS 决定是否启用（列中给出数值即视为启用）。
+
+降雨率气候图：
+--rain-climatology r001.npz 时，含 latitude / longitude（纬度 / 经度）列且未给出 rain_rate 的行，
+按位置从气候图（RainClimatology，内存映射）双线性插值得到降雨率；--rain-model P.618 选用 ITU-R P.618 雨衰模型，
+此时 latitude 列同时作为 P.618 的地面站纬度。
+
+派生列：
+--derive "tx_eirp=P_tx-30+G_ant" 在每块数据上对整列向量化求值一次（SafeMath.safe_eval_array），
+结果作为参数列参与计算。
+
+场景文件：
+--scenario leo_ka.json 时，场景（Scenario，与界面"保存场景"的格式相同）编译一次后作为基准：
+同一链路类型的行中未给出的参数取场景值（代替 PARAM_MAPPING 默认值），场景的启用状态、地面场景/链路状态和
+模型选项（rain_model、beam_pattern 等）一并生效；未给出 --link-type 时使用场景的链路类型。
+
+用法示例：
+python BatchRunner.py scenarios.csv -o results.csv --link-type 星-地下行 --chunk-size 50000
+python BatchRunner.py scenarios.csv -o results.csv --scenario leo_ka.json
+python BatchRunner.py scenarios.csv -o report.xlsx --link-type 星-地下行
+"""
+
+import argparse
+import csv
+import dataclasses
+import os
+import sys
+
+import numpy as np
+
+from LinkCalculator import LinkCalculator, SATELLITE_LINK_TYPES
+from RainClimatology import RainClimatology
+from SafeMath import evaluate, safe_eval_array, expression_names
+from Scenario import (Scenario, LINK_TYPES, DEFAULT_SCENARIO, DEFAULT_LOS_CONDITION, default_value,
+                      assemble_input_params)
+from parameters import PARAM_MAPPING, PARAM_GROUPS, FLAG_DEFAULTS, RESULT_CATEGORIES
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet 为可选功能
+    pyarrow = None
+    pq = None
+
+try:
+    from ReportWriter import StreamingReportWriter
+except ImportError:  # Excel 输出为可选功能（需要 openpyxl）
+    StreamingReportWriter = None
+
+# 非数值列的别名
+COLUMN_ALIASES = {
+    "链路类型": "link_type",
+    "地面场景": "scenario",
+    "链路状态": "los_condition",
+    "纬度": "latitude",
+    "经度": "longitude",
+}
+COLUMN_ALIASES.update({info["ch_name"]: param for param, info in PARAM_MAPPING.items()})
+
+# 结果列顺序：RESULT_CATEGORIES 中出现的键 + 总损耗
+RESULT_KEYS = ["total_loss"]
+for _categories in RESULT_CATEGORIES.values():
+    for _items in _categories.values():
+        for _item in _items:
+            if _item["key"] not in RESULT_KEYS:
+                RESULT_KEYS.append(_item["key"])
+
+
+def normalize_row(row):
+    """把列名（中文名/别名）映射为参数键，并去掉空值"""
+    normalized = {}
+    for column, value in row.items():
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        normalized[COLUMN_ALIASES.get(column.strip(), column.strip())] = value
+    return normalized
+
+
+def parse_numeric_column(values):
+    """把一列字符串/数值转为 float 数组，公式按唯一表达式只求值一次"""
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        pass
+    cache = {}
+    column = np.empty(len(values), dtype=float)
+    for i, value in enumerate(values):
+        if value not in cache:
+            try:
+                cache[value] = float(value)
+            except (TypeError, ValueError):
+                cache[value] = float(evaluate(str(value)))
+        column[i] = cache[value]
+    return column
+
+
+def parse_derived_column(spec):
+    """解析 "name=expression" 形式的派生列定义"""
+    name, sep, expr = spec.partition("=")
+    name = COLUMN_ALIASES.get(name.strip(), name.strip())
+    if not sep or not name or not expr.strip():
+        raise ValueError(f"派生列定义应为 name=expression: {spec}")
+    expression_names(expr)  # 提前检查语法
+    return name, expr.strip()
+
+
+def apply_derived_columns(rows, derived):
+    """对一块数据逐个派生列做一次向量化求值，并写回各行"""
+    for name, expr in derived:
+        variables = {}
+        for variable in expression_names(expr):
+            values = [row.get(variable) for row in rows]
+            if any(value is None for value in values):
+                raise ValueError(f"派生列 {name} 引用的列 {variable} 缺失")
+            variables[variable] = parse_numeric_column(values)
+        column = np.broadcast_to(safe_eval_array(expr, variables), (len(rows),))
+        for row, value in zip(rows, column.tolist()):
+            row[name] = value
+
+
+def build_input_columns(rows, link_type, enabled_flags, rain_climatology=None, base_params=None):
+    """按照 Scenario.assemble_input_params 的规则，把同一链路类型的若干行组装为列式 input_params
+    rain_climatology: RainClimatology，给出时按 latitude / longitude 列为未填 rain_rate 的行查降雨率
+    base_params: 同一链路类型的 CompiledScenario.input_params，给出时作为缺省值（已包含场景的启用状态），
+                 不再使用 PARAM_MAPPING 默认值和 enabled_flags
+    """
+    def column(param, link_param=None):
+        # link_param: 按链路类型选择的参数（如 satellite_eirp），作为通用键 param 的备选
+        link_param = link_param or param
+        fallback = base_params[param] if base_params is not None else default_value(link_param, link_type)
+        return parse_numeric_column([row.get(param, row.get(link_param, fallback)) for row in rows])
+
+    def optional_column(param, disabled_value):
+        if base_params is not None:
+            fallback = base_params[param]
+        else:
+            enabled = enabled_flags.get(param, FLAG_DEFAULTS.get(param, True))
+            fallback = default_value(param, link_type) if enabled else disabled_value
+        return parse_numeric_column([row.get(param, fallback) for row in rows])
+
+    input_params = assemble_input_params(link_type, column, optional_column)
+
+    # 终端位置：P.618 雨衰使用纬度，降雨率气候图按经纬度查表
+    if any("latitude" in row for row in rows):
+        input_params["latitude"] = parse_numeric_column([row.get("latitude", 45) for row in rows])
+    if rain_climatology is not None and "rain_rate" in input_params:
+        missing = np.array(["latitude" in row and "longitude" in row and "rain_rate" not in row for row in rows])
+        if missing.any():
+            longitude = parse_numeric_column([row.get("longitude", 0) for row in rows])
+            input_params["rain_rate"][missing] = rain_climatology.lookup(input_params["latitude"][missing],
+                                                                        longitude[missing])
+    return input_params
+
+
+def iter_row_chunks(path, chunk_size):
+    """按块读取场景行（list[dict]），不把整个输入文件载入内存"""
+    if path.lower().endswith(".parquet"):
+        if pq is None:
+            raise RuntimeError("读取 Parquet 需要安装 pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        chunk = []
+        for row in csv.DictReader(f):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def calculate_chunk(calculator, rows, default_link_type, enabled_flags, derived=(), rain_climatology=None,
+                    rain_model=None, scenario=None):
+    """计算一块场景行，返回与输入行顺序一致的结果字典列表
+    rain_model: 雨衰模型（"P.618" 或 None 表示简化模型），仅对卫星链路生效
+    scenario: CompiledScenario，作为同一链路类型各行的缺省参数和模型选项
+    """
+    rows = [normalize_row(row) for row in rows]
+    results = [None] * len(rows)
+    if derived:
+        apply_derived_columns(rows, derived)
+
+    default_scenario, default_los_condition = DEFAULT_SCENARIO, DEFAULT_LOS_CONDITION
+    if scenario is not None and scenario.link_type not in SATELLITE_LINK_TYPES:
+        default_scenario = scenario.input_params["scenario"]
+        default_los_condition = scenario.input_params["los_condition"]
+
+    # 按 (链路类型, 地面场景, 链路状态) 分组，每组一次向量化计算
+    groups = {}
+    for index, row in enumerate(rows):
+        link_type = row.get("link_type", default_link_type)
+        if link_type in SATELLITE_LINK_TYPES:
+            key = (link_type, None, None)
+        else:
+            key = (link_type, row.get("scenario", default_scenario), row.get("los_condition", default_los_condition))
+        groups.setdefault(key, []).append(index)
+
+    for (link_type, terrestrial_scenario, los_condition), indices in groups.items():
+        if link_type not in PARAM_GROUPS:
+            for index in indices:
+                results[index] = {"error": f"未知链路类型: {link_type}"}
+            continue
+        group_rows = [rows[index] for index in indices]
+        group_scenario = scenario if scenario is not None and scenario.link_type == link_type else None
+        try:
+            input_params = _group_input_params(group_rows, link_type, terrestrial_scenario, los_condition,
+                                               enabled_flags, rain_climatology, rain_model, group_scenario)
+            batch = calculator.perform_calculations_columnar(input_params, link_type)
+        except ValueError:
+            # 某些行超出几何范围或公式非法：退回逐行计算以定位错误行
+            for index, row in zip(indices, group_rows):
+                results[index] = _calculate_single(calculator, row, link_type, terrestrial_scenario, los_condition,
+                                                   enabled_flags, rain_climatology, rain_model, group_scenario)
+            continue
+        for index, result in zip(indices, batch.rows()):
+            result["link_type"] = link_type
+            results[index] = result
+    return results
+
+
+def _group_input_params(rows, link_type, terrestrial_scenario, los_condition, enabled_flags,
+                        rain_climatology=None, rain_model=None, scenario=None):
+    base_params = scenario.input_params if scenario is not None else None
+    input_params = build_input_columns(rows, link_type, enabled_flags, rain_climatology, base_params)
+    if scenario is not None:
+        input_params.update(scenario.options)
+    if terrestrial_scenario is not None:
+        input_params.update({"scenario": terrestrial_scenario, "los_condition": los_condition})
+    elif rain_model is not None:
+        input_params["rain_model"] = rain_model
+    return input_params
+
+
+def _calculate_single(calculator, row, link_type, terrestrial_scenario, los_condition, enabled_flags,
+                      rain_climatology=None, rain_model=None, scenario=None):
+    try:
+        input_params = _group_input_params([row], link_type, terrestrial_scenario, los_condition, enabled_flags,
+                                           rain_climatology, rain_model, scenario)
+        result = next(calculator.perform_calculations_columnar(input_params, link_type).rows())
+        result["link_type"] = link_type
+        return result
+    except ValueError as e:
+        return {"link_type": link_type, "error": str(e)}
+
+
+class _CsvResultWriter:
+    def __init__(self, path, fieldnames):
+        self.file = open(path, "w", newline="", encoding="utf-8-sig")
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, records):
+        self.writer.writerows(records)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetResultWriter:
+    """Parquet 结果文件：首块写出前确定显式 schema，之后各块按同一 schema 组装
+    结果列为 float64，link_type / error 为 string；输入列在首块中全为数值时为 float64，否则为 string
+    """
+
+    def __init__(self, path, fieldnames):
+        if pq is None:
+            raise RuntimeError("写出 Parquet 需要安装 pyarrow")
+        self.path = path
+        self.fieldnames = fieldnames
+        self.schema = None
+        self.writer = None
+
+    def _build_schema(self, records):
+        fields = []
+        for name in self.fieldnames:
+            if name in RESULT_KEYS:
+                field_type = pyarrow.float64()
+            elif name in ("link_type", "error"):
+                field_type = pyarrow.string()
+            else:
+                values = [record.get(name) for record in records if record.get(name) is not None]
+                numeric = values and all(isinstance(value, (int, float)) and not isinstance(value, bool)
+                                         for value in values)
+                field_type = pyarrow.float64() if numeric else pyarrow.string()
+            fields.append(pyarrow.field(name, field_type))
+        return pyarrow.schema(fields)
+
+    def write(self, records):
+        if self.writer is None:
+            self.schema = self._build_schema(records)
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        columns = {}
+        for field in self.schema:
+            values = [record.get(field.name) for record in records]
+            if field.type == pyarrow.string():
+                values = [None if value is None else str(value) for value in values]
+            columns[field.name] = values
+        self.writer.write_table(pyarrow.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class _ExcelResultWriter:
+    """多场景Excel报告：输入列（含 link_type、error）在前，结果列按链路类别取 RESULT_CATEGORIES"""
+
+    def __init__(self, path, fieldnames, link_type):
+        if StreamingReportWriter is None:
+            raise RuntimeError("写出 Excel 需要安装 openpyxl")
+        input_columns = [name for name in fieldnames if name not in RESULT_KEYS]
+        self.report = StreamingReportWriter(path, input_columns, link_type)
+
+    def write(self, records):
+        for record in records:
+            self.report.write_scenario(record, record)
+
+    def close(self):
+        self.report.close()
+
+
+def open_result_writer(path, fieldnames, link_type="星-地下行"):
+    suffix = path.lower()
+    if suffix.endswith(".parquet"):
+        return _ParquetResultWriter(path, fieldnames)
+    if suffix.endswith(".xlsx"):
+        return _ExcelResultWriter(path, fieldnames, link_type)
+    return _CsvResultWriter(path, fieldnames)
+
+
+def run_batch(input_path, output_path, link_type=None, chunk_size=10000,
+              enabled_flags=None, keep_input_columns=True, derived=(), rain_climatology=None, rain_model=None,
+              scenario=None):
+    """流式执行批量计算，返回 (处理行数, 出错行数)
+    link_type: 输入中没有 link_type 列时使用的链路类型，缺省取场景的链路类型或 "星-地下行"
+    derived: [(列名, 表达式), ...]，每块数据向量化求值一次
+    rain_climatology: RainClimatology 或其 .npz 文件路径，按 latitude / longitude 列查降雨率
+    rain_model: 雨衰模型，"P.618" 或 None（简化模型）
+    scenario: Scenario 或场景文件路径，enabled_flags 覆盖场景中的启用状态后编译一次
+    """
+    calculator = LinkCalculator()
+    enabled_flags = enabled_flags or {}
+    if isinstance(rain_climatology, str):
+        rain_climatology = RainClimatology.load(rain_climatology)
+    if isinstance(scenario, str):
+        scenario = Scenario.load(scenario)
+    if scenario is not None:
+        scenario = dataclasses.replace(scenario, flags={**scenario.flags, **enabled_flags}).compile()
+        link_type = link_type or scenario.link_type
+    link_type = link_type or "星-地下行"
+    writer = None
+    row_count = error_count = 0
+    try:
+        for rows in iter_row_chunks(input_path, chunk_size):
+            results = calculate_chunk(calculator, rows, link_type, enabled_flags, derived, rain_climatology, rain_model,
+                                      scenario)
+            if writer is None:
+                input_columns = list(rows[0].keys()) if keep_input_columns else []
+                fieldnames = input_columns + [
+                    name for name in ["link_type"] + RESULT_KEYS + ["error"] if name not in input_columns
+                ]
+                writer = open_result_writer(output_path, fieldnames, link_type)
+            records = []
+            for row, result in zip(rows, results):
+                record = dict(row) if keep_input_columns else {}
+                record.update(result)
+                records.append(record)
+                error_count += "error" in result
+            writer.write(records)
+            row_count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return row_count, error_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="卫星链路预算批量计算（无界面）")
+    parser.add_argument("input", help="输入场景文件（.csv 或 .parquet）")
+    parser.add_argument("-o", "--output", required=True, help="输出结果文件（.csv、.parquet 或 .xlsx 报告）")
+    parser.add_argument("--link-type", choices=LINK_TYPES,
+                        help="输入中没有 link_type 列时使用的链路类型，缺省取场景的链路类型或 星-地下行")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="每块读取和计算的行数")
+    parser.add_argument("--enable", action="append", default=[], choices=list(FLAG_DEFAULTS),
+                        help="启用可选参数（缺省值参与计算），可重复")
+    parser.add_argument("--disable", action="append", default=[], choices=list(FLAG_DEFAULTS),
+                        help="禁用可选参数（视为 0 dB / 无干扰），可重复")
+    parser.add_argument("--derive", action="append", default=[], metavar="NAME=EXPR",
+                        help="派生列，如 tx_eirp=P_tx-30+G_ant（按整列向量化求值），可重复")
+    parser.add_argument("--rain-climatology", metavar="NPZ",
+                        help="降雨率气候图 .npz（RainClimatology），按 latitude/longitude 列为未给出 rain_rate 的行查降雨率")
+    parser.add_argument("--rain-model", choices=["P.618"], help="雨衰模型，缺省为简化模型")
+    parser.add_argument("--scenario", metavar="FILE",
+                        help="场景文件（.json / .toml），作为缺省参数、启用状态和模型选项")
+    parser.add_argument("--results-only", action="store_true", help="输出中不保留输入列")
+    args = parser.parse_args(argv)
+
+    try:
+        derived = [parse_derived_column(spec) for spec in args.derive]
+    except ValueError as e:
+        parser.error(str(e))
+
+    enabled_flags = {param: True for param in args.enable}
+    enabled_flags.update({param: False for param in args.disable})
+
+    if not os.path.exists(args.input):
+        parser.error(f"输入文件不存在: {args.input}")
+    if args.rain_climatology and not os.path.exists(args.rain_climatology):
+        parser.error(f"降雨率气候图文件不存在: {args.rain_climatology}")
+    scenario = None
+    if args.scenario:
+        if not os.path.exists(args.scenario):
+            parser.error(f"场景文件不存在: {args.scenario}")
+        try:
+            scenario = Scenario.load(args.scenario)
+        except ValueError as e:
+            parser.error(str(e))
+    row_count, error_count = run_batch(
+        args.input, args.output, args.link_type, args.chunk_size,
+        enabled_flags, keep_input_columns=not args.results_only, derived=derived,
+        rain_climatology=args.rain_climatology, rain_model=args.rain_model, scenario=scenario
+    )
+    print(f"完成 {row_count} 行计算，其中 {error_count} 行出错，结果已写入 {args.output}")
+    return 0 if error_count == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
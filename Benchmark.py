@@ -0,0 +1,347 @@
+"""
+Benchmark.py
+功能：
+1. 计算核心的性能基准测试：perform_calculations（卫星/地面链路，逐点与批量）、pathLoss_3GPP38901（RMa/UMa）、
+   safe_eval（典型公式输入）、calculate_rain_fade、P.618 雨衰、P.676 气体衰减、天线方向图查表、过境时间序列仿真、
+   Excel 报告生成（write_report）以及多场景流式报告（StreamingReportWriter）。
+2. 每个用例按 small / medium / large 三种规模运行，结果（最佳耗时、吞吐量）写成 JSON。
+   每次计时循环调用直到累计耗时不少于 MIN_SAMPLE_TIME，取单次平均耗时，重复 --repeat 次取最小值，
+   避免亚毫秒级的小规模用例被计时抖动主导。
+3. 与保存的基线 JSON 对比，吞吐量下降超过容差时返回非零退出码，便于在夜间回归前发现性能退化。
+   基线是某台机器上的绝对吞吐量，只能与同一台机器（同一 Python/NumPy 版本）的结果对比：
+   仓库中的 benchmark_baseline.json 只是参考（运行环境见其中的 meta），使用前必须先在本机用 --save-baseline 重新生成；
+   基线的运行环境与本机不同时会给出警告。单核或共享虚拟机上逐点（纯 Python）用例在不同进程间的波动可达 30%，
+   此类环境下应放宽 --tolerance，或对报告的退化用例用 --case 单独复测。
+
+用法示例：
+python Benchmark.py -o bench.json                       # 运行全部用例
+python Benchmark.py --save-baseline                     # 在本机生成基线 benchmark_baseline.json（对比前必须先做）
+python Benchmark.py --baseline benchmark_baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from ChannelModel_3GPP38901 import pathLoss_3GPP38901, pathLoss_3GPP38901_batch
+from LinkCalculator import LinkCalculator
+from SafeMath import safe_eval
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+# 每次计时的最短累计耗时 (s)：耗时更短的用例在一次计时内循环调用多次
+MIN_SAMPLE_TIME = 0.05
+# 与基线对比前检查的运行环境字段
+ENVIRONMENT_KEYS = ("python", "numpy", "platform")
+
+# 各规模下的样本数；逐点（Python循环）用例规模较小
+SIZES = {
+    "small": {"batch": 100, "scalar": 100, "report": 1, "streaming": 100},
+    "medium": {"batch": 10_000, "scalar": 2_000, "report": 10, "streaming": 1_000},
+    "large": {"batch": 1_000_000, "scalar": 20_000, "report": 50, "streaming": 10_000},
+}
+
+SATELLITE_PARAMS = {
+    "frequency": 1.81, "satellite_height": 400, "tx_eirp": 56,
+    "atmospheric_loss": 0.1, "scintillation_loss": 0.3, "polarization_loss": 3,
+    "rx_antenna_gain": -5, "rx_noise_figure": 7, "rx_noise_temp": 290,
+    "satellite_scan_angle": 30, "bandwidth": 5, "rain_rate": 50,
+    "link_margin": 3, "beam_edge_loss": 1, "scan_loss": 4, "interference_psd": -110,
+}
+TERRESTRIAL_PARAMS = {
+    "frequency": 1.71, "distance": 1, "bandwidth": 0.72, "tx_eirp": 23 - 30 - 5,
+    "rx_antenna_gain": 22.5, "rx_noise_figure": 2.4, "rx_noise_temp": 290,
+    "beam_edge_loss": 1, "scan_loss": 0, "interference_psd": -math.inf,
+    "scenario": "城市宏蜂窝UMa", "los_condition": "LoS/NLoS概率加权",
+}
+FORMULAS = ["23-30-5", "46-30+22.5", "10*log(5)", "sin(60)", "53-10*log(16)", "30.72", "arctan(1)+2**3"]
+
+
+def _timeit(func, repeat, min_time=MIN_SAMPLE_TIME):
+    """
+    返回 (单次调用的最佳耗时（秒）, 每次计时的调用次数)
+    先调用一次预热（首次调用可能建表、填充缓存），再按第二次调用的耗时确定调用次数，
+    使每次计时累计不少于 min_time，最后重复 repeat 次取最小值
+    """
+    func()
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    loops = max(1, math.ceil(min_time / first)) if first > 0 else 1
+    best = first if loops == 1 else math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best, loops
+
+
+def _rng_arrays(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "scan": rng.uniform(0, 60, n),
+        "frequency": rng.uniform(1, 30, n),
+        "distance_km": rng.uniform(0.05, 4.9, n),
+        "elevation": rng.uniform(5, 90, n),
+        "rain_rate": rng.uniform(0, 100, n),
+    }
+
+
+def bench_perform_calculations_batch_satellite(n):
+    calculator = LinkCalculator()
+    data = _rng_arrays(n)
+    params = dict(SATELLITE_PARAMS, satellite_scan_angle=data["scan"], frequency=data["frequency"])
+    return lambda: calculator.perform_calculations_batch(params, "星-地下行")
+
+
+def bench_perform_calculations_batch_terrestrial(n):
+    calculator = LinkCalculator()
+    data = _rng_arrays(n)
+    params = dict(TERRESTRIAL_PARAMS, distance=data["distance_km"])
+    return lambda: calculator.perform_calculations_batch(params, "地-地上行")
+
+
+def bench_perform_calculations_scalar_satellite(n):
+    calculator = LinkCalculator(geometry_cache_size=0)
+    scans = _rng_arrays(n)["scan"].tolist()
+
+    def run():
+        for scan in scans:
+            calculator.perform_calculations(dict(SATELLITE_PARAMS, satellite_scan_angle=scan), "星-地下行")
+    return run
+
+
+def bench_perform_calculations_scalar_terrestrial(n):
+    calculator = LinkCalculator()
+    distances = _rng_arrays(n)["distance_km"].tolist()
+
+    def run():
+        for distance in distances:
+            calculator.perform_calculations(dict(TERRESTRIAL_PARAMS, distance=distance), "地-地上行")
+    return run
+
+
+def _bench_pathloss_batch(scene):
+    def factory(n):
+        distance = _rng_arrays(n)["distance_km"] * 1000
+        return lambda: pathLoss_3GPP38901_batch(1.71, distance, scene, "LoS/NLoS概率加权")
+    return factory
+
+
+def _bench_pathloss_scalar(scene):
+    def factory(n):
+        distances = (_rng_arrays(n)["distance_km"] * 1000).tolist()
+
+        def run():
+            for distance in distances:
+                pathLoss_3GPP38901(1.71, distance, scene, "LoS/NLoS概率加权")
+        return run
+    return factory
+
+
+def bench_safe_eval(n):
+    formulas = [FORMULAS[i % len(FORMULAS)] for i in range(n)]
+
+    def run():
+        for formula in formulas:
+            safe_eval(formula, sign_massagebox=False)
+    return run
+
+
+def bench_rain_fade(n):
+    calculator = LinkCalculator()
+    data = _rng_arrays(n)
+    return lambda: calculator.calculate_rain_fade(data["frequency"], data["elevation"], data["rain_rate"])
+
+
+def bench_rain_attenuation_p618(n):
+    from RainModel import rain_attenuation
+    data = _rng_arrays(n)
+    percentage = np.random.default_rng(1).uniform(0.001, 5, n)
+    return lambda: rain_attenuation(data["frequency"], data["elevation"], data["rain_rate"], percentage)
+
+
+def bench_gaseous_attenuation_p676(n):
+    from GasAbsorption import gaseous_attenuation
+    data = _rng_arrays(n)
+    return lambda: gaseous_attenuation(data["frequency"], data["elevation"])
+
+
+def bench_antenna_gain_table(n):
+    from AntennaPattern import pattern_table
+    table = pattern_table({"type": "S.1528", "max_gain": 40, "half_beamwidth": 1.0})
+    off_axis = np.random.default_rng(0).uniform(0, 180, n)
+    return lambda: table.gain(off_axis)
+
+
+def bench_orbit_pass(n):
+    from OrbitPass import CircularOrbit, GroundTerminal, PassStatistics, simulate_pass
+    params = {key: value for key, value in SATELLITE_PARAMS.items()
+              if key not in ("satellite_scan_angle", "satellite_height")}
+    orbit, terminal = CircularOrbit(550, 53), GroundTerminal(39.9, 116.4)
+
+    def run():
+        stats = PassStatistics(cn_threshold=10)
+        for chunk in simulate_pass(orbit, terminal, params, duration=n - 1, step=1):
+            stats.update(chunk)
+        stats.finish()
+    return run
+
+
+def bench_excel_report(n):
+    from ReportWriter import input_rows_from_params, write_report
+    results = LinkCalculator().perform_calculations(SATELLITE_PARAMS, "星-地下行")
+    input_rows = input_rows_from_params({"frequency": 1.81, "bandwidth": 5, "satellite_height": 400,
+                                         "satellite_scan_angle": 30, "satellite_eirp": 56})
+
+    def run():
+        with tempfile.TemporaryDirectory(prefix="bench_report_") as directory:
+            for i in range(n):
+                write_report(os.path.join(directory, f"report_{i}.xlsx"), input_rows, results, "星-地下行")
+    return run
+
+
+def bench_streaming_report(n):
+    from ReportWriter import StreamingReportWriter
+    input_params = ["frequency", "satellite_scan_angle", "satellite_height", "rain_rate"]
+    scans = _rng_arrays(n)["scan"]
+    calculator = LinkCalculator()
+    results = calculator.perform_calculations_batch(dict(SATELLITE_PARAMS, satellite_scan_angle=scans), "星-地下行")
+    inputs = {"frequency": SATELLITE_PARAMS["frequency"], "satellite_scan_angle": scans,
+              "satellite_height": SATELLITE_PARAMS["satellite_height"], "rain_rate": SATELLITE_PARAMS["rain_rate"]}
+
+    def run():
+        with tempfile.TemporaryDirectory(prefix="bench_report_") as directory:
+            with StreamingReportWriter(os.path.join(directory, "scenarios.xlsx"), input_params, "星-地下行") as writer:
+                writer.write_batch(inputs, results)
+    return run
+
+
+# 用例名 → (工厂函数, 规模类别)
+CASES = {
+    "perform_calculations_batch[星-地下行]": (bench_perform_calculations_batch_satellite, "batch"),
+    "perform_calculations_batch[地-地上行]": (bench_perform_calculations_batch_terrestrial, "batch"),
+    "perform_calculations[星-地下行]": (bench_perform_calculations_scalar_satellite, "scalar"),
+    "perform_calculations[地-地上行]": (bench_perform_calculations_scalar_terrestrial, "scalar"),
+    "pathLoss_3GPP38901_batch[RMa]": (_bench_pathloss_batch("农村宏蜂窝RMa"), "batch"),
+    "pathLoss_3GPP38901_batch[UMa]": (_bench_pathloss_batch("城市宏蜂窝UMa"), "batch"),
+    "pathLoss_3GPP38901[RMa]": (_bench_pathloss_scalar("农村宏蜂窝RMa"), "scalar"),
+    "pathLoss_3GPP38901[UMa]": (_bench_pathloss_scalar("城市宏蜂窝UMa"), "scalar"),
+    "safe_eval": (bench_safe_eval, "scalar"),
+    "calculate_rain_fade": (bench_rain_fade, "batch"),
+    "rain_attenuation[P.618]": (bench_rain_attenuation_p618, "batch"),
+    "gaseous_attenuation[P.676]": (bench_gaseous_attenuation_p676, "batch"),
+    "antenna_gain_table[S.1528]": (bench_antenna_gain_table, "batch"),
+    "orbit_pass": (bench_orbit_pass, "batch"),
+    "excel_report": (bench_excel_report, "report"),
+    "excel_report_streaming": (bench_streaming_report, "streaming"),
+}
+
+
+def run_benchmarks(sizes, repeat=3, case_filter=None):
+    """运行基准用例，返回结果字典 {用例: {规模: {n, seconds, throughput}}}"""
+    # glibc 释放大块内存后会提高 mmap 阈值，此后中等大小数组的分配明显变快（过境仿真等用例快约1倍）。
+    # 先分配并释放一个 8 MB 数组（须低于 64 位 glibc 的阈值上限 32 MB 才会触发），
+    # 使各用例耗时不依赖于之前是否运行过大规模用例（--case 单独运行时与完整运行一致）
+    np.ones(1 << 20)
+    results = {}
+    for name, (factory, kind) in CASES.items():
+        if case_filter and case_filter not in name:
+            continue
+        if kind in ("report", "streaming"):
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                print(f"跳过 {name}: 未安装 openpyxl")
+                continue
+        results[name] = {}
+        for size in sizes:
+            n = SIZES[size][kind]
+            seconds, loops = _timeit(factory(n), repeat)
+            results[name][size] = {"n": n, "seconds": seconds, "loops": loops, "throughput": n / seconds}
+            print(f"{name:<42} {size:<7} n={n:<8} {seconds * 1e3:10.3f} ms  {n / seconds:14.1f} /s  (x{loops})")
+    return results
+
+
+def environment_mismatch(meta, baseline):
+    """返回基线与本次运行环境不同的字段 [(字段, 基线值, 当前值)]"""
+    reference = baseline.get("meta", {})
+    return [(key, reference.get(key), meta.get(key)) for key in ENVIRONMENT_KEYS if reference.get(key) != meta.get(key)]
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """对比基线，返回吞吐量下降超过容差的 (用例, 规模, 当前吞吐量, 基线吞吐量) 列表"""
+    regressions = []
+    for name, by_size in results.items():
+        for size, entry in by_size.items():
+            reference = baseline.get("results", {}).get(name, {}).get(size)
+            if reference is None:
+                continue
+            if entry["throughput"] < reference["throughput"] * (1 - tolerance):
+                regressions.append((name, size, entry["throughput"], reference["throughput"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="链路预算计算核心性能基准测试")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="结果JSON文件")
+    parser.add_argument("--sizes", default="small,medium,large", help="运行的规模，逗号分隔：small,medium,large")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例重复计时次数（取最小值）")
+    parser.add_argument("--case", default=None, help="只运行名称包含该字符串的用例")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="对比的基线JSON文件")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的吞吐量下降比例")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"未知规模: {unknown}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "min_sample_time": MIN_SAMPLE_TIME,
+        },
+        "results": run_benchmarks(sizes, args.repeat, args.case),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存至 {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"未找到基线 {args.baseline}，跳过对比")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    for key, reference, current in environment_mismatch(report["meta"], baseline):
+        print(f"警告: 基线运行环境 {key}={reference} 与本机 {current} 不同，对比结果不可靠，"
+              f"请先用 --save-baseline 在本机重新生成基线")
+    regressions = compare_with_baseline(report["results"], baseline, args.tolerance)
+    for name, size, current, reference in regressions:
+        print(f"性能退化: {name} [{size}] {current:.1f}/s < 基线 {reference:.1f}/s")
+    if not regressions:
+        print("未发现超过容差的性能退化")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
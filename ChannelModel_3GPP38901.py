@@ -9,6 +9,7 @@ Table 7.4.2-1 LOS probability
 """
 
 import math
+import numpy as np
 
 def pathLoss_3GPP38901(frequency, d, scene, los_condition):
     """
@@ -36,7 +37,6 @@ def pathLoss_3GPP38901(frequency, d, scene, los_condition):
         # 计算断点距离和3D距离
         d_break = (2 * math.pi * h_bs * h_ut * frequency * 10 ** 9) / c
         d_3d = math.sqrt(d ** 2 + (h_bs - h_ut) ** 2)
-        print(f"农村宏蜂窝RMa场景下，断点距离为: {d_break}")
         # 计算LoS路径损耗
         PL1 = 20 * math.log10(40 * math.pi * d_3d * frequency / 3) + min(0.03 * h ** 1.72, 10) * math.log10(d_3d) - min(
             0.044 * h ** 1.72, 14.77) + 0.002 * math.log10(h) * d_3d
@@ -78,14 +78,13 @@ def pathLoss_3GPP38901(frequency, d, scene, los_condition):
             C = ((h_ut - 13) / 10) ** 1.5
         if d < 18:
             p_los = 1
-        elif d > 18:
+        else:
             p_los = ((18 / d) + math.exp(-(d / 63)) * (1 - (18 / d))) * (
                     1 + C * (5 / 4) * ((d / 100) ** 3) * math.exp(-(d / 150)))
 
         # 计算3D距离和断点距离
         d_3d = math.sqrt(d ** 2 + (h_bs - h_ut) ** 2)
         d_break = 4 * h_bs2 * h_ut2 * frequency * 10 ** 9 / c
-        print(f"城市宏蜂窝场景下，断点距离为: {d_break}")
 
         # 计算LoS路径损耗
         PL1 = 28 + 22 * math.log10(d_3d) + 20 * math.log10(frequency)
@@ -118,6 +117,90 @@ def pathLoss_3GPP38901(frequency, d, scene, los_condition):
         return PL
 
 
+def pathLoss_3GPP38901_batch(frequency, d, scene, los_condition):
+    """
+    pathLoss_3GPP38901 的向量化版本，分段区域用 np.where 掩码选择，不打印任何信息。
+    :param frequency: 频率，单位为GHz，标量或数组
+    :param d: 基站和用户之间的直线距离，单位为m，标量或数组（与frequency可广播）
+    :param scene: 场景，取值为 "农村宏蜂窝RMa" 或 "城市宏蜂窝UMa"
+    :param los_condition: "LoS"、"NLoS" 或 "LoS/NLoS概率加权"
+    :return: 路径损耗数组，单位为dB；超出模型适用距离范围的点为NaN（标量版本在此处会抛出异常）
+    """
+    c = 3e8  # 光速，单位m/s
+    frequency = np.asarray(frequency, dtype=float)
+    d = np.asarray(d, dtype=float)
+    frequency, d = np.broadcast_arrays(frequency, d)
+
+    if scene == "农村宏蜂窝RMa":
+        # 基础参数
+        h_bs = 35  # 基站高度，单位米
+        h_ut = 1.5  # 用户高度，单位米
+        W = 20  # 街道平均宽度，单位米
+        h = 5  # 建筑物平均高度，单位米
+
+        # 计算LOS的概率
+        p_los = np.where(d <= 10, 1.0, np.exp(-((d - 10) / 1000)))
+
+        # 计算断点距离和3D距离
+        d_break = (2 * math.pi * h_bs * h_ut * frequency * 10 ** 9) / c
+        d_3d = np.sqrt(d ** 2 + (h_bs - h_ut) ** 2)
+
+        # 计算LoS路径损耗
+        PL1 = 20 * np.log10(40 * math.pi * d_3d * frequency / 3) + min(0.03 * h ** 1.72, 10) * np.log10(d_3d) - min(
+            0.044 * h ** 1.72, 14.77) + 0.002 * math.log10(h) * d_3d
+        PL1_dbp = 20 * np.log10(40 * math.pi * d_break * frequency / 3) + min(0.03 * h ** 1.72, 10) * np.log10(d_break) - min(
+            0.044 * h ** 1.72, 14.77) + 0.002 * math.log10(h) * d_break
+        PL2 = PL1_dbp + 40 * np.log10(d_3d / d_break)
+        PL_LoS = np.where((10 <= d) & (d <= d_break), PL1,
+                          np.where((d_break <= d) & (d <= 10e3), PL2, np.nan))
+
+        # 计算NLoS路径损耗
+        PL4 = 161.04 - 7.1 * math.log10(W) + 7.5 * math.log10(h) - (24.37 - 3.7 * (h / h_bs) ** 2) * math.log10(
+            h_bs) + (43.42 - 3.1 * math.log10(h_bs)) * (np.log10(d_3d) - 3) + 20 * np.log10(frequency) - (
+                    3.2 * (math.log10(11.75 * h_ut)) ** 2 - 4.97)
+        PL_NLoS = np.where((10 <= d) & (d <= 5e3), np.maximum(PL_LoS, PL4), PL4)
+
+    elif scene == "城市宏蜂窝UMa":
+        # 基础参数
+        h_bs = 25  # 基站高度，单位米
+        h_ut = 1.5  # 用户高度，单位米
+        h_e = 1  # 有效环境高度，对于UMi,为1m
+        h_bs2 = h_bs - h_e
+        h_ut2 = h_ut - h_e
+
+        # 计算LOS的概率
+        C = 0 if h_ut <= 13 else ((h_ut - 13) / 10) ** 1.5
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_los_far = ((18 / d) + np.exp(-(d / 63)) * (1 - (18 / d))) * (
+                    1 + C * (5 / 4) * ((d / 100) ** 3) * np.exp(-(d / 150)))
+        p_los = np.where(d <= 18, 1.0, p_los_far)
+
+        # 计算3D距离和断点距离
+        d_3d = np.sqrt(d ** 2 + (h_bs - h_ut) ** 2)
+        d_break = 4 * h_bs2 * h_ut2 * frequency * 10 ** 9 / c
+
+        # 计算LoS路径损耗
+        PL1 = 28 + 22 * np.log10(d_3d) + 20 * np.log10(frequency)
+        PL2 = 28 + 40 * np.log10(d_3d) + 20 * np.log10(frequency) - 9 * np.log10(d_break ** 2 + (h_bs - h_ut) ** 2)
+        PL_LoS = np.where((10 <= d) & (d <= d_break), PL1,
+                          np.where((d_break <= d) & (d <= 5e3), PL2, np.nan))
+
+        # 计算NLoS路径损耗
+        PL4 = 13.54 + 39.08 * np.log10(d_3d) + 20 * np.log10(frequency) - 0.6 * (h_ut - 1.5)
+        PL_NLoS = np.where((10 <= d) & (d <= 5e3), PL4, np.nan)
+
+    else:
+        raise ValueError(f"不支持的地面场景: {scene}")
+
+    if los_condition == "LoS":
+        return PL_LoS
+    elif los_condition == "NLoS":
+        return PL_NLoS
+    else:
+        # 加权计算路径损耗
+        return p_los * PL_LoS + (1 - p_los) * PL_NLoS
+
+
 if __name__ == "__main__":
     pl = pathLoss_3GPP38901(1.71,  500,"农村宏蜂窝RMa", 'LoS')
     print(f'路径损耗为{pl:.2f}dB')
\ No newline at end of file
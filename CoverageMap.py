@@ -0,0 +1,264 @@
+"""
+CoverageMap.py
+功能：
+1. Walker（delta）星座在某一时刻的全球/区域经纬度网格覆盖图：每个网格点的最佳服务星 C/N、C/(N+I)、仰角、
+   服务星编号和可见卫星数（最多统计 max_candidates 颗）。无可见卫星的网格点 C/N 为 NaN、服务星编号为 -1。
+2. 卫星星下点单位向量建立 KD 树（安装 scipy 时使用 cKDTree，否则分块暴力搜索），每个网格点只查询
+   地心角在可见门限以内的最近 k 颗卫星，而不是遍历全部 网格点×卫星 组合。
+3. 链路计算复用 LinkCalculator：地心角换算为卫星扫描角后调用 cached_geometric_parameters，
+   再用 calculate_freespace_path_loss、rain_fade_for、calculate_noise_psd 等得到各候选卫星的接收功率谱密度。
+   最佳服务星为接收功率谱密度最大的卫星，其余可见候选卫星按同频干扰累加（可用 reuse_isolation 设置频率复用隔离度）。
+   给出 rain_climatology（RainClimatology）时，各网格点的降雨率按位置从气候图查表。
+4. 结果按纬度行分块计算，写入 .npy 内存映射文件（形状为 (结果键数, 纬度点数, 经度点数) 的 float32 数组），
+   可用 np.load(path, mmap_mode="r") 按块读取；不给出输出文件时结果保存在内存数组中。
+
+示例：
+constellation = WalkerConstellation(total=1584, planes=72, phasing=1, altitude=550, inclination=53)
+coverage = coverage_map(constellation, CoverageGrid(resolution=0.1), input_params, "星-地下行", "coverage.npy")
+coverage[COVERAGE_KEYS.index("c_to_n")]  # (1800, 3600) 的 C/N 视图
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from LinkCalculator import LinkCalculator, SATELLITE_LINK_TYPES
+from OrbitPass import CircularOrbit, satellite_positions
+from RainClimatology import RainClimatology
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy 为可选依赖，未安装时使用暴力搜索
+    cKDTree = None
+
+COVERAGE_KEYS = ["c_to_n", "c_to_n_plus_i", "elevation", "server", "visible_count"]
+
+
+@dataclass
+class WalkerConstellation:
+    """Walker delta 星座 T/P/F：总卫星数、轨道面数、相位因子，轨道高度 (km)、倾角 (度)"""
+    total: int
+    planes: int
+    phasing: int
+    altitude: float
+    inclination: float
+
+    def orbit(self):
+        """全部卫星的轨道根数（升交点赤经和初始相位为数组）"""
+        if self.total % self.planes:
+            raise ValueError("总卫星数必须是轨道面数的整数倍")
+        per_plane = self.total // self.planes
+        plane, slot = np.divmod(np.arange(self.total), per_plane)
+        raan = 360.0 * plane / self.planes
+        phase = 360.0 * slot / per_plane + 360.0 * self.phasing * plane / self.total
+        return CircularOrbit(self.altitude, self.inclination, raan, phase)
+
+    def positions(self, t, earth_radius):
+        """t 时刻各卫星的地固坐标，形状 (3, 卫星数)"""
+        return satellite_positions(self.orbit(), t, earth_radius)
+
+
+@dataclass
+class CoverageGrid:
+    """经纬度网格（网格中心点），分辨率单位为度"""
+    lat_min: float = -90.0
+    lat_max: float = 90.0
+    lon_min: float = -180.0
+    lon_max: float = 180.0
+    resolution: float = 0.1
+
+    @property
+    def latitudes(self):
+        return np.arange(self.lat_min + self.resolution / 2, self.lat_max, self.resolution)
+
+    @property
+    def longitudes(self):
+        return np.arange(self.lon_min + self.resolution / 2, self.lon_max, self.resolution)
+
+    @property
+    def shape(self):
+        return len(self.latitudes), len(self.longitudes)
+
+
+def unit_vectors(latitude, longitude):
+    """经纬度 (度) 转地心单位向量，形状 (..., 3)"""
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def max_central_angle(altitude, min_elevation, earth_radius):
+    """仰角门限对应的最大地心角 (rad)"""
+    el = np.radians(min_elevation)
+    return np.arccos(earth_radius * np.cos(el) / (earth_radius + altitude)) - el
+
+
+class SatelliteIndex:
+    """星下点单位向量的最近邻索引：query 返回最近 k 颗卫星中弦长不超过 max_chord 的那些"""
+
+    def __init__(self, sub_points, block_size=4096):
+        self.sub_points = np.asarray(sub_points, dtype=float)
+        self.block_size = block_size
+        self.tree = cKDTree(self.sub_points) if cKDTree is not None else None
+
+    def query(self, points, k, max_chord):
+        """返回 (弦长, 卫星下标)，形状 (点数, k)；不足 k 颗时弦长为 inf、下标为卫星数"""
+        k = min(k, len(self.sub_points))
+        if self.tree is not None:
+            chord, index = self.tree.query(points, k=k, distance_upper_bound=max_chord, workers=-1)
+            return chord.reshape(len(points), k), index.reshape(len(points), k)
+
+        chord = np.empty((len(points), k))
+        index = np.empty((len(points), k), dtype=np.intp)
+        for start in range(0, len(points), self.block_size):
+            block = points[start:start + self.block_size]
+            squared = np.maximum(2 - 2 * block @ self.sub_points.T, 0)
+            nearest = np.argpartition(squared, k - 1, axis=1)[:, :k] if k < squared.shape[1] else \
+                np.broadcast_to(np.arange(k), squared.shape).copy()
+            distance = np.sqrt(np.take_along_axis(squared, nearest, axis=1))
+            order = np.argsort(distance, axis=1)
+            distance = np.take_along_axis(distance, order, axis=1)
+            nearest = np.take_along_axis(nearest, order, axis=1)
+            outside = distance > max_chord
+            distance[outside] = np.inf
+            nearest[outside] = len(self.sub_points)
+            chord[start:start + len(block)] = distance
+            index[start:start + len(block)] = nearest
+        return chord, index
+
+
+def _received_psd(calculator, input_params, central_angle, altitude):
+    """按地心角计算候选卫星的 (终端仰角, 接收信号功率谱密度)"""
+    r = calculator.earth_radius
+    scan_angle = np.degrees(np.arctan2(r * np.sin(central_angle), r + altitude - r * np.cos(central_angle)))
+    # 恰在地平线上的网格点（仰角门限为0时）换算结果可能等于地平线扫描角
+    scan_angle = calculator.clip_scan_angle(scan_angle, altitude)
+    elevation, distance = calculator.cached_geometric_parameters(scan_angle, altitude)
+    freq = input_params["frequency"]
+    path_loss = calculator.calculate_freespace_path_loss(freq, distance)
+    rain_fade = calculator.rain_fade_for(input_params, freq, elevation)
+    total_loss = calculator.calculate_total_loss(
+        calculator.atmospheric_loss_for(input_params, freq, elevation), input_params.get("scintillation_loss", 0),
+        input_params.get("polarization_loss", 0), path_loss, rain_fade, input_params.get("link_margin", 0),
+        calculator.beam_edge_loss_for(input_params, scan_angle), calculator.scan_loss_for(input_params, scan_angle),
+        input_params.get("pointing_loss", 0))
+    received_psd, _ = calculator.calculate_received_signal(input_params["tx_eirp"], total_loss,
+                                                           input_params["rx_antenna_gain"], input_params["bandwidth"])
+    return elevation, received_psd
+
+
+def coverage_map(constellation, grid, input_params, link_type="星-地下行", output_path=None, t=0.0,
+                 min_elevation=0.0, max_candidates=48, reuse_isolation=0.0, tile_rows=16, calculator=None,
+                 rain_climatology=None):
+    """
+    计算覆盖图并写入 .npy 内存映射文件，返回形状为 (len(COVERAGE_KEYS), 纬度点数, 经度点数) 的 np.memmap
+    output_path: 输出 .npy 文件；为 None 时不写文件，返回同形状的内存数组
+    input_params: 链路参数（与 perform_calculations 相同，卫星高度和扫描角由星座几何决定）
+    max_candidates: 每个网格点最多考虑的可见卫星数（最佳服务星 + 干扰星）
+    reuse_isolation: 干扰星相对服务星的频率复用隔离度 (dB)，0 表示全同频
+    tile_rows: 每块计算的纬度行数（决定临时内存：tile_rows × 经度点数 × max_candidates）
+    rain_climatology: RainClimatology，给出时每个网格点的降雨率（及 P.618 的纬度）按位置取值，代替 input_params 中的常数
+    """
+    if link_type not in SATELLITE_LINK_TYPES:
+        raise ValueError(f"覆盖图只支持卫星链路: {link_type}")
+    calculator = calculator or LinkCalculator(geometry_cache_size=0)
+    r = calculator.earth_radius
+    altitude = constellation.altitude
+
+    positions = constellation.positions(t, r)
+    index = SatelliteIndex((positions / np.linalg.norm(positions, axis=0)).T)
+    psi_max = max_central_angle(altitude, min_elevation, r)
+    max_chord = 2 * np.sin(psi_max / 2)
+    noise_psd = calculator.calculate_noise_psd(input_params["rx_noise_figure"], input_params["rx_noise_temp"])
+    noise_linear = 10 ** (noise_psd / 10) + 10 ** (input_params.get("interference_psd", -np.inf) / 10)
+
+    latitudes, longitudes = grid.latitudes, grid.longitudes
+    shape = (len(COVERAGE_KEYS), len(latitudes), len(longitudes))
+    if output_path is None:
+        coverage = np.empty(shape, dtype=np.float32)
+    else:
+        coverage = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.float32, shape=shape)
+    for row in range(0, len(latitudes), tile_rows):
+        lat = latitudes[row:row + tile_rows]
+        tile_lat, tile_lon = np.meshgrid(lat, longitudes, indexing="ij")
+        points = unit_vectors(tile_lat, tile_lon).reshape(-1, 3)
+        chord, satellite = index.query(points, max_candidates, max_chord)
+        visible = np.isfinite(chord)
+        central_angle = 2 * np.arcsin(np.minimum(chord[visible], 1.0) / 2)
+
+        elevation = np.full(chord.shape, np.nan)
+        received = np.full(chord.shape, -np.inf)
+        if central_angle.size:
+            params = input_params
+            if rain_climatology is not None:
+                # 每个网格点的降雨率广播到其各候选卫星
+                cell = np.broadcast_to(np.arange(chord.shape[0])[:, None], chord.shape)[visible]
+                params = dict(input_params, rain_rate=rain_climatology.lookup(tile_lat, tile_lon).ravel()[cell],
+                              latitude=tile_lat.ravel()[cell])
+            elevation[visible], received[visible] = _received_psd(calculator, params, central_angle, altitude)
+        # 最佳服务星：接收功率谱密度最大；其余可见候选卫星为干扰
+        best = np.argmax(received, axis=1)
+        signal = np.take_along_axis(received, best[:, None], axis=1)[:, 0]
+        signal_linear = 10 ** (signal / 10)
+        interference = (10 ** (received / 10)).sum(axis=1) - signal_linear
+        with np.errstate(divide="ignore"):
+            c_to_n = 10 * np.log10(signal_linear) - noise_psd
+            c_to_n_plus_i = 10 * np.log10(signal_linear / (noise_linear + interference * 10 ** (-reuse_isolation / 10)))
+
+        tile = coverage[:, row:row + len(lat)]
+        shape = tile.shape[1:]
+        has_server = visible.any(axis=1)
+        tile[0] = np.where(has_server, c_to_n, np.nan).reshape(shape)
+        tile[1] = np.where(has_server, c_to_n_plus_i, np.nan).reshape(shape)
+        tile[2] = np.take_along_axis(elevation, best[:, None], axis=1)[:, 0].reshape(shape)
+        tile[3] = np.where(has_server, np.take_along_axis(satellite, best[:, None], axis=1)[:, 0], -1).reshape(shape)
+        tile[4] = visible.sum(axis=1).reshape(shape)
+    if output_path is not None:
+        coverage.flush()
+    return coverage
+
+
+def load_coverage(path):
+    """内存映射打开覆盖图文件"""
+    return np.load(path, mmap_mode="r")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walker星座经纬度网格覆盖图（最佳服务星 C/N、C/(N+I)）")
+    parser.add_argument("params", help="链路参数JSON文件（与 perform_calculations 的输入参数相同）")
+    parser.add_argument("-o", "--output", required=True, help="输出 .npy 文件（内存映射）")
+    parser.add_argument("--link-type", default="星-地下行", choices=SATELLITE_LINK_TYPES)
+    parser.add_argument("--walker", required=True, metavar="T/P/F", help="Walker星座参数，如 1584/72/1")
+    parser.add_argument("--altitude", type=float, required=True, help="轨道高度 (km)")
+    parser.add_argument("--inclination", type=float, required=True, help="轨道倾角 (度)")
+    parser.add_argument("--resolution", type=float, default=0.1, help="网格分辨率 (度)")
+    parser.add_argument("--region", type=float, nargs=4, default=[-90, 90, -180, 180],
+                        metavar=("LAT_MIN", "LAT_MAX", "LON_MIN", "LON_MAX"), help="区域范围 (度)")
+    parser.add_argument("--time", type=float, default=0.0, help="仿真时刻 (s)")
+    parser.add_argument("--min-elevation", type=float, default=0.0, help="可见仰角门限 (度)")
+    parser.add_argument("--max-candidates", type=int, default=48, help="每个网格点最多考虑的可见卫星数")
+    parser.add_argument("--reuse-isolation", type=float, default=0.0, help="干扰星频率复用隔离度 (dB)")
+    parser.add_argument("--rain-climatology", metavar="NPZ", help="降雨率气候图 .npz（RainClimatology），按网格点查降雨率")
+    args = parser.parse_args(argv)
+
+    try:
+        total, planes, phasing = (int(value) for value in args.walker.split("/"))
+    except ValueError:
+        parser.error(f"Walker星座参数格式应为 T/P/F: {args.walker}")
+    with open(args.params, encoding="utf-8") as f:
+        input_params = json.load(f)
+    constellation = WalkerConstellation(total, planes, phasing, args.altitude, args.inclination)
+    grid = CoverageGrid(*args.region, resolution=args.resolution)
+    rain_climatology = RainClimatology.load(args.rain_climatology) if args.rain_climatology else None
+    coverage = coverage_map(constellation, grid, input_params, args.link_type, args.output, args.time,
+                            args.min_elevation, args.max_candidates, args.reuse_isolation,
+                            rain_climatology=rain_climatology)
+    covered = np.isfinite(coverage[0])
+    print(f"覆盖图 {grid.shape[0]}x{grid.shape[1]} 已写入 {args.output}，覆盖率 {covered.mean() * 100:.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+GasAbsorption.py
+功能：
+1. ITU-R P.676-12 附件1 逐谱线法计算氧气和水汽的比衰减 γo、γw (dB/km)：44 条氧气谱线 + 干空气连续谱、35 条水汽谱线。
+2. 谱线求和代价较高，按 (气压, 温度, 水汽密度) 在 1~350 GHz、0.01 GHz 间隔的频率网格上预计算比衰减表（lru_cache 缓存），
+   数组频率在表上线性插值；标量频率按 (频率, 大气参数) 缓存逐谱线求和结果，扫描时不重复求和。
+3. P.676-12 附件2 斜路径气体衰减：氧气、水汽等效高度 ho、hw，仰角 ≥ 5° 用余割定律，
+   低仰角用考虑地球曲率的修正公式。仰角、频率均支持数组输入（可广播）。
+
+在链路计算中启用：input_params["atmospheric_model"] = "P.676"，此时卫星链路的 atmospheric_loss 由本模块按
+频率和终端仰角计算，代替常数输入；可选参数 surface_pressure（默认1013.25 hPa）、surface_temperature（默认15 ℃）、
+water_vapour_density（默认7.5 g/m³），为 P.835 中纬度标准大气的地面值。
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# P.676-12 表1：氧气谱线 f0 (GHz), a1, a2, a3, a4, a5, a6
+OXYGEN_LINES = np.array([
+    [50.474214, 0.975, 9.651, 6.690, 0.0, 2.566, 6.850],
+    [50.987745, 2.529, 8.653, 7.170, 0.0, 2.246, 6.800],
+    [51.503360, 6.193, 7.709, 7.640, 0.0, 1.947, 6.729],
+    [52.021429, 14.320, 6.819, 8.110, 0.0, 1.667, 6.640],
+    [52.542418, 31.240, 5.983, 8.580, 0.0, 1.388, 6.526],
+    [53.066934, 64.290, 5.201, 9.060, 0.0, 1.349, 6.206],
+    [53.595775, 124.600, 4.474, 9.550, 0.0, 2.227, 5.085],
+    [54.130025, 227.300, 3.800, 9.960, 0.0, 3.170, 3.750],
+    [54.671180, 389.700, 3.182, 10.370, 0.0, 3.558, 2.654],
+    [55.221384, 627.100, 2.618, 10.890, 0.0, 2.560, 2.952],
+    [55.783815, 945.300, 2.109, 11.340, 0.0, -1.172, 6.135],
+    [56.264774, 543.400, 0.014, 17.030, 0.0, 3.525, -0.978],
+    [56.363399, 1331.800, 1.654, 11.890, 0.0, -2.378, 6.547],
+    [56.968211, 1746.600, 1.255, 12.230, 0.0, -3.545, 6.451],
+    [57.612486, 2120.100, 0.910, 12.620, 0.0, -5.416, 6.056],
+    [58.323877, 2363.700, 0.621, 12.950, 0.0, -1.932, 0.436],
+    [58.446588, 1442.100, 0.083, 14.910, 0.0, 6.768, -1.273],
+    [59.164204, 2379.900, 0.387, 13.530, 0.0, -6.561, 2.309],
+    [59.590983, 2090.700, 0.207, 14.080, 0.0, 6.957, -0.776],
+    [60.306056, 2103.400, 0.207, 14.150, 0.0, -6.395, 0.699],
+    [60.434778, 2438.000, 0.386, 13.390, 0.0, 6.342, -2.825],
+    [61.150562, 2479.500, 0.621, 12.920, 0.0, 1.014, -0.584],
+    [61.800158, 2275.900, 0.910, 12.630, 0.0, 5.014, -6.619],
+    [62.411220, 1915.400, 1.255, 12.170, 0.0, 3.029, -6.759],
+    [62.486253, 1503.000, 0.083, 15.130, 0.0, -4.499, 0.844],
+    [62.997984, 1490.200, 1.654, 11.740, 0.0, 1.856, -6.675],
+    [63.568526, 1078.000, 2.108, 11.340, 0.0, 0.658, -6.139],
+    [64.127775, 728.700, 2.617, 10.880, 0.0, -3.036, -2.895],
+    [64.678910, 461.300, 3.181, 10.380, 0.0, -3.968, -2.590],
+    [65.224078, 274.000, 3.800, 9.960, 0.0, -3.528, -3.680],
+    [65.764779, 153.000, 4.473, 9.550, 0.0, -2.548, -5.002],
+    [66.302096, 80.400, 5.200, 9.060, 0.0, -1.660, -6.091],
+    [66.836834, 39.800, 5.982, 8.580, 0.0, -1.680, -6.393],
+    [67.369601, 18.560, 6.818, 8.110, 0.0, -1.956, -6.475],
+    [67.900868, 8.172, 7.708, 7.640, 0.0, -2.216, -6.545],
+    [68.431006, 3.397, 8.652, 7.170, 0.0, -2.492, -6.600],
+    [68.960312, 1.334, 9.650, 6.690, 0.0, -2.773, -6.650],
+    [118.750334, 940.300, 0.010, 16.640, 0.0, -0.439, 0.079],
+    [368.498246, 67.400, 0.048, 16.400, 0.0, 0.000, 0.000],
+    [424.763020, 637.700, 0.044, 16.400, 0.0, 0.000, 0.000],
+    [487.249273, 237.400, 0.049, 16.000, 0.0, 0.000, 0.000],
+    [715.392902, 98.100, 0.145, 16.000, 0.0, 0.000, 0.000],
+    [773.839490, 572.300, 0.141, 16.200, 0.0, 0.000, 0.000],
+    [834.145546, 183.100, 0.145, 14.700, 0.0, 0.000, 0.000],
+])
+
+# P.676-12 表2：水汽谱线 f0 (GHz), b1, b2, b3, b4, b5, b6
+WATER_VAPOUR_LINES = np.array([
+    [22.235080, 0.1079, 2.144, 26.38, 0.76, 5.087, 1.00],
+    [67.803960, 0.0011, 8.732, 28.58, 0.69, 4.930, 0.82],
+    [119.995940, 0.0007, 8.353, 29.48, 0.70, 4.780, 0.79],
+    [183.310087, 2.273, 0.668, 29.06, 0.77, 5.022, 0.85],
+    [321.225630, 0.0470, 6.179, 24.04, 0.67, 4.398, 0.54],
+    [325.152888, 1.514, 1.541, 28.23, 0.64, 4.893, 0.74],
+    [336.227764, 0.0010, 9.825, 26.93, 0.69, 4.740, 0.61],
+    [380.197353, 11.67, 1.048, 28.11, 0.54, 5.063, 0.89],
+    [390.134508, 0.0045, 7.347, 21.52, 0.63, 4.810, 0.55],
+    [437.346667, 0.0632, 5.048, 18.45, 0.60, 4.230, 0.48],
+    [439.150807, 0.9098, 3.595, 20.07, 0.63, 4.483, 0.52],
+    [443.018343, 0.1920, 5.048, 15.55, 0.60, 5.083, 0.50],
+    [448.001085, 10.41, 1.405, 25.64, 0.66, 5.028, 0.67],
+    [470.888999, 0.3254, 3.597, 21.34, 0.66, 4.506, 0.65],
+    [474.689092, 1.260, 2.379, 23.20, 0.65, 4.804, 0.64],
+    [488.490108, 0.2529, 2.852, 25.86, 0.69, 5.201, 0.72],
+    [503.568532, 0.0372, 6.731, 16.12, 0.61, 3.980, 0.43],
+    [504.482692, 0.0124, 6.731, 16.12, 0.61, 4.010, 0.45],
+    [547.676440, 0.9785, 0.158, 26.00, 0.70, 4.500, 1.00],
+    [552.020960, 0.1840, 0.158, 26.00, 0.70, 4.500, 1.00],
+    [556.935985, 497.0, 0.159, 30.86, 0.69, 4.552, 1.00],
+    [620.700807, 5.015, 2.391, 24.38, 0.71, 4.856, 0.68],
+    [645.766085, 0.0067, 8.633, 18.00, 0.60, 4.000, 0.50],
+    [658.005280, 0.2732, 7.816, 32.10, 0.69, 4.140, 1.00],
+    [752.033113, 243.4, 0.396, 30.86, 0.68, 4.352, 0.84],
+    [841.051732, 0.0134, 8.177, 15.90, 0.33, 5.760, 0.45],
+    [859.965698, 0.1325, 8.055, 30.60, 0.68, 4.090, 0.84],
+    [899.303175, 0.0547, 7.914, 29.85, 0.68, 4.530, 0.90],
+    [902.611085, 0.0386, 8.429, 28.65, 0.70, 5.100, 0.95],
+    [906.205957, 0.1836, 5.110, 24.08, 0.70, 4.700, 0.53],
+    [916.171582, 8.400, 1.441, 26.73, 0.70, 5.150, 0.78],
+    [923.112692, 0.0079, 10.293, 29.00, 0.70, 5.000, 0.80],
+    [970.315022, 9.009, 1.919, 25.50, 0.64, 4.940, 0.67],
+    [987.926764, 134.6, 0.257, 29.85, 0.68, 4.550, 0.90],
+    [1780.000000, 17506.0, 0.952, 196.3, 2.00, 24.15, 5.00],
+])
+
+EFFECTIVE_EARTH_RADIUS = 8500  # 低仰角路径修正使用的有效地球半径 (km)
+STANDARD_PRESSURE = 1013.25  # 地面总气压 (hPa)
+STANDARD_TEMPERATURE = 15.0  # 地面温度 (℃)
+STANDARD_WATER_VAPOUR_DENSITY = 7.5  # 地面水汽密度 (g/m³)
+
+# 预计算频率网格：1~350 GHz（附件2 等效高度公式的适用范围），间隔 0.01 GHz
+FREQUENCY_GRID = np.linspace(1.0, 350.0, 34901)
+
+
+def _line_shape(f, f0, width, correction):
+    """P.676 式(5) 谱线形状因子 F"""
+    return f / f0 * ((width - correction * (f0 - f)) / ((f0 - f) ** 2 + width ** 2)
+                     + (width - correction * (f0 + f)) / ((f0 + f) ** 2 + width ** 2))
+
+
+def line_by_line_attenuation(frequency, pressure=STANDARD_PRESSURE, temperature=STANDARD_TEMPERATURE,
+                             water_vapour_density=STANDARD_WATER_VAPOUR_DENSITY):
+    """
+    逐谱线求和的比衰减 (γo, γw)，单位 dB/km
+    :param frequency: 频率 (GHz)，可为数组
+    :param pressure: 总气压 (hPa)
+    :param temperature: 温度 (℃)
+    :param water_vapour_density: 水汽密度 (g/m³)
+    """
+    f = np.asarray(frequency, dtype=float)[..., None]
+    t = temperature + 273.15
+    theta = 300.0 / t
+    e = water_vapour_density * t / 216.7  # 水汽分压 (hPa)
+    p = pressure - e  # 干空气气压 (hPa)
+
+    f0, a1, a2, a3, a4, a5, a6 = OXYGEN_LINES.T
+    strength = a1 * 1e-7 * p * theta ** 3 * np.exp(a2 * (1 - theta))
+    width = a3 * 1e-4 * (p * theta ** (0.8 - a4) + 1.1 * e * theta)
+    width = np.sqrt(width ** 2 + 2.25e-6)
+    correction = (a5 + a6 * theta) * 1e-4 * (p + e) * theta ** 0.8
+    oxygen = (strength * _line_shape(f, f0, width, correction)).sum(axis=-1)
+    # 干空气连续谱（Debye 谱 + 压力致氮气吸收）
+    f = f[..., 0]
+    d = 5.6e-4 * (p + e) * theta ** 0.8
+    oxygen += f * p * theta ** 2 * (6.14e-5 / (d * (1 + (f / d) ** 2))
+                                    + 1.4e-12 * p * theta ** 1.5 / (1 + 1.9e-5 * f ** 1.5))
+
+    f0, b1, b2, b3, b4, b5, b6 = WATER_VAPOUR_LINES.T
+    strength = b1 * 1e-1 * e * theta ** 3.5 * np.exp(b2 * (1 - theta))
+    width = b3 * 1e-4 * (p * theta ** b4 + b5 * e * theta ** b6)
+    width = 0.535 * width + np.sqrt(0.217 * width ** 2 + 2.1316e-12 * f0 ** 2 / theta)
+    water = (strength * _line_shape(f[..., None], f0, width, 0.0)).sum(axis=-1)
+    return 0.1820 * f * oxygen, 0.1820 * f * water
+
+
+@lru_cache(maxsize=16)
+def attenuation_table(pressure=STANDARD_PRESSURE, temperature=STANDARD_TEMPERATURE,
+                      water_vapour_density=STANDARD_WATER_VAPOUR_DENSITY):
+    """按大气参数预计算 FREQUENCY_GRID 上的 (γo, γw) 表（只读）"""
+    oxygen, water = line_by_line_attenuation(FREQUENCY_GRID, pressure, temperature, water_vapour_density)
+    oxygen.flags.writeable = water.flags.writeable = False
+    return oxygen, water
+
+
+@lru_cache(maxsize=1024)
+def _cached_attenuation(frequency, pressure, temperature, water_vapour_density):
+    oxygen, water = line_by_line_attenuation(frequency, pressure, temperature, water_vapour_density)
+    return float(oxygen), float(water)
+
+
+def specific_attenuation(frequency, pressure=STANDARD_PRESSURE, temperature=STANDARD_TEMPERATURE,
+                         water_vapour_density=STANDARD_WATER_VAPOUR_DENSITY):
+    """
+    氧气、水汽比衰减 (γo, γw)，单位 dB/km
+    标量频率按 (频率, 大气参数) 缓存逐谱线结果；数组频率在预计算表上插值
+    """
+    atmosphere = (float(pressure), float(temperature), float(water_vapour_density))
+    frequency = np.asarray(frequency, dtype=float)
+    if np.any((frequency < FREQUENCY_GRID[0]) | (frequency > FREQUENCY_GRID[-1])):
+        raise ValueError("P.676 气体衰减适用频率范围为 1~350 GHz")
+    if frequency.ndim == 0:
+        return _cached_attenuation(float(frequency), *atmosphere)
+    oxygen, water = attenuation_table(*atmosphere)
+    return np.interp(frequency, FREQUENCY_GRID, oxygen), np.interp(frequency, FREQUENCY_GRID, water)
+
+
+def equivalent_heights(frequency, pressure=STANDARD_PRESSURE):
+    """P.676-12 附件2：氧气、水汽等效高度 (ho, hw)，单位 km；pressure 为地面总气压 (hPa)"""
+    f = np.asarray(frequency, dtype=float)
+    rp = pressure / 1013.25
+    t1 = 4.64 / (1 + 0.066 * rp ** -2.3) * np.exp(-((f - 59.7) / (2.87 + 12.4 * np.exp(-7.9 * rp))) ** 2)
+    t2 = 0.14 * np.exp(2.12 * rp) / ((f - 118.75) ** 2 + 0.031 * np.exp(2.2 * rp))
+    t3 = (0.0114 / (1 + 0.14 * rp ** -2.6) * f * (-0.0247 + 0.0001 * f + 1.61e-6 * f ** 2)
+          / (1 - 0.0169 * f + 4.1e-5 * f ** 2 + 3.2e-7 * f ** 3))
+    h_oxygen = 6.1 / (1 + 0.17 * rp ** -1.1) * (1 + t1 + t2 + t3)
+    h_oxygen = np.where(f < 70, np.minimum(h_oxygen, 10.7 * rp ** 0.3), h_oxygen)
+    sigma = 1.013 / (1 + np.exp(-8.6 * (rp - 0.57)))
+    h_water = 1.66 * (1 + 1.39 * sigma / ((f - 22.235) ** 2 + 2.56 * sigma)
+                      + 3.37 * sigma / ((f - 183.31) ** 2 + 4.69 * sigma)
+                      + 1.58 * sigma / ((f - 325.1) ** 2 + 2.89 * sigma))
+    return h_oxygen, h_water
+
+
+def gaseous_attenuation(frequency, elevation, surface_pressure=STANDARD_PRESSURE,
+                        surface_temperature=STANDARD_TEMPERATURE,
+                        water_vapour_density=STANDARD_WATER_VAPOUR_DENSITY):
+    """
+    斜路径气体衰减 (dB)
+    :param frequency: 频率 (GHz)，1~350
+    :param elevation: 路径仰角 (度)
+    :param surface_pressure: 地面总气压 (hPa)
+    :param surface_temperature: 地面温度 (℃)
+    :param water_vapour_density: 地面水汽密度 (g/m³)
+    """
+    gamma_oxygen, gamma_water = specific_attenuation(frequency, surface_pressure, surface_temperature,
+                                                     water_vapour_density)
+    h_oxygen, h_water = equivalent_heights(frequency, surface_pressure)
+    theta = np.radians(np.asarray(elevation, dtype=float))
+    zenith = gamma_oxygen * h_oxygen + gamma_water * h_water
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 低仰角（< 5°）：考虑地球曲率，F(x) = 1 / (0.661x + 0.339 sqrt(x² + 5.51))
+        def curved(gamma, height):
+            x = np.tan(theta) * np.sqrt(EFFECTIVE_EARTH_RADIUS / height)
+            return gamma * np.sqrt(height) / (0.661 * x + 0.339 * np.sqrt(x ** 2 + 5.51))
+
+        low = np.sqrt(EFFECTIVE_EARTH_RADIUS) / np.cos(theta) * (curved(gamma_oxygen, h_oxygen)
+                                                                  + curved(gamma_water, h_water))
+        return np.where(theta >= np.radians(5), zenith / np.sin(theta), low)
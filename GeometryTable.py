@@ -0,0 +1,166 @@
+"""
+GeometryTable.py
+功能：
+1. 按轨道高度（如LEO壳层 400、550、1200 km）预计算 扫描角 → (终端仰角, 星地距离, 参考频率自由空间损耗) 的稠密表，
+   扫描角范围到 calculate_geometric_parameters 中 asin(R/(R+h)) 的地平线极限为止。
+2. 表保存为未压缩的 .npz 文件，加载时各数组直接内存映射（零拷贝）。
+3. 按均匀扫描角网格做线性插值查表，代替逐样本三角运算；LinkCalculator 配置了查找表时标量和批量路径都查表，结果一致。
+   地平线附近仰角随扫描角按 sqrt(max_angle - 扫描角) 变化，线性插值误差很大，
+   因此距地平线 HORIZON_BAND 度以内的样本直接按三角公式计算，不查表。
+
+示例：
+table = build_geometry_table([400, 550, 1200], resolution=0.01)
+table.save("leo_shells.npz")
+table = GeometryTable.load("leo_shells.npz")       # 内存映射
+calculator = LinkCalculator(geometry_table=table)  # 标量和批量计算都自动查表
+"""
+
+import struct
+import zipfile
+
+import numpy as np
+
+from LinkCalculator import LinkCalculator
+
+TABLE_FIELDS = ["heights", "scan_angle", "max_angle", "elevation", "distance", "path_loss", "reference_frequency"]
+# 距地平线（max_angle）小于该值 (度) 的扫描角直接计算，不插值
+HORIZON_BAND = 1.0
+
+_EXACT_CALCULATOR = LinkCalculator(geometry_cache_size=0)
+
+
+def load_npz_mmap(path):
+    """
+    以内存映射方式打开未压缩 .npz 文件中的全部数组（np.load 对 .npz 不支持 mmap_mode）
+    返回 {名称: 只读 np.memmap}
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} 中的 {info.filename} 被压缩，无法内存映射（请用 np.savez 保存）")
+            # 本地文件头：30字节固定部分 + 文件名 + 扩展字段
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran_order else "C")
+    return arrays
+
+
+class GeometryTable:
+    """按轨道高度分壳层的几何查找表（均匀扫描角网格 + 线性插值）"""
+
+    def __init__(self, heights, scan_angle, max_angle, elevation, distance, path_loss, reference_frequency):
+        self.heights = heights
+        self.scan_angle = scan_angle
+        self.max_angle = max_angle
+        self.elevation = elevation
+        self.distance = distance
+        self.path_loss = path_loss
+        self.reference_frequency = float(reference_frequency)
+        self.resolution = float(scan_angle[1] - scan_angle[0])
+
+    def save(self, path):
+        """保存为未压缩 .npz（可被 load 内存映射）"""
+        np.savez(path, **{name: np.asarray(getattr(self, name)) for name in TABLE_FIELDS})
+
+    @classmethod
+    def load(cls, path):
+        """内存映射加载，不把表复制进内存"""
+        arrays = load_npz_mmap(path)
+        return cls(**{name: arrays[name] for name in TABLE_FIELDS})
+
+    def covers(self, height):
+        """判断给定高度是否都在表中的壳层内"""
+        height = np.asarray(height, dtype=float)
+        index = np.clip(np.searchsorted(self.heights, height), 0, len(self.heights) - 1)
+        return bool(np.all(self.heights[index] == height))
+
+    def _exact(self, scan_angle, height):
+        """直接计算 (终端仰角, 星地距离, 参考频率自由空间损耗)，用于地平线附近的样本"""
+        elevation, distance = _EXACT_CALCULATOR.calculate_geometric_parameters(scan_angle, height)
+        return {"elevation": elevation, "distance": distance,
+                "path_loss": _EXACT_CALCULATOR.calculate_freespace_path_loss(self.reference_frequency, distance)}
+
+    def _interpolate(self, fields, scan_angle, height):
+        """
+        对若干张表（TABLE_FIELDS 中的名称）在同一组 (扫描角, 高度) 上插值，共用壳层定位和插值权重
+        扫描角或高度为 NaN 的样本结果为 NaN；距地平线 HORIZON_BAND 度以内的样本直接计算
+        """
+        scan_angle, height = np.broadcast_arrays(np.asarray(scan_angle, dtype=float),
+                                                 np.asarray(height, dtype=float))
+        valid = np.isfinite(scan_angle) & np.isfinite(height)
+        shell = np.clip(np.searchsorted(self.heights, np.where(valid, height, self.heights[0])),
+                        0, len(self.heights) - 1)
+        if not np.all(~valid | (self.heights[shell] == height)):
+            raise ValueError(f"查找表中没有该轨道高度，已有壳层: {np.asarray(self.heights).tolist()} km")
+        if np.any(scan_angle < 0):
+            raise ValueError("扫描角需大于等于0度")
+        max_angle = np.asarray(self.max_angle)[shell]
+        invalid = scan_angle >= max_angle
+        if np.any(invalid):
+            raise ValueError(f"扫描角需小于{np.min(max_angle[invalid]):.2f}度")
+
+        position = np.where(valid, scan_angle, 0.0) / self.resolution
+        index = np.minimum(position.astype(np.intp), len(self.scan_angle) - 2)
+        fraction = position - index
+        flat_index = shell * len(self.scan_angle) + index
+        results = []
+        for name in fields:
+            flat = np.asarray(getattr(self, name)).ravel()
+            results.append(np.where(valid, flat[flat_index] * (1 - fraction) + flat[flat_index + 1] * fraction, np.nan))
+
+        horizon = valid & (scan_angle > max_angle - HORIZON_BAND)
+        if np.any(horizon):
+            exact = self._exact(scan_angle[horizon], height[horizon])
+            for result, name in zip(results, fields):
+                result[horizon] = exact[name]
+        return results
+
+    def lookup(self, scan_angle, height):
+        """查表得到 (终端仰角, 星地距离)，与 calculate_geometric_parameters 返回顺序一致"""
+        elevation, distance = self._interpolate(("elevation", "distance"), scan_angle, height)
+        return elevation, distance
+
+    def free_space_loss(self, scan_angle, height, frequency):
+        """查表得到自由空间损耗，并按 20*log10(f/f_ref) 换算到目标频率(GHz)"""
+        path_loss, = self._interpolate(("path_loss",), scan_angle, height)
+        return path_loss + 20 * np.log10(np.asarray(frequency, dtype=float) / self.reference_frequency)
+
+
+def build_geometry_table(heights, resolution=0.01, reference_frequency=2.0, calculator=None):
+    """
+    预计算几何查找表
+    :param heights: 轨道高度列表 (km)
+    :param resolution: 扫描角网格间隔 (度)。距地平线 HORIZON_BAND 度以外的线性插值误差约为
+                       仰角 0.85*resolution² 度、星地距离 105*resolution² km（300~36000 km 轨道实测），
+                       即 resolution=0.01 时小于 1e-4 度、0.011 km；地平线附近的样本直接计算，没有插值误差
+    :param reference_frequency: 自由空间损耗参考频率 (GHz)
+    :param calculator: 用于求解几何的 LinkCalculator，默认新建
+    """
+    calculator = calculator or LinkCalculator(geometry_cache_size=0)
+    heights = np.unique(np.asarray(heights, dtype=float))
+    if heights.size == 0 or np.any(heights <= 0):
+        raise ValueError("轨道高度必须大于0")
+    r = calculator.earth_radius
+    max_angle = np.degrees(np.arcsin(r / (r + heights)))
+    scan_angle = np.arange(0, max_angle.max() + 2 * resolution, resolution)
+
+    elevation = np.empty((len(heights), len(scan_angle)))
+    distance = np.empty_like(elevation)
+    for i, (height, limit) in enumerate(zip(heights, max_angle)):
+        valid = scan_angle < limit
+        elevation[i, valid], distance[i, valid] = calculator.calculate_geometric_parameters(scan_angle[valid], height)
+        # 地平线以外的网格点填充地平线处的值（仰角0°，切线距离），保证最后一个网格区间可插值
+        elevation[i, ~valid] = 0.0
+        distance[i, ~valid] = np.sqrt((r + height) ** 2 - r ** 2)
+    path_loss = calculator.calculate_freespace_path_loss(reference_frequency, distance)
+    return GeometryTable(heights, scan_angle, max_angle, elevation, distance, path_loss, reference_frequency)
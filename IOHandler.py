@@ -10,6 +10,8 @@ import tkinter as tk
 import customtkinter as ctk
 from SafeMath import safe_eval, format_result
 from parameters import PARAM_MAPPING, PARAM_GROUPS, PARAM_GROUP_NAMES, FLAG_DEFAULTS, RESULT_CATEGORIES
+from LinkResult import as_record
+from Scenario import Scenario, SCENARIO_FORMAT_VERSION, DEFAULT_SCENARIO, DEFAULT_LOS_CONDITION
 
 GROUP_TITLE_FONT = ("微软雅黑", 12, "bold")
 GROUP_TITLE_COLOR = "#165DFF"
@@ -26,6 +28,7 @@ class InputHandler:
         self.defaults = {p: v.get() for p, v in self.params.items()}
         self.entries = {}
         self.raw_formulas = {}  # 存储原始公式
+        self.on_change = None  # 实时计算回调：参数、勾选框或场景变化时以参数名调用
 
     def create_input_form(self, parent):
         # 创建标题和滚动区域
@@ -107,19 +110,19 @@ class InputHandler:
         ctk.CTkLabel(scenario_frame, text="地面场景:").grid(row=0, column=0, padx=5)
         self.scenario_var = tk.StringVar(value='城市宏蜂窝UMa')
         ctk.CTkRadioButton(scenario_frame, text="城市宏蜂窝UMa", variable=self.scenario_var, 
-                         value='城市宏蜂窝UMa').grid(row=0, column=1)
+                         value='城市宏蜂窝UMa', command=lambda: self.notify_change('scenario')).grid(row=0, column=1)
         ctk.CTkRadioButton(scenario_frame, text="农村宏蜂窝RMa", variable=self.scenario_var,
-                         value='农村宏蜂窝RMa').grid(row=0, column=2)
+                         value='农村宏蜂窝RMa', command=lambda: self.notify_change('scenario')).grid(row=0, column=2)
 
         # 传播条件
         ctk.CTkLabel(scenario_frame, text="链路状态:").grid(row=1, column=0, padx=5, pady=(10,0))
         self.los_var = tk.StringVar(value='LoS')
         ctk.CTkRadioButton(scenario_frame, text="LoS", variable=self.los_var, 
-                         value='LoS').grid(row=1, column=1, pady=(10,0))
+                         value='LoS', command=lambda: self.notify_change('los_condition')).grid(row=1, column=1, pady=(10,0))
         ctk.CTkRadioButton(scenario_frame, text="NLoS", variable=self.los_var,
-                         value='NLoS').grid(row=1, column=2, pady=(10,0))
+                         value='NLoS', command=lambda: self.notify_change('los_condition')).grid(row=1, column=2, pady=(10,0))
         ctk.CTkRadioButton(scenario_frame, text="LoS/NLoS概率加权", variable=self.los_var,
-                         value='LoS/NLoS概率加权').grid(row=1, column=3, pady=(10,0))
+                         value='LoS/NLoS概率加权', command=lambda: self.notify_change('los_condition')).grid(row=1, column=3, pady=(10,0))
 
     def create_group_title(self, parent, title, font, color):
         title_label = ctk.CTkLabel(
@@ -160,6 +163,7 @@ class InputHandler:
 
         entry.bind("<FocusIn>", lambda event, p=param: self.on_entry_focus_in(event, p))
         entry.bind("<FocusOut>", lambda event, p=param: self.on_entry_focus_out(event, p))
+        entry.bind("<KeyRelease>", lambda event, p=param: self.notify_change(p))
 
     def create_param_entry_with_checkbox(self, parent, param, label_text, compact=False):
         frame = ctk.CTkFrame(parent, fg_color="transparent")
@@ -197,6 +201,7 @@ class InputHandler:
 
         entry.bind("<FocusIn>", lambda event, p=param: self.on_entry_focus_in(event, p))
         entry.bind("<FocusOut>", lambda event, p=param: self.on_entry_focus_out(event, p))
+        entry.bind("<KeyRelease>", lambda event, p=param: self.notify_change(p))
 
         if flag_key:
             entry.configure(state="normal" if flag_var.get() else "disabled")
@@ -219,6 +224,11 @@ class InputHandler:
     def toggle_entry_state(self, param, flag_var):
         entry = self.entries[param]
         entry.configure(state="normal" if flag_var.get() else "disabled")
+        self.notify_change(param)
+
+    def notify_change(self, param):
+        if self.on_change is not None:
+            self.on_change(param)
 
     def get_numeric_value2(self, param, default=0):
         """获取数值（支持公式计算）"""
@@ -247,6 +257,19 @@ class InputHandler:
             result = safe_eval(expr)
             return float(result) if result is not None else 0
 
+    def peek_numeric_value(self, param):
+        """解析输入框当前内容但不回写格式化结果、不弹出错误框（供实时计算使用）
+        无法解析时抛出 ValueError
+        """
+        expr = self.params[param].get()
+        try:
+            return float(expr)
+        except ValueError:
+            result = safe_eval(expr, sign_massagebox=False)
+            if result is None:
+                raise ValueError(f"{PARAM_MAPPING[param]['ch_name']} 输入无效: {expr}")
+            return float(result)
+
     def reset_params(self):
         """重置所有参数输入和标志位状态"""
         # 获取当前链路类型配置
@@ -300,6 +323,38 @@ class InputHandler:
             'los_condition': self.los_var.get(),
         }
 
+    def to_scenario(self, options=None, name=""):
+        """把当前输入（保留原始公式）、勾选状态和地面场景选择导出为 Scenario，内容经过 Scenario 校验"""
+        data = {
+            "version": SCENARIO_FORMAT_VERSION,
+            "name": name,
+            "link_type": self.link_type,
+            "params": {param: self.raw_formulas.get(param) or var.get() for param, var in self.params.items()},
+            "flags": {flag_name: var.get() for flag_name, var in self.flags.items()},
+            "options": dict(options or {}),
+        }
+        if hasattr(self, 'scenario_var'):
+            data.update(self.get_terrestrial_link_parameters())
+        return Scenario.from_dict(data)
+
+    def apply_scenario(self, scenario):
+        """把场景的参数（公式原样放入输入框）、勾选状态和地面场景选择写入界面，链路类型需与当前一致"""
+        if scenario.link_type != self.link_type:
+            raise ValueError(f"场景链路类型 {scenario.link_type} 与当前链路类型 {self.link_type} 不一致")
+        for param, var in self.params.items():
+            value = str(scenario.params.get(param, self.defaults.get(param, "")))
+            var.set(value)
+            self.raw_formulas[param] = value
+        for flag_name, var in self.flags.items():
+            var.set(scenario.enabled(flag_name))
+        for param, entry in self.entries.items():
+            if param in self.flags:
+                entry.configure(state="normal" if self.flags[param].get() else "disabled")
+        if hasattr(self, 'scenario_var'):
+            self.scenario_var.set(scenario.scenario or DEFAULT_SCENARIO)
+            self.los_var.set(scenario.los_condition or DEFAULT_LOS_CONDITION)
+        self.notify_change(None)
+
 # 结果显示类
 class ResultDisplay:
     def __init__(self):
@@ -311,7 +366,10 @@ class ResultDisplay:
         self.parent.pack_propagate(False)  # 禁止自动调整大小
 
     def update_results(self, results, link_type):
-        """优化后的结果更新方法（修复重复显示问题）"""
+        """优化后的结果更新方法（修复重复显示问题）
+        results 可以是结果字典、LinkResult 或 LinkResultBatch（显示第一个场景）
+        """
+        results = as_record(results)
         # 清除旧结果（包括所有子组件和框架引用）
         for widget in self.parent.winfo_children():
             widget.destroy()
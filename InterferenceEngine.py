@@ -0,0 +1,193 @@
+"""
+InterferenceEngine.py
+功能：
+1. 多波束/多卫星同频干扰聚合：给定各干扰波束的卫星位置、波束指向、EIRP谱密度和波束增益方向图，
+   计算每个终端收到的干扰功率谱密度（线性域求和），并给出贡献最大的若干个干扰波束。
+2. 终端×干扰波束 的几何量用矩阵乘法一次算出（离轴角、星地距离、终端仰角），
+   按 终端块 × 波束块 分块累加，10k × 10k 规模下内存占用只取决于块大小。
+3. 路径损耗、C/(N+I) 复用 LinkCalculator 的 calculate_freespace_path_loss / calculate_cni / calculate_noise_psd。
+
+单位约定：EIRP谱密度 dBW/MHz，干扰/信号功率谱密度 dBm/MHz（与 LinkCalculator 一致）。
+
+示例：
+beams = BeamSet.from_ground_points(sat_positions, beam_lat, beam_lon, eirp_density=34)
+engine = InterferenceEngine(beams, frequency=2.0, rx_antenna_gain=0)
+result = engine.evaluate(terminal_lat, terminal_lon, serving_beam, rx_noise_figure=7, rx_noise_temp=290, top_k=5)
+result["c_to_n_plus_i"], result["top_beams"], result["top_psd"]
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from CoverageMap import unit_vectors
+from LinkCalculator import LinkCalculator
+
+
+def default_beam_pattern(theta_3db=2.0, floor=-30.0):
+    """
+    默认波束方向图（相对增益，dB）：主瓣 -12(θ/θ3dB)^2，旁瓣电平不低于 floor
+    返回以离轴角 (度) 为参数的函数
+    """
+    def pattern(off_axis):
+        return np.maximum(-12.0 * (off_axis / theta_3db) ** 2, floor)
+    return pattern
+
+
+@dataclass
+class BeamSet:
+    """
+    波束集合
+    satellite_position: (M, 3) 卫星地固坐标 (km)
+    boresight: (M, 3) 波束指向单位向量
+    eirp_density: (M,) 波束中心 EIRP 谱密度 (dBW/MHz)
+    """
+    satellite_position: np.ndarray
+    boresight: np.ndarray
+    eirp_density: np.ndarray
+
+    @classmethod
+    def from_ground_points(cls, satellite_position, latitude, longitude, eirp_density, earth_radius=6371):
+        """由卫星位置和波束中心地面点（纬度、经度，度）构造波束"""
+        satellite_position = np.atleast_2d(np.asarray(satellite_position, dtype=float))
+        centre = unit_vectors(np.asarray(latitude, dtype=float), np.asarray(longitude, dtype=float)) * earth_radius
+        boresight = centre - satellite_position
+        boresight /= np.linalg.norm(boresight, axis=-1, keepdims=True)
+        eirp_density = np.broadcast_to(np.asarray(eirp_density, dtype=float), len(satellite_position)).copy()
+        return cls(satellite_position, boresight, eirp_density)
+
+    def __len__(self):
+        return len(self.satellite_position)
+
+
+class InterferenceEngine:
+    """同频干扰聚合引擎"""
+
+    def __init__(self, beams, frequency, rx_antenna_gain=0.0, pattern=None, extra_loss=0.0,
+                 calculator=None, terminal_chunk=1024, beam_chunk=1024):
+        """
+        :param beams: BeamSet
+        :param frequency: 频率 (GHz)
+        :param rx_antenna_gain: 终端接收天线增益 (dBi)
+        :param pattern: 波束方向图函数 离轴角(度) → 相对增益(dB)，默认 default_beam_pattern()；
+                        也可用 AntennaPattern 的增益表，如 pattern_table({"type": "S.1528", ...}).relative_gain
+        :param extra_loss: 其他附加损耗（大气、极化等，dB）
+        """
+        self.beams = beams
+        self.frequency = frequency
+        self.rx_antenna_gain = rx_antenna_gain
+        self.pattern = pattern or default_beam_pattern()
+        self.extra_loss = extra_loss
+        self.calculator = calculator or LinkCalculator(geometry_cache_size=0)
+        self.terminal_chunk = terminal_chunk
+        self.beam_chunk = beam_chunk
+
+    def _terminal_positions(self, latitude, longitude):
+        return unit_vectors(np.asarray(latitude, dtype=float), np.asarray(longitude, dtype=float)).reshape(-1, 3)
+
+    def _psd(self, projection, position_norm2, terminal_boresight, position_boresight, eirp_density):
+        """
+        由点积计算接收功率谱密度 (dBm/MHz)，终端地平线以下为 -inf
+        projection = T̂·S，position_norm2 = |S|²，terminal_boresight = T̂·B，position_boresight = S·B，
+        T̂ 为终端单位向量、S 为卫星位置、B 为波束指向；各量可广播（矩阵或逐行）
+        """
+        r = self.calculator.earth_radius
+        # |T - S|^2 = R^2 + |S|^2 - 2 T·S，其中 T = R * 终端单位向量
+        distance = np.sqrt(np.maximum(r ** 2 + position_norm2 - 2 * r * projection, 0))
+        # 离轴角：波束指向与 卫星→终端 方向的夹角
+        cos_off_axis = (r * terminal_boresight - position_boresight) / distance
+        off_axis = np.degrees(np.arccos(np.clip(cos_off_axis, -1, 1)))
+        psd = (eirp_density + 30 + self.pattern(off_axis) + self.rx_antenna_gain
+               - self.calculator.calculate_freespace_path_loss(self.frequency, distance) - self.extra_loss)
+        # 终端仰角 sin(el) = (T̂·S - R) / d，低于地平线不可见
+        return np.where(projection - r > 0, psd, -np.inf)
+
+    def received_psd(self, terminal_unit, beam_slice):
+        """终端块 × 波束块 的接收功率谱密度矩阵 (dBm/MHz)，终端地平线以下的波束为 -inf"""
+        position = self.beams.satellite_position[beam_slice]
+        boresight = self.beams.boresight[beam_slice]
+        return self._psd(terminal_unit @ position.T, np.einsum("ij,ij->i", position, position),
+                         terminal_unit @ boresight.T, np.einsum("ij,ij->i", position, boresight),
+                         self.beams.eirp_density[beam_slice])
+
+    def beam_psd(self, terminal_unit, beam_index):
+        """每个终端从各自指定波束收到的功率谱密度 (dBm/MHz)：beam_index 为 (N,) 波束下标，逐行取波束参数"""
+        position = self.beams.satellite_position[beam_index]
+        boresight = self.beams.boresight[beam_index]
+        return self._psd(np.einsum("ij,ij->i", terminal_unit, position), np.einsum("ij,ij->i", position, position),
+                         np.einsum("ij,ij->i", terminal_unit, boresight), np.einsum("ij,ij->i", position, boresight),
+                         self.beams.eirp_density[beam_index])
+
+    def aggregate(self, latitude, longitude, exclude=None, top_k=5):
+        """
+        计算每个终端的聚合干扰
+        :param exclude: (N,) 每个终端不计入干扰的波束下标（通常为服务波束），None 表示全部计入
+        :return: {"interference_psd": (N,) dBm/MHz, "top_beams": (N, k) 波束下标（不足时为 -1）, "top_psd": (N, k) dBm/MHz}
+        """
+        terminals = self._terminal_positions(latitude, longitude)
+        count = len(terminals)
+        k = min(top_k, len(self.beams))
+        exclude = None if exclude is None else np.broadcast_to(np.asarray(exclude), count)
+        total = np.zeros(count)
+        top_beams = np.full((count, k), -1, dtype=np.intp)
+        top_psd = np.full((count, k), -np.inf)
+
+        for start in range(0, count, self.terminal_chunk):
+            rows = slice(start, min(start + self.terminal_chunk, count))
+            block_total = np.zeros(rows.stop - rows.start)
+            best_beams, best_psd = top_beams[rows], top_psd[rows]
+            for beam_start in range(0, len(self.beams), self.beam_chunk):
+                columns = slice(beam_start, min(beam_start + self.beam_chunk, len(self.beams)))
+                psd = self.received_psd(terminals[rows], columns)
+                if exclude is not None:
+                    own = exclude[rows] - beam_start
+                    inside = (own >= 0) & (own < psd.shape[1])
+                    psd[np.flatnonzero(inside), own[inside]] = -np.inf
+                block_total += (10 ** (psd / 10)).sum(axis=1)
+                best_beams, best_psd = _merge_top(best_beams, best_psd, psd, beam_start, k)
+            total[rows] = block_total
+            top_beams[rows], top_psd[rows] = best_beams, best_psd
+
+        with np.errstate(divide="ignore"):
+            interference_psd = 10 * np.log10(total)
+        return {"interference_psd": interference_psd, "top_beams": top_beams, "top_psd": top_psd}
+
+    def evaluate(self, latitude, longitude, serving_beam, rx_noise_figure, rx_noise_temp,
+                 external_interference_psd=-np.inf, top_k=5):
+        """
+        每个终端的 C/N、C/(N+I) 和主要干扰源
+        :param serving_beam: (N,) 服务波束下标，其余波束均视为同频干扰
+        :param external_interference_psd: 额外的外部干扰功率谱密度 (dBm/MHz)，与聚合干扰线性相加
+        """
+        terminals = self._terminal_positions(latitude, longitude)
+        serving_beam = np.broadcast_to(np.asarray(serving_beam), len(terminals))
+        signal = self.beam_psd(terminals, serving_beam)
+
+        result = self.aggregate(latitude, longitude, exclude=serving_beam, top_k=top_k)
+        with np.errstate(divide="ignore"):
+            interference_psd = 10 * np.log10(10 ** (result["interference_psd"] / 10) + 10 ** (external_interference_psd / 10))
+        noise_psd = self.calculator.calculate_noise_psd(rx_noise_figure, rx_noise_temp)
+        c_to_n = signal - noise_psd
+        result.update({
+            "received_signal_psd": signal,
+            "noise_psd": noise_psd,
+            "interference_psd": interference_psd,
+            "c_to_n": c_to_n,
+            "c_to_n_plus_i": self.calculator.calculate_cni(c_to_n, signal, noise_psd, interference_psd),
+        })
+        return result
+
+
+def _merge_top(best_beams, best_psd, psd, offset, k):
+    """把当前波束块的最大 k 个贡献与已有的前 k 个合并"""
+    if psd.shape[1] > k:
+        candidates = np.argpartition(psd, -k, axis=1)[:, -k:]
+    else:
+        candidates = np.broadcast_to(np.arange(psd.shape[1]), psd.shape)
+    candidate_psd = np.take_along_axis(psd, candidates, axis=1)
+    merged_psd = np.concatenate([best_psd, candidate_psd], axis=1)
+    merged_beams = np.concatenate([best_beams, candidates + offset], axis=1)
+    order = np.argsort(-merged_psd, axis=1)[:, :k]
+    merged_psd = np.take_along_axis(merged_psd, order, axis=1)
+    merged_beams = np.where(np.isneginf(merged_psd), -1, np.take_along_axis(merged_beams, order, axis=1))
+    return merged_beams, merged_psd
@@ -8,9 +8,12 @@ LinkCalculator.py
 - input_params: 包含链路相关的所有输入参数的字典。
 - link_type: 链路类型，字符串，可选值为"星-地上行"、"星-地下行"、"地-地上行"、"地-地下行"。
 输出：
-- 计算结果的字典，包含各种链路参数的计算值。
+- 计算结果的字典，包含各种链路参数的计算值；批量计算为列式字典。
+  另有 perform_calculations_record（__slots__ 记录 LinkResult）和 perform_calculations_columnar（LinkResultBatch），见 LinkResult.py。
 注意：
 - 输入参数的格式和名称应与具体的链路类型相匹配。
+- 单点（math 标量）和批量（NumPy）计算共用 _calculate 流程，各项损耗和链路量由 calculate_* / *_for 方法按 xp 参数（math 或 np）计算，
+  LinkGraph 的各节点也调用同一组方法，新增损耗项只需修改一处。
 - 计算过程中可能涉及到的物理公式和常量应在代码中明确定义。
 - 结果的精度和单位应与具体的应用场景相匹配。
 - 对于卫星链路，需要根据卫星的高度和扫描角计算卫星的仰角和距离。
@@ -19,66 +22,189 @@ LinkCalculator.py
 - 对于地面链路，需要根据距离和场景计算路径损耗。
 """
 
+import inspect
 import math
-from ChannelModel_3GPP38901 import pathLoss_3GPP38901
+from collections import OrderedDict
+import numpy as np
+from AntennaPattern import off_axis_angle, pattern_table, scan_roll_off_loss
+from ChannelModel_3GPP38901 import pathLoss_3GPP38901, pathLoss_3GPP38901_batch
+from LinkResult import LinkResult, LinkResultBatch
+from GasAbsorption import gaseous_attenuation
+from RainModel import rain_attenuation
+
+# rain_model 为 "P.618" 时传给 RainModel.rain_attenuation 的可选参数
+RAIN_MODEL_PARAMS = ("exceedance_percentage", "polarization_tilt", "latitude", "rain_height", "station_height")
+# 上述参数的缺省值（详细计算步骤中显示）
+RAIN_MODEL_DEFAULTS = {name: param.default for name, param in inspect.signature(rain_attenuation).parameters.items()
+                       if name in RAIN_MODEL_PARAMS}
+# atmospheric_model 为 "P.676" 时传给 GasAbsorption.gaseous_attenuation 的可选参数
+GAS_MODEL_PARAMS = ("surface_pressure", "surface_temperature", "water_vapour_density")
+# beam_pattern 的离轴角由几何计算时使用的参数：波束指向的扫描角、波束方位角、终端方位角 (度)
+BEAM_GEOMETRY_PARAMS = ("beam_scan_angle", "beam_azimuth", "terminal_azimuth")
+
+SATELLITE_LINK_TYPES = ["星-地上行", "星-地下行"]
+TERRESTRIAL_LINK_TYPES = ["地-地上行", "地-地下行"]
+# 3GPP TR 38.901 路损模型的适用距离 (m)：在此范围内标量模型与向量化模型结果一致，范围外向量化模型给出 NaN
+TERRESTRIAL_DISTANCE_RANGE = {"农村宏蜂窝RMa": (10, 10e3), "城市宏蜂窝UMa": (10, 5e3)}
+
+
+class GeometryCache:
+    """
+    几何参数缓存：(卫星扫描角, 卫星高度) → (终端仰角, 星地距离)
+    有界LRU缓存，带命中/未命中计数，用于逐点调用（界面计算、脚本what-if循环、逐行批处理）。
+    数组输入直接交给向量化求解：实测对10^6点先去重再查缓存比直接做三角运算慢约3倍，
+    大规模数组的几何复用请使用预计算查找表（GeometryTable）。
+    """
+
+    def __init__(self, solver, maxsize=65536):
+        self.solver = solver
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __call__(self, scan_angle, height):
+        if np.ndim(scan_angle) or np.ndim(height):
+            return self.solver(scan_angle, height)
+        return self.scalar(scan_angle, height)
+
+    def scalar(self, scan_angle, height):
+        """标量输入的缓存查找，返回 (终端仰角, 星地距离) 两个 float"""
+        key = (float(scan_angle), float(height))
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            elevation, distance = self.solver(scan_angle, height)
+            value = (float(elevation), float(distance))
+            self._store(key, value)
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return value
+
+    def _store(self, key, value):
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def cache_info(self):
+        """返回缓存统计信息"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
 class LinkCalculator:
-    def __init__(self):
+    def __init__(self, geometry_cache_size=65536, geometry_table=None):
         # 地球半径 (km)
         self.earth_radius = 6371
         # 玻尔兹曼常数 (J/K)
         self.BOLTZMANN_CONSTANT = 1.38e-23
+        # 几何参数缓存（0 表示不缓存）
+        self.geometry_cache = GeometryCache(self.calculate_geometric_parameters, geometry_cache_size) if geometry_cache_size else None
+        # 预计算几何查找表（GeometryTable），标量和批量计算都对表内壳层高度插值查表
+        self.geometry_table = geometry_table
 
     def perform_calculations(self, input_params, link_type):
-        """通用链路计算函数"""
+        """通用链路计算函数，返回结果字典
+        数值参数全部为标量时按 math 标量计算（_calculate(..., math)），值为 float；含数组时走 _calculate_block，值为广播后的数组
+        """
+        if _all_scalar(input_params):
+            return self._calculate(input_params, link_type, math)
+        keys, block = self._calculate_block(input_params, link_type)
+        if block.ndim == 1:
+            return dict(zip(keys, block.tolist()))
+        return {key: block[row] for row, key in enumerate(keys)}
+
+    def perform_calculations_record(self, input_params, link_type):
+        """单点计算，返回 LinkResult（__slots__ 记录，支持 results.c_to_n、results["c_to_n"] 等访问）"""
+        return LinkResult.from_dict(self.perform_calculations(input_params, link_type))
+
+    def perform_calculations_batch(self, input_params, link_type):
+        """批量链路计算函数（NumPy 向量化）
+
+        参数：
+        input_params: 参数字典，数值参数可以是标量或等长（可广播）的数组，
+                      例如 {"satellite_scan_angle": np.linspace(0, 50, 10**6), "tx_eirp": 56, ...}
+        link_type: 链路类型，"星-地上行"、"星-地下行"、"地-地上行"、"地-地下行"
+        返回：
+        列式结果字典，每个键对应一个广播后形状相同的 ndarray（同一块连续内存的视图）
+        """
+        keys, block = self._calculate_block(input_params, link_type)
+        return {key: block[row] for row, key in enumerate(keys)}
+
+    def perform_calculations_columnar(self, input_params, link_type):
+        """批量链路计算，返回 LinkResultBatch（列式容器，广播形状展平为一维）"""
+        keys, block = self._calculate_block(input_params, link_type)
+        return LinkResultBatch(keys, block.reshape(len(keys), -1))
+
+    def _calculate_block(self, input_params, link_type):
+        """计算全部结果，返回 (结果键列表, 形状为 (键数, *广播形状) 的 float64 数组)"""
+        results = self._calculate(input_params, link_type, np)
+        # 广播为统一形状后写入同一块内存，每个结果键占一行
+        keys = list(results)
+        columns = np.broadcast_arrays(*(np.asarray(results[key], dtype=float) for key in keys))
+        block = np.empty((len(keys),) + columns[0].shape)
+        for row, column in enumerate(columns):
+            block[row] = column
+        return keys, block
+
+    def _calculate(self, input_params, link_type, xp):
+        """
+        链路计算流程，标量路径和向量化路径共用：各项损耗和链路量都由下面的 calculate_* / *_for 方法计算
+        xp 为 math 时参数均为标量，结果为 float（不经过 NumPy）；为 np 时参数转为数组，结果按广播形状计算
+        """
+        num = float if xp is math else _float_array
         # 公共参数获取
-        freq = input_params["frequency"]
-        bandwidth = input_params["bandwidth"]
-        eirp = input_params["tx_eirp"]
-        ant_gain = input_params["rx_antenna_gain"]
-        nf = input_params["rx_noise_figure"]
-        t_antenna = input_params["rx_noise_temp"]
-        interference_psd = input_params.get("interference_psd", -math.inf)
+        freq = num(input_params["frequency"])
+        bandwidth = num(input_params["bandwidth"])
+        eirp = num(input_params["tx_eirp"])
+        ant_gain = num(input_params["rx_antenna_gain"])
+        nf = num(input_params["rx_noise_figure"])
+        t_antenna = num(input_params["rx_noise_temp"])
+        interference_psd = num(input_params.get("interference_psd", -math.inf))
 
         # 链路类型判断
-        if link_type in ["星-地上行", "星-地下行"]: 
+        if link_type in SATELLITE_LINK_TYPES:
             # 卫星链路特有参数
-            scan_angle = input_params["satellite_scan_angle"]
-            height = input_params["satellite_height"]
-            terminal_elevation_angle, distance = self.calculate_geometric_parameters(scan_angle, height)
-            
+            scan_angle = num(input_params["satellite_scan_angle"])
+            height = num(input_params["satellite_height"])
+            terminal_elevation_angle, distance = self.cached_geometric_parameters(scan_angle, height, xp)
+
             # 卫星特有损耗计算
-            path_loss = self.calculate_freespace_path_loss(freq, distance)
-            rain_fade = self.calculate_rain_fade(freq, terminal_elevation_angle, 
-                                               input_params.get("rain_rate", 0)) if "rain_rate" in input_params else 0
+            path_loss = self.calculate_freespace_path_loss(freq, distance, xp)
+            rain_fade = self.rain_fade_for(input_params, freq, terminal_elevation_angle, xp)
+            atmos_loss = self.atmospheric_loss_for(input_params, freq, terminal_elevation_angle, xp)
+            scan_loss = self.scan_loss_for(input_params, scan_angle, xp)
         else:
             # 地面链路参数
-            distance = input_params["distance"]
-            scene = input_params["scenario"]
-            los_condition = input_params["los_condition"]
-            path_loss = pathLoss_3GPP38901(freq, distance*1000, scene, los_condition)
-            rain_fade = 0
+            scan_angle = None
+            distance = num(input_params["distance"])
+            path_loss = self.terrestrial_path_loss(freq, distance, input_params["scenario"],
+                                                   input_params["los_condition"], xp)
+            rain_fade = 0.0
+            atmos_loss = num(input_params.get("atmospheric_loss", 0))
+            scan_loss = num(input_params.get("scan_loss", 0))
 
         # 公共损耗计算
-        atmos_loss = input_params.get("atmospheric_loss", 0)
-        scint_loss = input_params.get("scintillation_loss", 0)
-        pol_loss = input_params.get("polarization_loss", 0)
-        beam_loss = input_params.get("beam_edge_loss", 0)
-        scan_loss = input_params.get("scan_loss", 0)
-        link_margin = input_params.get("link_margin", 0)
-        
-        total_loss = self.calculate_total_loss(atmos_loss, scint_loss, pol_loss, 
-                                             path_loss, rain_fade, link_margin, 
-                                             beam_loss, scan_loss)
+        beam_loss = self.beam_edge_loss_for(input_params, scan_angle, xp)
+        total_loss = self.calculate_total_loss(atmos_loss, num(input_params.get("scintillation_loss", 0)),
+                                               num(input_params.get("polarization_loss", 0)),
+                                               path_loss, rain_fade, num(input_params.get("link_margin", 0)),
+                                               beam_loss, scan_loss, num(input_params.get("pointing_loss", 0)))
 
         # 公共计算流程
-        noise_psd = self.calculate_noise_psd(nf, t_antenna)
-        received_signal_psd, _ = self.calculate_received_signal(eirp, total_loss, ant_gain, bandwidth)
-        
+        noise_psd = self.calculate_noise_psd(nf, t_antenna, xp)
+        received_signal_psd, _ = self.calculate_received_signal(eirp, total_loss, ant_gain, bandwidth, xp)
+
         c_to_n = received_signal_psd - noise_psd
-        c_to_n_plus_i = self.calculate_cni(c_to_n, received_signal_psd, noise_psd, interference_psd)
-        gt_ratio = self.calculate_gt_ratio(ant_gain, nf, t_antenna)
+        c_to_n_plus_i = self.calculate_cni(c_to_n, received_signal_psd, noise_psd, interference_psd, xp)
+        gt_ratio = self.calculate_gt_ratio(ant_gain, nf, t_antenna, xp)
 
-        achievable_rate = self.calculate_achievable_rate(c_to_n_plus_i, bandwidth)
+        achievable_rate = self.calculate_achievable_rate(c_to_n_plus_i, bandwidth, xp)
 
         # 结果组装
         results = {
@@ -92,7 +218,7 @@ class LinkCalculator:
             "achievable_rate": achievable_rate
         }
 
-        if link_type in ["星-地上行", "星-地下行"]: 
+        if link_type in SATELLITE_LINK_TYPES:
             results.update({
                 "terminal_elevation_angle": terminal_elevation_angle,
                 "distance": distance,
@@ -100,19 +226,103 @@ class LinkCalculator:
             })
         else:
             results["distance"] = distance
-
         return results
 
-    def calculate_cni(self, c_to_n, received_psd, noise_psd, interference_psd):
-        """计算C/(N+I)的公共方法"""
-        if interference_psd != -math.inf:
-            c_linear = 10 ** (received_psd / 10)
-            n_linear = 10 ** (noise_psd / 10)
-            i_linear = 10 ** (interference_psd / 10)
-            return 10 * math.log10(c_linear / (n_linear + i_linear))
-        return c_to_n
+    def run_sweep(self, grid, link_type, workers=None, chunk_size=100000, result_path=None):
+        """多进程参数扫描（详见 SweepExecutor）
+        grid 中标量为固定参数，一维数组为扫描轴（做笛卡尔积），结果写入内存映射文件
+        result_path 为 None 时结果复制到内存后删除临时文件；大规模扫描应给出 result_path，结果直接映射该文件
+        """
+        from SweepExecutor import SweepExecutor
+        with SweepExecutor(workers=workers, chunk_size=chunk_size, result_path=result_path) as executor:
+            results = executor.run(grid, link_type)
+            if result_path is None:
+                results = {key: np.array(value) for key, value in results.items()}
+        return results
 
-    def calculate_achievable_rate(self, cni_db, bandwidth_mhz):
+    def solve_required_eirp(self, input_params, link_type, target, metric="c_to_n_plus_i"):
+        """反向求解：达到目标 C/N 或 C/(N+I) (dB) 所需的最小 tx_eirp (dBW)，闭式解
+        接收信号功率谱密度在 dB 域随 EIRP 等量变化，C/N 和 C/(N+I)（干扰与EIRP无关）也等量变化，
+        因此所需 EIRP = 当前 EIRP + (目标值 - 当前值)。target 可以是数组，一次求解多个目标。
+        """
+        results = self.perform_calculations_batch(input_params, link_type)
+        return np.asarray(input_params["tx_eirp"], dtype=float) + np.asarray(target, dtype=float) - results[metric]
+
+    def solve_max_parameter(self, input_params, link_type, parameter, target, low, high,
+                            metric="c_to_n_plus_i", tolerance=1e-6, max_iterations=200):
+        """反向求解：在 [low, high] 内求 metric 仍不低于 target 的最大参数值（向量化二分法）
+        假设 metric 随参数增大而减小（扫描角、轨道高度、地面距离）。
+        low 处已不满足时返回 NaN，high 处仍满足时返回 high。
+        3GPP 38.901 模型在断点处不连续且超出适用范围时为 NaN（视为不满足），因此使用只依赖符号的二分法。
+        target、low、high 及 input_params 中的数值参数均可为数组（可广播），所有目标同时迭代。
+        """
+        target = np.asarray(target, dtype=float)
+
+        def margin(value):
+            results = self.perform_calculations_batch(dict(input_params, **{parameter: value}), link_type)
+            return results[metric] - target
+
+        low = np.asarray(low, dtype=float)
+        high = np.asarray(high, dtype=float)
+        meets_low = margin(low) >= 0
+        meets_high = margin(high) >= 0
+        shape = np.broadcast_shapes(meets_low.shape, meets_high.shape, low.shape, high.shape)
+        lo = np.broadcast_to(low, shape).copy()
+        hi = np.broadcast_to(high, shape).copy()
+        active = np.broadcast_to(meets_low & ~meets_high, shape)
+        for _ in range(max_iterations):
+            if not np.any(active & (hi - lo > tolerance)):
+                break
+            mid = (lo + hi) / 2
+            meets = np.broadcast_to(margin(mid) >= 0, shape)
+            lo = np.where(active & meets, mid, lo)
+            hi = np.where(active & ~meets, mid, hi)
+        solution = np.where(np.broadcast_to(meets_high, shape), hi, np.where(active, lo, np.nan))
+        return solution if solution.ndim else float(solution)
+
+    def solve_max_scan_angle(self, input_params, link_type, target, metric="c_to_n_plus_i", tolerance=1e-6):
+        """卫星链路：满足目标的最大卫星扫描角 (度)，上限为地平线对应的扫描角"""
+        height = np.asarray(input_params["satellite_height"], dtype=float)
+        horizon = np.degrees(np.arcsin(self.earth_radius / (self.earth_radius + height)))
+        return self.solve_max_parameter(input_params, link_type, "satellite_scan_angle", target,
+                                        0.0, horizon * (1 - 1e-9), metric, tolerance)
+
+    def solve_max_height(self, input_params, link_type, target, low=100.0, high=50000.0,
+                         metric="c_to_n_plus_i", tolerance=1e-4):
+        """卫星链路：给定扫描角下满足目标的最大轨道高度 (km)
+        扫描角不为0时高度上限还受地平线约束 R/sin(扫描角) - R
+        """
+        scan = np.radians(np.asarray(input_params["satellite_scan_angle"], dtype=float))
+        with np.errstate(divide="ignore"):
+            horizon_height = self.earth_radius / np.sin(scan) - self.earth_radius
+        high = np.minimum(high, horizon_height * (1 - 1e-9))
+        return self.solve_max_parameter(input_params, link_type, "satellite_height", target,
+                                        low, high, metric, tolerance)
+
+    def solve_max_distance(self, input_params, link_type, target, low=0.01, high=None,
+                           metric="c_to_n_plus_i", tolerance=1e-6):
+        """地面链路：满足目标的最大距离 (km)，默认上限为 38.901 模型适用范围（UMa 5 km，RMa 10 km）"""
+        if high is None:
+            high = 10.0 if input_params["scenario"] == "农村宏蜂窝RMa" else 5.0
+        return self.solve_max_parameter(input_params, link_type, "distance", target,
+                                        low, high, metric, tolerance)
+
+    def calculate_cni(self, c_to_n, received_psd, noise_psd, interference_psd, xp=np):
+        """计算C/(N+I)的公共方法（支持数组；xp 为 math 时按标量计算）"""
+        if xp is math:
+            if interference_psd == -math.inf:
+                return c_to_n
+            return 10 * math.log10(10 ** (received_psd / 10) / (10 ** (noise_psd / 10) + 10 ** (interference_psd / 10)))
+        interference_psd = np.asarray(interference_psd, dtype=float)
+        if np.all(np.isneginf(interference_psd)):
+            return c_to_n
+        c_linear = 10 ** (received_psd / 10)
+        n_linear = 10 ** (noise_psd / 10)
+        i_linear = 10 ** (interference_psd / 10)
+        cni = 10 * np.log10(c_linear / (n_linear + i_linear))
+        return np.where(np.isneginf(interference_psd), c_to_n, cni)
+
+    def calculate_achievable_rate(self, cni_db, bandwidth_mhz, xp=np):
         """计算可实现速率（Mbps）
         参数：
         cni_db: C/(N+I) 值（dB）
@@ -121,10 +331,35 @@ class LinkCalculator:
         """
         cni_linear = 10 ** (cni_db / 10)
         bandwidth_hz = bandwidth_mhz * 1e6  # 转换为Hz
-        rate_bps = bandwidth_hz * math.log2(1 + cni_linear)
+        rate_bps = bandwidth_hz * xp.log2(1 + cni_linear)
         return rate_bps / 1e6  # 转换为Mbps
 
-    def calculate_geometric_parameters(self, scan_angle_degrees, height):
+    def cached_geometric_parameters(self, scan_angle_degrees, height, xp=np):
+        """带缓存的几何参数计算，返回 (终端仰角, 星地距离)
+        配置了 geometry_table 且高度都在表中壳层内时查表（标量和数组输入相同），否则经缓存或直接计算
+        """
+        if self.geometry_table is not None and self.geometry_table.covers(height):
+            elevation, distance = self.geometry_table.lookup(scan_angle_degrees, height)
+            return (float(elevation), float(distance)) if xp is math else (elevation, distance)
+        if xp is math:
+            if self.geometry_cache is not None:
+                return self.geometry_cache.scalar(scan_angle_degrees, height)
+            return self.calculate_geometric_parameters(scan_angle_degrees, height, math)
+        if self.geometry_cache is None:
+            return self.calculate_geometric_parameters(scan_angle_degrees, height)
+        return self.geometry_cache(scan_angle_degrees, height)
+
+    def horizon_scan_angle(self, height):
+        """地平线（终端仰角0°）对应的卫星扫描角 (度)，calculate_geometric_parameters 要求扫描角小于该值"""
+        return np.degrees(np.arcsin(self.earth_radius / (self.earth_radius + np.asarray(height, dtype=float))))
+
+    def clip_scan_angle(self, scan_angle, height):
+        """把由仰角或地心角换算得到的扫描角限制在地平线以内
+        地平线处的换算结果因舍入可能恰好等于 horizon_scan_angle，此时取刚好小于它的浮点数（仰角约1e-6度）
+        """
+        return np.minimum(scan_angle, np.nextafter(self.horizon_scan_angle(height), 0))
+
+    def calculate_geometric_parameters(self, scan_angle_degrees, height, xp=np):
         """
         计算给定卫星扫描角对应的地面用户仰角
         根据已知条件求解三角形的第三条边和夹角
@@ -132,49 +367,125 @@ class LinkCalculator:
         参数:
         r (float): 第一条边a的长度
         h (float): 第二条边b比第一条边多出的长度
-        scan_angle_degrees (float): 边a和边c的夹角(度)
+        scan_angle_degrees (float 或 ndarray): 边a和边c的夹角(度)
+        xp: np（支持数组）或 math（标量，不经过 NumPy）
         
         返回:
         tuple: (第三条边c的长度, 边b和边c的夹角B(度)-90) 即星地距离 和 终端仰角
         """
-        h = height
         r = self.earth_radius
-        if h <= 0:
-            raise ValueError("h必须大于0，以确保边b > 边a")
-        
-        a, b = r, r + h
-        max_angle = math.degrees(math.asin(a / b))
-        
-        if scan_angle_degrees >= max_angle:
-            raise ValueError(f"扫描角需小于{max_angle:.2f}度")
+        if xp is math:
+            if height <= 0:
+                raise ValueError("h必须大于0，以确保边b > 边a")
+            a, b = r, r + height
+            max_angle = math.degrees(math.asin(a / b))
+            if scan_angle_degrees >= max_angle:
+                raise ValueError(f"扫描角需小于{max_angle:.2f}度")
+            arcsin = math.asin
+        else:
+            h = np.asarray(height, dtype=float)
+            scan_angle_degrees = np.asarray(scan_angle_degrees, dtype=float)
+            if np.any(h <= 0):
+                raise ValueError("h必须大于0，以确保边b > 边a")
+
+            a, b = r, r + h
+            max_angle = self.horizon_scan_angle(h)
+
+            invalid = scan_angle_degrees >= max_angle
+            if np.any(invalid):
+                raise ValueError(f"扫描角需小于{np.broadcast_to(max_angle, invalid.shape)[invalid].min():.2f}度")
+            arcsin = np.arcsin
         
-        A_rad = math.radians(scan_angle_degrees)
-        sin_B = b * math.sin(A_rad) / a
-        B_deg = 180 - math.degrees(math.asin(sin_B))
+        A_rad = xp.radians(scan_angle_degrees)
+        sin_B = b * xp.sin(A_rad) / a
+        B_deg = 180 - xp.degrees(arcsin(sin_B))
         C_deg = 180 - scan_angle_degrees - B_deg
         
         # 使用正确的余弦定理计算边c
-        c = math.sqrt(a**2 + b**2 - 2 * a * b * math.cos(math.radians(C_deg)))
+        c = xp.sqrt(a**2 + b**2 - 2 * a * b * xp.cos(xp.radians(C_deg)))
         
         return  B_deg-90, c
 
-    def calculate_freespace_path_loss(self, freq, distance):
+    def calculate_freespace_path_loss(self, freq, distance, xp=np):
         """计算自由空间路径损耗 (dB)
         公式：L = 92.45 + 20*log10(f) + 20*log10(d)
         其中f为频率(GHz)，d为距离(km)
         """
-        return 92.45 + 20 * math.log10(freq) + 20 * math.log10(distance)
+        return 92.45 + 20 * xp.log10(freq) + 20 * xp.log10(distance)
 
-    def calculate_rain_fade(self, freq, elev_deg, rain_rate):
+    def terrestrial_path_loss(self, freq, distance, scenario, los_condition, xp=np):
+        """地面链路路径损耗 (dB)：3GPP TR 38.901，distance 单位 km
+        xp 为 math 时，在模型适用距离内用标量模型 pathLoss_3GPP38901，范围外与向量化模型一致（NaN 或未知场景报错）
+        """
+        if xp is math:
+            low, high = TERRESTRIAL_DISTANCE_RANGE.get(scenario, (math.inf, -math.inf))
+            if low <= distance * 1000 <= high:
+                return pathLoss_3GPP38901(freq, distance * 1000, scenario, los_condition)
+            return float(pathLoss_3GPP38901_batch(freq, distance * 1000, scenario, los_condition))
+        return pathLoss_3GPP38901_batch(freq, distance * 1000, scenario, los_condition)
+
+    # 以下 *_for 方法按输入参数选择损耗模型；xp 为 math 时返回 float（标量路径），为 np 时返回数组
+
+    def rain_fade_for(self, input_params, freq, elev_deg, xp=np):
+        """按输入参数选择雨衰模型：无 rain_rate 时为0；rain_model 为 "P.618" 时用 RainModel 的 ITU-R P.618/P.838 模型，
+        否则用 calculate_rain_fade 的简化模型
+        """
+        if "rain_rate" not in input_params:
+            return 0.0
+        rain_rate = _numeric(input_params["rain_rate"], xp)
+        if input_params.get("rain_model") == "P.618":
+            return _model_value(rain_attenuation(freq, elev_deg, rain_rate,
+                                                 **{key: input_params[key] for key in RAIN_MODEL_PARAMS
+                                                    if key in input_params}), xp)
+        return self.calculate_rain_fade(freq, elev_deg, rain_rate, xp)
+
+    def atmospheric_loss_for(self, input_params, freq, elev_deg, xp=np):
+        """按输入参数选择大气损耗：atmospheric_model 为 "P.676" 时用 GasAbsorption 的 ITU-R P.676 斜路径气体衰减，
+        否则为常数输入 atmospheric_loss
+        """
+        if input_params.get("atmospheric_model") == "P.676":
+            return _model_value(gaseous_attenuation(freq, elev_deg, **{key: input_params[key] for key in GAS_MODEL_PARAMS
+                                                                       if key in input_params}), xp)
+        return _numeric(input_params.get("atmospheric_loss", 0), xp)
+
+    def off_axis_angle_for(self, input_params, scan_angle=None):
+        """终端相对波束中心的离轴角 (度)：给出 off_axis_angle 时直接使用；卫星链路（scan_angle 为终端扫描角）给出
+        beam_scan_angle 时，按终端方向 (scan_angle, terminal_azimuth) 与波束指向 (beam_scan_angle, beam_azimuth) 的夹角计算
+        （方位角缺省为 0，即终端与波束中心在同一方位面内）；否则返回 None
+        """
+        if "off_axis_angle" in input_params:
+            return input_params["off_axis_angle"]
+        if scan_angle is not None and "beam_scan_angle" in input_params:
+            return off_axis_angle(scan_angle, input_params["beam_scan_angle"],
+                                  input_params.get("terminal_azimuth", 0.0), input_params.get("beam_azimuth", 0.0))
+        return None
+
+    def beam_edge_loss_for(self, input_params, scan_angle=None, xp=np):
+        """波束边缘损耗：给出 beam_pattern（方向图描述，见 AntennaPattern）且能得到离轴角（见 off_axis_angle_for）时
+        按方向图增益表计算，否则为常数输入 beam_edge_loss
+        """
+        if "beam_pattern" in input_params:
+            angle = self.off_axis_angle_for(input_params, scan_angle)
+            if angle is not None:
+                return _model_value(pattern_table(input_params["beam_pattern"]).loss(angle), xp)
+        return _numeric(input_params.get("beam_edge_loss", 0), xp)
+
+    def scan_loss_for(self, input_params, scan_angle, xp=np):
+        """扫描损耗：给出 scan_roll_off（相控阵 cos^n 滚降指数 n）时按卫星扫描角计算，否则为常数输入 scan_loss"""
+        if "scan_roll_off" in input_params:
+            return _model_value(scan_roll_off_loss(scan_angle, input_params["scan_roll_off"]), xp)
+        return _numeric(input_params.get("scan_loss", 0), xp)
+
+    def calculate_rain_fade(self, freq, elev_deg, rain_rate, xp=np):
         """简化的雨衰计算模型
         使用ITU-R P.618建议中的简化公式
         """
         a = 0.0051 * freq**1.41
         b = 0.655 * freq**-0.075
-        Ls = 35 * (math.sin(math.radians(elev_deg)))**-0.6
+        Ls = 35 * (xp.sin(xp.radians(elev_deg)))**-0.6
         return a * (rain_rate ** b) * Ls
 
-    def calculate_noise_psd(self, nf, t_antenna):
+    def calculate_noise_psd(self, nf, t_antenna, xp=np):
         """计算噪声功率谱密度 (dBm/MHz)
         基于噪声系数和天线噪声温度计算
         """
@@ -185,53 +496,80 @@ class LinkCalculator:
         # 计算热噪声功率谱密度：k*T (W/Hz)
         # k = 1.38e-23 J/K (Boltzmann常数)
         # 转换为dBW/Hz: 10*log10(k*T)
-        noise_psd_dbw_hz = 10 * math.log10(self.BOLTZMANN_CONSTANT * t_sys)
+        noise_psd_dbw_hz = 10 * xp.log10(self.BOLTZMANN_CONSTANT * t_sys)
 
         # 转换为dBm/MHz: dBW/Hz + 30(dBW→dBm) + 60(Hz→MHz)
         noise_psd_dbm_mhz = noise_psd_dbw_hz + 30 + 60
 
         return noise_psd_dbm_mhz
 
-    def calculate_total_loss(self, atmos_loss, scint_loss, pol_loss, path_loss, rain_fade, link_margin, beam_loss, scan_loss):
-        """计算总损耗"""
+    def calculate_total_loss(self, atmos_loss, scint_loss, pol_loss, path_loss, rain_fade, link_margin, beam_loss, scan_loss,
+                             pointing_loss=0):
+        """计算总损耗（pointing_loss 为可选输入的终端指向损耗，缺省为 0）"""
         return (atmos_loss + scint_loss + pol_loss + link_margin +
-                beam_loss + scan_loss + path_loss + rain_fade)
+                beam_loss + scan_loss + path_loss + rain_fade + pointing_loss)
 
-    def calculate_received_signal(self, eirp, total_loss, ant_gain, bandwidth):
+    def calculate_received_signal(self, eirp, total_loss, ant_gain, bandwidth, xp=np):
         """计算接收信号功率谱密度"""
         # 计算总接收功率 (dBm)
         # EIRP (dBW) + 30 → dBm - 总损耗 + 天线增益
         total_power_dbm = eirp + 30 - total_loss + ant_gain  # dBW → dBm
 
         # 计算功率谱密度 (dBm/MHz)
-        psd_dbm_mhz = total_power_dbm - 10 * math.log10(bandwidth)
+        psd_dbm_mhz = total_power_dbm - 10 * xp.log10(bandwidth)
 
         return psd_dbm_mhz, total_power_dbm
 
-    def calculate_gt_ratio(self, ant_gain, nf, t_antenna):
+    def calculate_gt_ratio(self, ant_gain, nf, t_antenna, xp=np):
         """计算G/T值 (dB/K)
         G/T是接收系统性能的关键指标，表示接收增益与噪声温度之比
         """
         f_linear = 10 ** (nf / 10)
         t_sys = 290 * (f_linear - 1) + t_antenna
-        return ant_gain - 10 * math.log10(t_sys)
+        return ant_gain - 10 * xp.log10(t_sys)
 
     # 新增：计算 ACIR 的方法
     def calculate_acir(self, aclr, acs):
         """
-        计算 ACIR 的方法
+        计算 ACIR 的方法（支持数组，标量输入返回 float）
         公式：ACIR = 1/(1/ACLR + 1/ACS)
+        ACLR 或 ACS 为 0 表示未给出：标量输入抛出 ValueError，数组输入中对应元素为 NaN，其余元素照常计算
         """
-        if aclr == 0 or acs == 0:
+        aclr = np.asarray(aclr, dtype=float)
+        acs = np.asarray(acs, dtype=float)
+        missing = (aclr == 0) | (acs == 0)
+        if missing.ndim == 0 and missing:
             raise ValueError("ACLR 和 ACS 不能为 0")
         aclr_linear = 10 ** (aclr / 10)
         acs_linear = 10 ** (acs / 10)
         acir_linear = 1 / ((1 / aclr_linear) + (1 / acs_linear))
-        return 10 * math.log10(acir_linear)
+        acir = np.where(missing, np.nan, 10 * np.log10(acir_linear))
+        return float(acir) if acir.ndim == 0 else acir
+
+    def _rain_fade_step(self, input_params, results):
+        """详细计算的雨衰步骤：按 rain_model 显示实际使用的雨衰模型公式和参数"""
+        if input_params.get("rain_model") == "P.618":
+            options = {**RAIN_MODEL_DEFAULTS, **{key: input_params[key] for key in RAIN_MODEL_PARAMS if key in input_params}}
+            return {
+                '步骤': '雨衰',
+                '公式': 'ITU-R P.618：雨衰 = γR * LE\n其中γR=k*R0.01^α为P.838比衰减（与频率、仰角、极化倾角有关），'
+                        'LE为雨顶以下斜路径长度经水平缩短因子和垂直调整因子修正后的有效路径长度，再按时间概率p换算',
+                '参数': f'频率={input_params["frequency"]}GHz, θ={results["terminal_elevation_angle"]:.2f}°, '
+                        f'降雨率R0.01={input_params["rain_rate"]}mm/h, 时间概率p={options["exceedance_percentage"]}%, '
+                        f'极化倾角τ={options["polarization_tilt"]}°, 纬度={options["latitude"]}°, '
+                        f'雨顶高度={options["rain_height"]}km, 地面站海拔={options["station_height"]}km',
+                '结果': f'{results["rain_fade"]:.2f}dB'
+            }
+        return {
+            '步骤': '雨衰',
+            '公式': '雨衰 = a * (降雨率^b) * 路径长度\n其中a=0.0051*频率^1.41, b=0.655*频率^-0.075, 路径长度=35*(sinθ)^-0.6',
+            '参数': f'频率={input_params["frequency"]}GHz, θ={results["terminal_elevation_angle"]:.2f}°, 降雨率={input_params["rain_rate"]}mm/h',
+            '结果': f'{results["rain_fade"]:.2f}dB'
+        }
 
     def detailed_calculation(self, input_params):
         link_type = "星-地上行" if "satellite_scan_angle" in input_params else "地-地上行"
-        if link_type in ["星-地上行", "星-地下行"]:
+        if link_type in SATELLITE_LINK_TYPES:
             results = self.perform_calculations(input_params, link_type)
             geometric_steps = [
                 {
@@ -243,12 +581,17 @@ class LinkCalculator:
             ]
             rain_step = []
             if "rain_rate" in input_params and input_params["rain_rate"] > 0:
-                rain_step = [{
-                    '步骤': '雨衰',
-                    '公式': '雨衰 = a * (降雨率^b) * 路径长度\n其中a=0.0051*频率^1.41, b=0.655*频率^-0.075, 路径长度=35*(sinθ)^-0.6',
-                    '参数': f'频率={input_params["frequency"]}GHz, θ={results["terminal_elevation_angle"]:.2f}°, 降雨率={input_params["rain_rate"]}mm/h',
-                    '结果': f'{results["rain_fade"]:.2f}dB'
-                }]
+                rain_step = [self._rain_fade_step(input_params, results)]
+            atmos_loss = float(self.atmospheric_loss_for(input_params, input_params["frequency"],
+                                                         results["terminal_elevation_angle"]))
+            scan_loss = float(self.scan_loss_for(input_params, input_params["satellite_scan_angle"]))
+            if input_params.get("atmospheric_model") == "P.676":
+                rain_step.append({
+                    '步骤': '大气气体衰减',
+                    '公式': 'ITU-R P.676：大气损耗 = (γo*ho + γw*hw) / sinθ（θ<5°时按地球曲率修正）\n其中γo、γw为氧气、水汽比衰减，ho、hw为等效高度',
+                    '参数': f'频率={input_params["frequency"]}GHz, θ={results["terminal_elevation_angle"]:.2f}°',
+                    '结果': f'{atmos_loss:.2f}dB'
+                })
             path_loss_step = [{
                 '步骤': '路径损耗',
                 '公式': '路径损耗 = 92.45 + 20*log10(频率) + 20*log10(距离)',
@@ -259,6 +602,8 @@ class LinkCalculator:
             results = self.perform_calculations(input_params, link_type)
             geometric_steps = []
             rain_step = []
+            atmos_loss = input_params.get('atmospheric_loss', 0)
+            scan_loss = input_params.get('scan_loss', 0)
             path_loss_step = [{
                 '步骤': '路径损耗',
                 '公式': "3GPP TR 38.901 V18.0.0 (2024-03) \n \
@@ -272,8 +617,8 @@ class LinkCalculator:
         common_steps = [
             {
                 '步骤': '总损耗',
-                '公式': '总损耗 = 路径损耗+雨衰+大气损耗+闪烁损耗+极化损耗+链路余量+波束边缘损耗+扫描损耗' if link_type in ["星-地上行", "星-地下行"] else '总损耗 = 路径损耗+波束边缘损耗',
-                '参数': f"路径损耗={results['path_loss']:.2f}dB, 雨衰={results.get('rain_fade', 0):.2f}dB, 大气损耗={input_params.get('atmospheric_loss', 0)}dB, 闪烁损耗={input_params.get('scintillation_loss', 0)}dB, 极化损耗={input_params.get('polarization_loss', 0)}dB, 链路余量={input_params.get('link_margin', 0)}dB, 波束边缘损耗={input_params.get('beam_edge_loss', 0)}dB, 扫描损耗={input_params.get('scan_loss', 0)}dB",
+                '公式': '总损耗 = 路径损耗+雨衰+大气损耗+闪烁损耗+极化损耗+链路余量+波束边缘损耗+扫描损耗' if link_type in SATELLITE_LINK_TYPES else '总损耗 = 路径损耗+波束边缘损耗',
+                '参数': f"路径损耗={results['path_loss']:.2f}dB, 雨衰={results.get('rain_fade', 0):.2f}dB, 大气损耗={atmos_loss:.2f}dB, 闪烁损耗={input_params.get('scintillation_loss', 0)}dB, 极化损耗={input_params.get('polarization_loss', 0)}dB, 链路余量={input_params.get('link_margin', 0)}dB, 波束边缘损耗={float(self.beam_edge_loss_for(input_params, input_params.get('satellite_scan_angle'))):.2f}dB, 扫描损耗={float(scan_loss):.2f}dB",
                 '结果': f'{results["total_loss"]:.2f}dB'
             },
             {
@@ -368,12 +713,7 @@ class LinkCalculator:
 
             # 添加雨衰计算（如果启用）
             if "rain_rate" in input_params and input_params["rain_rate"] > 0:
-                steps.insert(2, {
-                    '步骤': '雨衰',
-                    '公式': '雨衰 = a * (降雨率^b) * 路径长度\n其中a=0.0051*频率^1.41, b=0.655*频率^-0.075, 路径长度=35*(sinθ)^-0.6',
-                    '参数': f'频率={input_params["frequency"]}GHz, θ={results["terminal_elevation_angle"]:.2f}°, 降雨率={input_params["rain_rate"]}mm/h',
-                    '结果': f'{results["rain_fade"]:.2f}dB'
-                })
+                steps.insert(2, self._rain_fade_step(input_params, results))
 
             return steps
         else:
@@ -429,6 +769,173 @@ class LinkCalculator:
 
 
 
+class LinkGraph:
+    """
+    链路计算依赖图（增量计算）
+    节点：几何 → 路径损耗/雨衰 → 总损耗 → 接收信号功率谱密度 → C/N → C/(N+I) → 可实现速率，
+    噪声功率谱密度和G/T值为独立分支。每个节点缓存计算值，输入参数变化时只使其下游节点失效，
+    下次取结果时按拓扑顺序重算失效节点。结果与 perform_calculations 一致。
+
+    用法：
+    graph = LinkGraph(LinkCalculator(), "星-地下行")
+    graph.update(input_params)          # 首次全量计算
+    results = graph.results()
+    graph.set("rain_rate", 80)          # 只重算 雨衰 → 总损耗 → ... → 可实现速率
+    results = graph.results()
+    """
+
+    def __init__(self, calculator=None, link_type="星-地下行"):
+        self.calculator = calculator or LinkCalculator()
+        self.link_type = link_type
+        self.params = {}
+        self.values = {}
+        # 节点名 → (依赖的输入参数, 依赖的上游节点, 计算函数)，按拓扑顺序排列
+        self.nodes = self._build_nodes(link_type in SATELLITE_LINK_TYPES)
+        self.recompute_counts = {name: 0 for name in self.nodes}
+        self._param_nodes = {}
+        self._children = {name: [] for name in self.nodes}
+        for name, (params, upstream, _) in self.nodes.items():
+            for param in params:
+                self._param_nodes.setdefault(param, []).append(name)
+            for parent in upstream:
+                self._children[parent].append(name)
+
+    def _param(self, name, default=None):
+        value = self.params[name] if default is None else self.params.get(name, default)
+        return np.asarray(value, dtype=float)
+
+    def _build_nodes(self, satellite):
+        calc = self.calculator
+        v = self.values
+        p = self._param
+        nodes = OrderedDict()
+        if satellite:
+            nodes["geometry"] = (("satellite_scan_angle", "satellite_height"), (),
+                                 lambda: calc.cached_geometric_parameters(p("satellite_scan_angle"), p("satellite_height")))
+            nodes["path_loss"] = (("frequency",), ("geometry",),
+                                  lambda: calc.calculate_freespace_path_loss(p("frequency"), v["geometry"][1]))
+            nodes["rain_fade"] = (("frequency", "rain_rate", "rain_model") + RAIN_MODEL_PARAMS, ("geometry",),
+                                  lambda: calc.rain_fade_for(self.params, p("frequency"), v["geometry"][0]))
+            nodes["atmospheric_loss"] = (("frequency", "atmospheric_loss", "atmospheric_model") + GAS_MODEL_PARAMS,
+                                         ("geometry",),
+                                         lambda: calc.atmospheric_loss_for(self.params, p("frequency"), v["geometry"][0]))
+            nodes["scan_loss"] = (("scan_loss", "scan_roll_off", "satellite_scan_angle"), (),
+                                  lambda: calc.scan_loss_for(self.params, p("satellite_scan_angle")))
+        else:
+            nodes["path_loss"] = (("frequency", "distance", "scenario", "los_condition"), (),
+                                  lambda: calc.terrestrial_path_loss(p("frequency"), p("distance"),
+                                                                     self.params["scenario"], self.params["los_condition"]))
+            nodes["rain_fade"] = ((), (), lambda: 0.0)
+            nodes["atmospheric_loss"] = (("atmospheric_loss",), (), lambda: p("atmospheric_loss", 0))
+            nodes["scan_loss"] = (("scan_loss",), (), lambda: p("scan_loss", 0))
+        nodes["beam_edge_loss"] = (("beam_edge_loss", "beam_pattern", "off_axis_angle", "satellite_scan_angle")
+                                   + BEAM_GEOMETRY_PARAMS, (),
+                                   lambda: calc.beam_edge_loss_for(self.params, self.params.get("satellite_scan_angle")))
+        nodes["total_loss"] = (("scintillation_loss", "polarization_loss", "link_margin", "pointing_loss"),
+                               ("path_loss", "rain_fade", "atmospheric_loss", "beam_edge_loss", "scan_loss"),
+                               lambda: calc.calculate_total_loss(v["atmospheric_loss"], p("scintillation_loss", 0),
+                                                                 p("polarization_loss", 0), v["path_loss"], v["rain_fade"],
+                                                                 p("link_margin", 0), v["beam_edge_loss"], v["scan_loss"],
+                                                                 p("pointing_loss", 0)))
+        nodes["received_signal_psd"] = (("tx_eirp", "rx_antenna_gain", "bandwidth"), ("total_loss",),
+                                        lambda: calc.calculate_received_signal(p("tx_eirp"), v["total_loss"],
+                                                                               p("rx_antenna_gain"), p("bandwidth"))[0])
+        nodes["noise_psd"] = (("rx_noise_figure", "rx_noise_temp"), (),
+                              lambda: calc.calculate_noise_psd(p("rx_noise_figure"), p("rx_noise_temp")))
+        nodes["gt_ratio"] = (("rx_antenna_gain", "rx_noise_figure", "rx_noise_temp"), (),
+                             lambda: calc.calculate_gt_ratio(p("rx_antenna_gain"), p("rx_noise_figure"), p("rx_noise_temp")))
+        nodes["c_to_n"] = ((), ("received_signal_psd", "noise_psd"),
+                           lambda: v["received_signal_psd"] - v["noise_psd"])
+        nodes["c_to_n_plus_i"] = (("interference_psd",), ("c_to_n", "received_signal_psd", "noise_psd"),
+                                  lambda: calc.calculate_cni(v["c_to_n"], v["received_signal_psd"], v["noise_psd"],
+                                                             p("interference_psd", -math.inf)))
+        nodes["achievable_rate"] = (("bandwidth",), ("c_to_n_plus_i",),
+                                    lambda: calc.calculate_achievable_rate(v["c_to_n_plus_i"], p("bandwidth")))
+        return nodes
+
+    def update(self, input_params):
+        """用一组完整的输入参数更新图，返回发生变化的参数集合（新增、修改或删除的参数都算变化）"""
+        changed = {key for key in set(self.params) | set(input_params)
+                   if key not in self.params or key not in input_params
+                   or not _same_value(self.params[key], input_params[key])}
+        self.params = dict(input_params)
+        self.invalidate(changed)
+        return changed
+
+    def set(self, param, value):
+        """修改单个输入参数"""
+        if param in self.params and _same_value(self.params[param], value):
+            return
+        self.params[param] = value
+        self.invalidate([param])
+
+    def invalidate(self, params):
+        """使依赖这些参数的节点及其全部下游节点失效"""
+        stack = [name for param in params for name in self._param_nodes.get(param, ())]
+        while stack:
+            name = stack.pop()
+            if self.values.pop(name, None) is not None:
+                stack.extend(self._children[name])
+
+    def evaluate(self):
+        """按拓扑顺序重算失效节点"""
+        for name, (_, _, compute) in self.nodes.items():
+            if name not in self.values:
+                self.values[name] = compute()
+                self.recompute_counts[name] += 1
+
+    def results(self):
+        """返回与 perform_calculations 相同的结果：标量输入的值为 float，数组输入为列式字典"""
+        self.evaluate()
+        v = self.values
+        results = {key: v[key] for key in ("path_loss", "total_loss", "noise_psd", "received_signal_psd",
+                                            "c_to_n", "c_to_n_plus_i", "gt_ratio", "achievable_rate")}
+        if "geometry" in v:
+            results.update({
+                "terminal_elevation_angle": v["geometry"][0],
+                "distance": v["geometry"][1],
+                "rain_fade": v["rain_fade"]
+            })
+        else:
+            results["distance"] = self._param("distance")
+        columns = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in results.values()))
+        if columns[0].ndim == 0:
+            return {key: float(column) for key, column in zip(results, columns)}
+        return {key: np.array(column) for key, column in zip(results, columns)}
+
+
+# 单点标量路径接受的参数值类型（数值、场景名/模型名、方向图描述）；其他类型（数组、列表等）走向量化路径
+_SCALAR_TYPES = frozenset([int, float, bool, str, dict, np.float64])
+
+
+def _float_array(value):
+    return np.asarray(value, dtype=float)
+
+
+def _numeric(value, xp):
+    """常数输入：标量路径原样使用，向量化路径转为 float 数组"""
+    return value if xp is math else np.asarray(value, dtype=float)
+
+
+def _model_value(value, xp):
+    """模型函数（向量化实现）的结果：标量路径转为 float"""
+    return float(value) if xp is math else value
+
+
+def _all_scalar(input_params):
+    """输入参数中没有数组"""
+    return {type(value) for value in input_params.values()} <= _SCALAR_TYPES
+
+
+def _same_value(old, new):
+    """判断参数值是否未变化（支持标量、字符串和数组）"""
+    if old is new:
+        return True
+    if np.ndim(old) or np.ndim(new):
+        return np.shape(old) == np.shape(new) and bool(np.all(np.asarray(old) == np.asarray(new)))
+    return old == new
+
+
 class UnitConverter:
     """
     单位转换工具类
@@ -0,0 +1,163 @@
+"""
+LinkResult.py
+功能：
+1. LinkResult：单点计算结果记录（LinkCalculator.perform_calculations_record），使用 __slots__ 存储，
+   结果键元组按键集合（卫星/地面链路）在类上共享，不为每条记录分配字典或键元组。
+2. LinkResultBatch：批量计算结果的列式容器（struct-of-arrays，LinkCalculator.perform_calculations_columnar），
+   所有结果列存放在同一个二维 float64 数组中，按列名取出的是零拷贝视图；按下标取出单个 LinkResult，按切片取出共享内存的子批次。
+3. 两种结果都支持 get / [] / keys / items / in 等映射接口，可直接传给界面显示和报告生成；需要时通过 to_dict 转换。
+
+结果键与 parameters.RESULT_CATEGORIES 一致，另加 total_loss。
+"""
+
+import numpy as np
+
+from parameters import RESULT_CATEGORIES
+
+# 全部结果键：RESULT_CATEGORIES 中出现的键（按首次出现顺序）+ total_loss
+RESULT_KEYS = tuple(dict.fromkeys(
+    [item["key"] for link_category in RESULT_CATEGORIES.values()
+     for items in link_category.values() for item in items] + ["total_loss"]
+))
+
+
+class _ResultMapping:
+    """映射接口的公共实现（子类提供 keys 和 __getitem__）"""
+
+    __slots__ = ()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class LinkResult(_ResultMapping):
+    """
+    单点链路计算结果（__slots__ 记录），未计算的键（如地面链路的雨衰）不存在
+    结果键元组 _keys 是类属性：record_type(keys) 为每种键集合返回一个共享该元组的子类
+    """
+
+    __slots__ = RESULT_KEYS
+    _keys = ()
+
+    def __init__(self, values):
+        for key, value in zip(self._keys, values):
+            setattr(self, key, float(value))
+
+    @staticmethod
+    def record_type(keys):
+        """返回结果键为 keys 的记录类（按键集合缓存）"""
+        keys = tuple(keys)
+        record_type = _RECORD_TYPES.get(keys)
+        if record_type is None:
+            record_type = type("LinkResult", (LinkResult,), {"__slots__": (), "_keys": keys})
+            _RECORD_TYPES[keys] = record_type
+        return record_type
+
+    @classmethod
+    def from_dict(cls, results):
+        return LinkResult.record_type(results.keys())(results.values())
+
+    def keys(self):
+        return self._keys
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={getattr(self, key):.4g}" for key in self._keys)
+        return f"LinkResult({fields})"
+
+
+_RECORD_TYPES = {}
+
+
+class LinkResultBatch(_ResultMapping):
+    """
+    批量链路计算结果（列式存储）
+    data: 形状为 (结果键数, N) 的 float64 数组，第 i 行对应 keys[i]
+    batch["c_to_n"] 返回 data 的行视图（零拷贝）；batch[i] 返回第 i 个 LinkResult；batch[a:b] 返回共享内存的子批次
+    """
+
+    __slots__ = ("_keys", "_index", "_record_type", "data")
+
+    def __init__(self, keys, data):
+        self._keys = tuple(keys)
+        self._index = {key: row for row, key in enumerate(self._keys)}
+        self._record_type = LinkResult.record_type(self._keys)
+        self.data = data
+
+    @classmethod
+    def empty(cls, keys, size):
+        return cls(keys, np.empty((len(keys), size)))
+
+    @classmethod
+    def from_columns(cls, columns):
+        """把 {键: 等长数组/标量} 打包为连续存储的批次（会复制一次）"""
+        keys = list(columns)
+        arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(columns[key], dtype=float)) for key in keys))
+        batch = cls.empty(keys, arrays[0].size)
+        for row, array in enumerate(arrays):
+            batch.data[row] = array.ravel()
+        return batch
+
+    @property
+    def size(self):
+        """场景数"""
+        return self.data.shape[1]
+
+    def keys(self):
+        return self._keys
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.data[self._index[key]]
+        if isinstance(key, slice):
+            return LinkResultBatch(self._keys, self.data[:, key])
+        return self._record_type(self.data[:, key])
+
+    def records(self):
+        """逐个生成 LinkResult"""
+        for i in range(self.size):
+            yield self._record_type(self.data[:, i])
+
+    def rows(self):
+        """逐个生成结果字典 {键: float}（整批一次转为 Python 数值）"""
+        for values in self.data.T.tolist():
+            yield dict(zip(self._keys, values))
+
+    def to_dict(self):
+        """{键: 列视图}，不复制数据"""
+        return {key: self.data[row] for row, key in enumerate(self._keys)}
+
+    def __repr__(self):
+        return f"LinkResultBatch(size={self.size}, keys={list(self._keys)})"
+
+
+def as_record(results):
+    """界面显示/单场景报告使用：批次取第一个场景，其他映射原样返回"""
+    if isinstance(results, LinkResultBatch):
+        return results[0]
+    return results
@@ -0,0 +1,75 @@
+"""
+LiveWorker.py
+功能：
+1. 界面实时计算用的后台工作线程：计算在线程中执行，Tk主线程只负责收集参数和显示结果，界面不会卡顿。
+2. 每次提交的请求带递增的代号（generation），线程取请求时只保留队列中最新的一个，
+   主线程取结果时丢弃代号不是最新的结果，快速连续输入时不会显示过期结果。
+3. 不依赖tkinter：主线程用 root.after 定时调用 poll() 取结果。
+
+示例：
+worker = LiveWorker(lambda payload: compute(*payload))
+worker.submit((input_params, link_type))
+...
+finished = worker.poll()   # None 或 (代号, 结果, 异常)
+"""
+
+import queue
+import threading
+
+
+class LiveWorker:
+    """单线程后台计算器，只计算和返回最新一次提交的请求"""
+
+    def __init__(self, compute, name="LiveWorker"):
+        self.compute = compute
+        self.generation = 0
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, payload):
+        """提交新请求，返回其代号；之前未完成的请求随之作废"""
+        self.generation += 1
+        self._requests.put((self.generation, payload))
+        return self.generation
+
+    def cancel(self):
+        """作废全部已提交的请求"""
+        self.generation += 1
+
+    def _run(self):
+        while True:
+            item = self._requests.get()
+            # 只处理队列中最新的请求
+            while True:
+                try:
+                    item = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+            if item is None:
+                return
+            generation, payload = item
+            if generation != self.generation:
+                continue
+            try:
+                self._results.put((generation, self.compute(payload), None))
+            except Exception as e:
+                self._results.put((generation, None, e))
+
+    def poll(self):
+        """在主线程中调用：返回最新请求的 (代号, 结果, 异常)，没有新结果时返回 None"""
+        finished = None
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == self.generation:
+                finished = item
+        return finished
+
+    def stop(self):
+        """结束工作线程"""
+        self.cancel()
+        self._requests.put(None)
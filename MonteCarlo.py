@@ -0,0 +1,202 @@
+"""
+MonteCarlo.py
+功能：
+1. 链路可用度蒙特卡洛仿真：降雨率、闪烁损耗、指向损耗等参数按给定分布随机抽样，
+   用 LinkCalculator.perform_calculations_batch 按批向量化计算，随机数生成器可设种子以复现结果。
+2. 统计量流式累积：C/N（或 C/(N+I)）和雨衰使用固定分辨率直方图，不保存全部样本；
+   输出可用度、给定时间百分比下的 C/N（如 99.9% 时间超过的 C/N）和雨衰超过概率曲线（CDF）。
+3. 每批结束后计算可用度的 Wilson 置信区间，区间半宽小于容差时提前停止。
+4. iter_batches() 逐批返回本批样本和当前统计，可边算边写出；run() 只返回最终统计。
+
+分布写法（字典）：
+{"dist": "constant", "value": 3}
+{"dist": "normal", "mean": 0.3, "std": 0.1}
+{"dist": "lognormal", "median": 5, "sigma": 1.0}
+{"dist": "uniform", "low": 0, "high": 1}
+{"dist": "exponential", "scale": 0.5}
+任一分布可加 "probability": p，表示以概率 p 取抽样值、否则取 0（如降雨发生概率）。
+抽样结果小于 "min"（默认不限）时截断。
+
+示例：
+mc = MonteCarlo(input_params, "星-地下行", {
+    "rain_rate": {"dist": "lognormal", "median": 8, "sigma": 1.1, "probability": 0.05},
+    "scintillation_loss": {"dist": "normal", "mean": 0.3, "std": 0.15, "min": 0},
+    "pointing_loss": {"dist": "exponential", "scale": 0.2},
+}, threshold=3.0, seed=1)
+result = mc.run(max_trials=1_000_000)
+result["availability"], result["percentiles"][99.9]
+"""
+
+import math
+
+import numpy as np
+
+from LinkCalculator import LinkCalculator, SATELLITE_LINK_TYPES
+
+# 95% 置信水平对应的正态分位数
+Z_95 = 1.959963984540054
+
+
+def sample_distribution(spec, rng, size):
+    """按分布描述抽样"""
+    dist = spec.get("dist", "constant")
+    if dist == "constant":
+        values = np.full(size, float(spec["value"]))
+    elif dist == "normal":
+        values = rng.normal(spec["mean"], spec["std"], size)
+    elif dist == "lognormal":
+        values = rng.lognormal(math.log(spec["median"]), spec["sigma"], size)
+    elif dist == "uniform":
+        values = rng.uniform(spec["low"], spec["high"], size)
+    elif dist == "exponential":
+        values = rng.exponential(spec["scale"], size)
+    else:
+        raise ValueError(f"不支持的分布类型: {dist}")
+    if "probability" in spec:
+        values = np.where(rng.random(size) < spec["probability"], values, 0.0)
+    if "min" in spec:
+        values = np.maximum(values, spec["min"])
+    return values
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """二项比例的 Wilson 置信区间，返回 (下限, 上限)"""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    centre = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return centre - half_width, centre + half_width
+
+
+class StreamingHistogram:
+    """
+    固定分辨率直方图，用于流式百分位数和CDF；NaN 不计入
+    超出范围的样本（含 ±inf）不并入两端的箱，而是分别计入 underflow / overflow，
+    分位数落在其中时返回 ∓inf/±inf，超过概率曲线的尾部也保留这部分概率，不会在范围边界处饱和
+    """
+
+    def __init__(self, low, high, resolution):
+        self.low = low
+        self.resolution = resolution
+        self.counts = np.zeros(int(round((high - low) / resolution)) + 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def add(self, values):
+        values = values[~np.isnan(values)]
+        position = (values - self.low) / self.resolution
+        below = position < 0
+        above = position >= len(self.counts)
+        self.underflow += int(np.count_nonzero(below))
+        self.overflow += int(np.count_nonzero(above))
+        index = position[~(below | above)].astype(np.int64)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    @property
+    def total(self):
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+    @property
+    def edges(self):
+        return self.low + self.resolution * np.arange(len(self.counts))
+
+    def quantile(self, q):
+        """下侧分位数（q 为 0~1），精度为直方图分辨率；落在范围以下/以上时返回 -inf/inf，没有样本时返回 NaN"""
+        total = self.total
+        if total == 0:
+            return float("nan")
+        target = q * total
+        if self.underflow and target <= self.underflow:
+            return -math.inf
+        cumulative = self.underflow + np.cumsum(self.counts)
+        if target > cumulative[-1]:
+            return math.inf
+        return float(self.edges[np.searchsorted(cumulative, target)])
+
+    def exceedance(self):
+        """返回 (取值, 超过该值的概率)，概率包含超出范围上限的样本"""
+        cumulative = self.underflow + np.cumsum(self.counts)
+        return self.edges + self.resolution, 1 - cumulative / self.total
+
+
+class MonteCarlo:
+    """链路可用度蒙特卡洛仿真"""
+
+    def __init__(self, input_params, link_type, distributions, threshold=0.0, metric="c_to_n",
+                 seed=None, calculator=None, metric_range=(-60.0, 60.0), fade_range=(0.0, 60.0), resolution=0.01):
+        """
+        :param input_params: 固定链路参数（与 perform_calculations 相同）
+        :param distributions: {参数名: 分布描述}，参数名为 perform_calculations 的输入键
+            （含可选的 pointing_loss 指向损耗，作为总损耗中的独立一项）
+        :param threshold: 可用门限 (dB)，metric ≥ threshold 视为可用
+        :param metric: 判定可用的结果键，"c_to_n" 或 "c_to_n_plus_i"
+        """
+        self.input_params = dict(input_params)
+        self.link_type = link_type
+        self.distributions = distributions
+        self.threshold = threshold
+        self.metric = metric
+        self.rng = np.random.default_rng(seed)
+        self.calculator = calculator or LinkCalculator(geometry_cache_size=0)
+        self.metric_histogram = StreamingHistogram(*metric_range, resolution)
+        self.fade_histogram = StreamingHistogram(*fade_range, resolution)
+        self.trials = 0
+        self.available = 0
+
+    def _sample_params(self, size):
+        params = dict(self.input_params)
+        for name, spec in self.distributions.items():
+            params[name] = sample_distribution(spec, self.rng, size)
+        return params
+
+    def iter_batches(self, max_trials=1_000_000, batch_size=100_000, tolerance=None, min_trials=10_000):
+        """
+        逐批仿真（生成器），每批返回 {"samples": 本批结果列, "trials", "availability", "confidence_interval"}
+        tolerance: 可用度95%置信区间半宽的容差，达到后提前停止；None 表示跑满 max_trials
+        """
+        while self.trials < max_trials:
+            size = min(batch_size, max_trials - self.trials)
+            params = self._sample_params(size)
+            samples = self.calculator.perform_calculations_batch(params, self.link_type)
+            metric = samples[self.metric]
+            self.metric_histogram.add(metric)
+            if self.link_type in SATELLITE_LINK_TYPES:
+                self.fade_histogram.add(samples["rain_fade"])
+            self.trials += size
+            self.available += int(np.count_nonzero(metric >= self.threshold))
+
+            low, high = wilson_interval(self.available, self.trials)
+            yield {"samples": samples, "trials": self.trials,
+                   "availability": self.available / self.trials, "confidence_interval": (low, high)}
+            if tolerance is not None and self.trials >= min_trials and (high - low) / 2 <= tolerance:
+                return
+
+    def run(self, max_trials=1_000_000, batch_size=100_000, tolerance=None, min_trials=10_000,
+            percentiles=(90.0, 99.0, 99.9, 99.99)):
+        """运行仿真并返回汇总统计（不保留样本）"""
+        for _ in self.iter_batches(max_trials, batch_size, tolerance, min_trials):
+            pass
+        return self.summary(percentiles)
+
+    def summary(self, percentiles=(90.0, 99.0, 99.9, 99.99)):
+        """
+        汇总统计：
+        percentiles: {时间百分比: 该百分比时间内超过的 metric 值}，如 99.9 → 0.1% 下侧分位数
+        fade_exceedance: (雨衰取值, 超过概率)
+        metric_out_of_range / fade_out_of_range: 低于、高于直方图范围的样本数 (underflow, overflow)，
+            不为 0 时应扩大 metric_range / fade_range，落在其中的百分位数为 ±inf
+        """
+        low, high = wilson_interval(self.available, self.trials)
+        result = {
+            "trials": self.trials,
+            "availability": self.available / self.trials if self.trials else float("nan"),
+            "confidence_interval": (low, high),
+            "percentiles": {p: self.metric_histogram.quantile(1 - p / 100) for p in percentiles},
+            "metric_out_of_range": (self.metric_histogram.underflow, self.metric_histogram.overflow),
+        }
+        if self.fade_histogram.total:
+            result["fade_exceedance"] = self.fade_histogram.exceedance()
+            result["fade_out_of_range"] = (self.fade_histogram.underflow, self.fade_histogram.overflow)
+        return result
@@ -0,0 +1,226 @@
+"""
+OrbitPass.py
+功能：
+1. 圆轨道过境仿真：给定轨道根数（高度、倾角、升交点赤经、初始相位）和地面终端经纬度，
+   按固定时间步长向量化推算卫星位置（二体圆轨道 + 地球自转，球形地球），得到每个历元的终端仰角和星地距离。
+2. 对可见历元（仰角高于门限）把仰角换算为卫星扫描角，交给 LinkCalculator.perform_calculations_batch，
+   得到与静态计算一致的自由空间损耗、雨衰、C/N 等时间序列。
+3. 时间序列按块流式生成，PassStatistics 边消费边统计每次过境的 AOS/LOS、最大仰角和 C/N 高于门限的时长。
+
+示例：
+orbit = CircularOrbit(altitude=550, inclination=53, raan=0, phase=0)
+terminal = GroundTerminal(latitude=39.9, longitude=116.4)
+stats = PassStatistics(cn_threshold=0)
+for chunk in simulate_pass(orbit, terminal, input_params, "星-地下行", duration=86400, step=1):
+    stats.update(chunk)
+stats.passes  # [{"aos": ..., "los": ..., "max_elevation": ..., ...}, ...]
+
+命令行：
+python OrbitPass.py params.json --altitude 550 --inclination 53 --lat 39.9 --lon 116.4 -o pass.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from LinkCalculator import LinkCalculator, SATELLITE_LINK_TYPES
+
+EARTH_MU = 398600.4418  # 地球引力常数 (km^3/s^2)
+EARTH_ROTATION_RATE = 7.2921159e-5  # 地球自转角速度 (rad/s)
+
+TIME_SERIES_KEYS = ["time", "elevation", "distance", "scan_angle", "path_loss", "rain_fade",
+                    "total_loss", "c_to_n", "c_to_n_plus_i", "achievable_rate"]
+
+
+@dataclass
+class CircularOrbit:
+    """圆轨道根数：高度 (km)，倾角/升交点赤经/初始相位（纬度幅角）(度)"""
+    altitude: float
+    inclination: float
+    raan: float = 0.0
+    phase: float = 0.0
+
+    def mean_motion(self, earth_radius):
+        """平均角速度 (rad/s)"""
+        return np.sqrt(EARTH_MU / (earth_radius + self.altitude) ** 3)
+
+
+@dataclass
+class GroundTerminal:
+    """地面终端位置：纬度、经度 (度)"""
+    latitude: float
+    longitude: float
+
+
+def satellite_positions(orbit, t, earth_radius):
+    """计算 t (s) 时刻卫星在地固坐标系中的位置，返回形状为 (3, N) 的数组 (km)"""
+    a = earth_radius + orbit.altitude
+    u = np.radians(orbit.phase) + orbit.mean_motion(earth_radius) * t
+    inc, raan = np.radians(orbit.inclination), np.radians(orbit.raan)
+    # 地球自转后升交点在地固系中的经度
+    node = raan - EARTH_ROTATION_RATE * t
+    cos_u, sin_u = np.cos(u), np.sin(u)
+    cos_node, sin_node = np.cos(node), np.sin(node)
+    return a * np.stack([
+        cos_node * cos_u - sin_node * sin_u * np.cos(inc),
+        sin_node * cos_u + cos_node * sin_u * np.cos(inc),
+        sin_u * np.sin(inc),
+    ])
+
+
+def terminal_position(terminal, earth_radius):
+    """终端地固坐标 (km) 和当地天顶单位向量"""
+    lat, lon = np.radians(terminal.latitude), np.radians(terminal.longitude)
+    up = np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+    return earth_radius * up, up
+
+
+def look_angles(orbit, terminal, t, earth_radius):
+    """返回 (终端仰角 (度), 星地距离 (km))"""
+    position, up = terminal_position(terminal, earth_radius)
+    line_of_sight = satellite_positions(orbit, t, earth_radius) - position[:, None]
+    distance = np.sqrt(np.einsum("ij,ij->j", line_of_sight, line_of_sight))
+    elevation = np.degrees(np.arcsin(np.clip(up @ line_of_sight / distance, -1, 1)))
+    return elevation, distance
+
+
+def elevation_to_scan_angle(elevation, altitude, earth_radius):
+    """终端仰角换算为卫星扫描角（星下点偏离角）(度)"""
+    return np.degrees(np.arcsin(earth_radius * np.cos(np.radians(elevation)) / (earth_radius + altitude)))
+
+
+def simulate_pass(orbit, terminal, input_params, link_type="星-地下行", duration=86400.0, step=1.0,
+                  start=0.0, min_elevation=0.0, chunk_size=86400, calculator=None):
+    """
+    过境时间序列（生成器），每块返回 {键: 数组}，键见 TIME_SERIES_KEYS
+    input_params: 除卫星高度和扫描角外的链路参数（与 perform_calculations 相同）
+    min_elevation: 可见仰角门限 (度)，低于门限的历元链路结果为 NaN
+    """
+    if link_type not in SATELLITE_LINK_TYPES:
+        raise ValueError(f"过境仿真只支持卫星链路: {link_type}")
+    if step <= 0:
+        raise ValueError("时间步长必须大于0")
+    calculator = calculator or LinkCalculator(geometry_cache_size=0)
+    r = calculator.earth_radius
+    steps = int(np.floor(duration / step)) + 1
+    for first in range(0, steps, chunk_size):
+        t = start + step * np.arange(first, min(first + chunk_size, steps))
+        elevation, distance = look_angles(orbit, terminal, t, r)
+        chunk = {key: np.full(t.shape, np.nan) for key in TIME_SERIES_KEYS}
+        chunk.update(time=t, elevation=elevation, distance=distance)
+
+        visible = elevation > max(min_elevation, 0.0)
+        if np.any(visible):
+            # 地平线附近的历元换算结果可能因舍入等于地平线扫描角，限制在地平线以内，不中断整次过境
+            scan_angle = calculator.clip_scan_angle(elevation_to_scan_angle(elevation[visible], orbit.altitude, r),
+                                                    orbit.altitude)
+            params = dict(input_params, satellite_height=orbit.altitude, satellite_scan_angle=scan_angle)
+            results = calculator.perform_calculations_batch(params, link_type)
+            chunk["scan_angle"][visible] = scan_angle
+            for key in TIME_SERIES_KEYS[4:]:
+                chunk[key][visible] = results[key]
+        yield chunk
+
+
+class PassStatistics:
+    """流式过境统计：AOS/LOS、最大仰角及其时刻、C/N 高于门限的时长"""
+
+    def __init__(self, cn_threshold=0.0, min_elevation=0.0):
+        self.cn_threshold = cn_threshold
+        self.min_elevation = min_elevation
+        self.passes = []
+        self._current = None
+        self._step = None
+
+    def update(self, chunk):
+        t, elevation, c_to_n = chunk["time"], chunk["elevation"], chunk["c_to_n"]
+        if len(t) > 1:
+            self._step = t[1] - t[0]
+        visible = elevation > max(self.min_elevation, 0.0)
+        # 可见性变化点：块内 diff，并与上一块末尾的状态衔接
+        previous = np.concatenate([[self._current is not None], visible[:-1]])
+        starts = np.flatnonzero(visible & ~previous)
+        stops = np.flatnonzero(~visible & previous)
+        boundaries = np.sort(np.concatenate([starts, stops, [len(t)]]))
+
+        segment_start = 0
+        for boundary in boundaries:
+            if self._current is not None and boundary > segment_start:
+                self._accumulate(t[segment_start:boundary], elevation[segment_start:boundary],
+                                 c_to_n[segment_start:boundary])
+            if boundary < len(t):
+                if visible[boundary]:
+                    self._current = {"aos": float(t[boundary]), "los": None, "max_elevation": -np.inf,
+                                     "max_elevation_time": None, "time_above_threshold": 0.0}
+                elif self._current is not None:
+                    self._current["los"] = float(t[boundary])
+                    self.passes.append(self._current)
+                    self._current = None
+            segment_start = boundary
+
+    def _accumulate(self, t, elevation, c_to_n):
+        peak = int(np.argmax(elevation))
+        if elevation[peak] > self._current["max_elevation"]:
+            self._current["max_elevation"] = float(elevation[peak])
+            self._current["max_elevation_time"] = float(t[peak])
+        if self._step is not None:
+            self._current["time_above_threshold"] += float(np.count_nonzero(c_to_n >= self.cn_threshold) * self._step)
+
+    def finish(self):
+        """结束统计：仿真结束时仍在进行的过境也计入（los 为 None）"""
+        if self._current is not None:
+            self.passes.append(self._current)
+            self._current = None
+        return self.passes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="圆轨道卫星过境链路预算时间序列仿真")
+    parser.add_argument("params", help="链路参数JSON文件（与 perform_calculations 的输入参数相同）")
+    parser.add_argument("-o", "--output", default=None, help="时间序列CSV文件（不指定时只输出过境统计）")
+    parser.add_argument("--link-type", default="星-地下行", choices=SATELLITE_LINK_TYPES)
+    parser.add_argument("--altitude", type=float, required=True, help="轨道高度 (km)")
+    parser.add_argument("--inclination", type=float, required=True, help="轨道倾角 (度)")
+    parser.add_argument("--raan", type=float, default=0.0, help="升交点赤经 (度)")
+    parser.add_argument("--phase", type=float, default=0.0, help="初始纬度幅角 (度)")
+    parser.add_argument("--lat", type=float, required=True, help="终端纬度 (度)")
+    parser.add_argument("--lon", type=float, required=True, help="终端经度 (度)")
+    parser.add_argument("--duration", type=float, default=86400.0, help="仿真时长 (s)")
+    parser.add_argument("--step", type=float, default=1.0, help="时间步长 (s)")
+    parser.add_argument("--min-elevation", type=float, default=0.0, help="可见仰角门限 (度)")
+    parser.add_argument("--cn-threshold", type=float, default=0.0, help="C/N 门限 (dB)")
+    args = parser.parse_args(argv)
+
+    with open(args.params, encoding="utf-8") as f:
+        input_params = json.load(f)
+    orbit = CircularOrbit(args.altitude, args.inclination, args.raan, args.phase)
+    terminal = GroundTerminal(args.lat, args.lon)
+    stats = PassStatistics(args.cn_threshold, args.min_elevation)
+
+    output = open(args.output, "w", newline="", encoding="utf-8-sig") if args.output else None
+    try:
+        writer = csv.writer(output) if output else None
+        if writer:
+            writer.writerow(TIME_SERIES_KEYS)
+        for chunk in simulate_pass(orbit, terminal, input_params, args.link_type, args.duration,
+                                   args.step, min_elevation=args.min_elevation):
+            stats.update(chunk)
+            if writer:
+                writer.writerows(zip(*(chunk[key].tolist() for key in TIME_SERIES_KEYS)))
+    finally:
+        if output:
+            output.close()
+
+    for index, record in enumerate(stats.finish(), 1):
+        los = f"{record['los']:.0f}s" if record["los"] is not None else "仿真结束时未落下"
+        print(f"过境{index}: AOS={record['aos']:.0f}s LOS={los} 最大仰角={record['max_elevation']:.2f}° "
+              f"(t={record['max_elevation_time']:.0f}s) C/N≥{args.cn_threshold}dB 时长={record['time_above_threshold']:.0f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+RainClimatology.py
+功能：
+1. 全球/区域降雨率气候图（如 ITU-R P.837 的 R0.01，mm/h）：规则经纬度网格，按位置查 0.01% 时间概率的降雨率。
+2. 网格保存为未压缩 .npz（latitude、longitude 两个等间隔坐标轴 + rain_rate[纬度, 经度]），
+   加载时用 GeometryTable.load_npz_mmap 内存映射，不把网格复制进内存；查表时只读取每个点周围的4个格点。
+3. 对终端坐标数组做向量化双线性插值：经度覆盖 360° 的网格在经度方向首尾相接，纬度超出网格范围时取边界值，
+   坐标为 NaN/无穷时结果为 NaN；数百万个点按块查表，临时内存只取决于块大小。
+4. 查得的降雨率直接作为 input_params["rain_rate"] 进入 LinkCalculator.rain_fade_for 的雨衰计算，
+   BatchRunner（--rain-climatology，按 latitude/longitude 列查表）和 CoverageMap（按网格点查表）均已接入。
+
+示例：
+climatology = RainClimatology.from_grid(latitudes, longitudes, r001)   # 或 RainClimatology.load("r001.npz")
+climatology.save("r001.npz")
+input_params["rain_rate"] = climatology.lookup(terminal_lat, terminal_lon)
+input_params["rain_model"] = "P.618"
+"""
+
+import numpy as np
+
+from GeometryTable import load_npz_mmap
+
+CLIMATOLOGY_FIELDS = ["latitude", "longitude", "rain_rate"]
+
+
+class RainClimatology:
+    """规则经纬度网格上的降雨率气候图（双线性插值查表）"""
+
+    def __init__(self, latitude, longitude, rain_rate):
+        """
+        :param latitude: (纬度点数,) 等间隔递增的纬度坐标 (度)
+        :param longitude: (经度点数,) 等间隔递增的经度坐标 (度)
+        :param rain_rate: (纬度点数, 经度点数) 降雨率 (mm/h)，可以是 np.memmap
+        """
+        if rain_rate.shape != (len(latitude), len(longitude)):
+            raise ValueError(f"降雨率网格形状 {rain_rate.shape} 与坐标轴长度 ({len(latitude)}, {len(longitude)}) 不一致")
+        if len(latitude) < 2 or len(longitude) < 2:
+            raise ValueError("降雨率网格每个方向至少需要2个格点")
+        self.latitude = latitude
+        self.longitude = longitude
+        self.rain_rate = rain_rate
+        self.lat_start = float(latitude[0])
+        self.lat_step = float(latitude[1] - latitude[0])
+        self.lon_start = float(longitude[0])
+        self.lon_step = float(longitude[1] - longitude[0])
+        if self.lat_step <= 0 or self.lon_step <= 0:
+            raise ValueError("降雨率网格坐标需等间隔递增")
+        # 经度覆盖一整圈时，最后一列与第一列之间也可以插值
+        self.wraps = abs(len(longitude) * self.lon_step - 360) < 1e-6
+
+    @classmethod
+    def from_grid(cls, latitude, longitude, rain_rate):
+        """由内存中的数组构造"""
+        return cls(np.asarray(latitude, dtype=float), np.asarray(longitude, dtype=float), np.asarray(rain_rate))
+
+    def save(self, path):
+        """保存为未压缩 .npz（可被 load 内存映射）"""
+        np.savez(path, **{name: np.asarray(getattr(self, name)) for name in CLIMATOLOGY_FIELDS})
+
+    @classmethod
+    def load(cls, path):
+        """内存映射加载，不把网格复制进内存"""
+        arrays = load_npz_mmap(path)
+        return cls(**{name: arrays[name] for name in CLIMATOLOGY_FIELDS})
+
+    @property
+    def shape(self):
+        return self.rain_rate.shape
+
+    def _positions(self, latitude, longitude):
+        """返回格点下标 (i, i+1, j, j+1) 和插值比例 (u, v)"""
+        rows, columns = self.shape
+        lat_position = np.clip((latitude - self.lat_start) / self.lat_step, 0, rows - 1)
+        i = np.minimum(lat_position.astype(np.intp), rows - 2)
+        if self.wraps:
+            lon_position = np.mod(longitude - self.lon_start, 360.0) / self.lon_step
+            j = np.minimum(lon_position.astype(np.intp), columns - 1)
+            j_next = (j + 1) % columns
+        else:
+            # 区域网格：网格外的经度取较近一侧的边界
+            offset = np.mod(longitude - self.lon_start, 360.0)
+            span = (columns - 1) * self.lon_step
+            offset = np.where(offset > span, np.where(offset - span < 360 - offset, span, 0.0), offset)
+            lon_position = offset / self.lon_step
+            j = np.minimum(lon_position.astype(np.intp), columns - 2)
+            j_next = j + 1
+        return i, i + 1, j, j_next, lat_position - i, lon_position - j
+
+    def lookup(self, latitude, longitude, chunk_size=1_000_000):
+        """
+        按位置双线性插值查降雨率 (mm/h)
+        :param latitude, longitude: 终端纬度、经度 (度)，可广播的数组或标量
+        :return: 与广播后输入同形状的降雨率；标量输入返回 float；纬度或经度为 NaN/无穷的点为 NaN
+        """
+        latitude, longitude = np.broadcast_arrays(np.asarray(latitude, dtype=float),
+                                                  np.asarray(longitude, dtype=float))
+        shape = latitude.shape
+        latitude, longitude = latitude.ravel(), longitude.ravel()
+        result = np.empty(latitude.size)
+        grid = self.rain_rate
+        for start in range(0, latitude.size, chunk_size):
+            block = slice(start, start + chunk_size)
+            # 非有限坐标不能换算为格点下标，先用网格原点代替，插值后置为 NaN
+            valid = np.isfinite(latitude[block]) & np.isfinite(longitude[block])
+            i, i_next, j, j_next, u, v = self._positions(np.where(valid, latitude[block], self.lat_start),
+                                                         np.where(valid, longitude[block], self.lon_start))
+            result[block] = np.where(valid, (1 - u) * (1 - v) * grid[i, j] + u * (1 - v) * grid[i_next, j]
+                                     + (1 - u) * v * grid[i, j_next] + u * v * grid[i_next, j_next], np.nan)
+        return float(result[0]) if not shape else result.reshape(shape)
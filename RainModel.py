@@ -0,0 +1,141 @@
+"""
+RainModel.py
+功能：
+1. ITU-R P.838-3 雨衰比衰减系数 k、α：按建议书的回归公式在 1~1000 GHz 的对数频率网格上预计算（导入时计算一次），
+   使用时在 log10(f) 上线性插值；标量频率按 (频率, 极化倾角) 缓存，扫描时不重复插值。
+2. ITU-R P.618-13 §2.2.1.1 斜路径雨衰：雨顶高度、斜路径长度、水平缩短因子、垂直调整因子，
+   得到 0.01% 时间概率的雨衰 A0.01 后换算到任意时间概率 p（0.001%~5%）。
+3. 仰角、降雨率、时间概率、纬度等均支持数组输入（可广播）。
+
+雨顶高度：P.839 中 hR = h0 + 0.36 km，h0 为 0°C 等温线年均高度（需查全球图），
+本模块不含该图，默认 h0 = 4 km（中纬度典型值），可通过 rain_height 指定实际 hR。
+
+在链路计算中启用：input_params["rain_model"] = "P.618"，可选参数
+exceedance_percentage（默认0.01）、polarization_tilt（默认45，圆极化）、latitude（默认45）、
+rain_height（默认 DEFAULT_RAIN_HEIGHT）、station_height（默认0）。此时 rain_rate 为 0.01% 时间概率的降雨率 R0.01。
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# P.838-3 回归系数：(a_j, b_j, c_j) 列表，m, c
+P838_COEFFICIENTS = {
+    "kH": ([-5.33980, -0.35351, -0.23789, -0.94158],
+           [-0.10008, 1.26970, 0.86036, 0.64552],
+           [1.13098, 0.45400, 0.15354, 0.16817], -0.18961, 0.71147),
+    "kV": ([-3.80595, -3.44965, -0.39902, 0.50167],
+           [0.56934, -0.22911, 0.73042, 1.07319],
+           [0.81061, 0.51059, 0.11899, 0.27195], -0.16398, 0.63297),
+    "alphaH": ([-0.14318, 0.29591, 0.32177, -5.37610, 16.1721],
+               [1.82442, 0.77564, 0.63773, -0.96230, -3.29980],
+               [-0.55187, 0.19822, 0.13164, 1.47828, 3.43990], 0.67849, -1.95537),
+    "alphaV": ([-0.07771, 0.56727, -0.20238, -48.2991, 48.5833],
+               [2.33840, 0.95545, 1.14520, 0.791669, 0.791459],
+               [-0.76284, 0.54039, 0.26809, 0.116226, 0.116479], -0.053739, 0.83433),
+}
+
+EFFECTIVE_EARTH_RADIUS = 8500  # P.618 有效地球半径 (km)
+DEFAULT_RAIN_HEIGHT = 4.36  # hR = h0 + 0.36，h0 取 4 km (km)
+
+# 预计算网格：1~1000 GHz，log10(f) 均匀 3001 点
+LOG_FREQUENCY_GRID = np.linspace(0.0, 3.0, 3001)
+
+
+def _p838_regression(name, log_f):
+    a, b, c, m, offset = P838_COEFFICIENTS[name]
+    value = sum(aj * np.exp(-((log_f - bj) / cj) ** 2) for aj, bj, cj in zip(a, b, c)) + m * log_f + offset
+    return 10 ** value if name.startswith("k") else value
+
+
+COEFFICIENT_TABLE = {name: _p838_regression(name, LOG_FREQUENCY_GRID) for name in P838_COEFFICIENTS}
+
+
+def _combine_polarization(kh, kv, ah, av, polarization_tilt, elevation=0.0):
+    """P.838-3 式(4)(5)：按极化倾角 τ 和路径仰角 θ 合成 k、α"""
+    factor = np.cos(np.radians(elevation)) ** 2 * np.cos(np.radians(2 * np.asarray(polarization_tilt, dtype=float)))
+    k = (kh + kv + (kh - kv) * factor) / 2
+    alpha = (kh * ah + kv * av + (kh * ah - kv * av) * factor) / (2 * k)
+    return k, alpha
+
+
+def _interpolate_coefficients(frequency):
+    log_f = np.log10(np.asarray(frequency, dtype=float))
+    if np.any((log_f < LOG_FREQUENCY_GRID[0]) | (log_f > LOG_FREQUENCY_GRID[-1])):
+        raise ValueError("P.838 雨衰系数适用频率范围为 1~1000 GHz")
+    return tuple(np.interp(log_f, LOG_FREQUENCY_GRID, COEFFICIENT_TABLE[name])
+                 for name in ("kH", "kV", "alphaH", "alphaV"))
+
+
+@lru_cache(maxsize=1024)
+def _cached_coefficients(frequency):
+    return tuple(float(value) for value in _interpolate_coefficients(frequency))
+
+
+def rain_coefficients(frequency, polarization_tilt=45.0, elevation=0.0):
+    """
+    返回 (k, α)
+    :param frequency: 频率 (GHz)，标量时按频率缓存插值结果
+    :param polarization_tilt: 极化倾角 τ (度)：0 水平、90 垂直、45 圆极化
+    :param elevation: 路径仰角 (度)
+    """
+    if np.ndim(frequency) == 0:
+        kh, kv, ah, av = _cached_coefficients(float(frequency))
+    else:
+        kh, kv, ah, av = _interpolate_coefficients(frequency)
+    return _combine_polarization(kh, kv, ah, av, polarization_tilt, elevation)
+
+
+def specific_attenuation(frequency, rain_rate, polarization_tilt=45.0, elevation=0.0):
+    """雨衰比衰减 γR = k R^α (dB/km)"""
+    k, alpha = rain_coefficients(frequency, polarization_tilt, elevation)
+    return k * np.asarray(rain_rate, dtype=float) ** alpha
+
+
+def rain_attenuation(frequency, elevation, rain_rate, exceedance_percentage=0.01, polarization_tilt=45.0,
+                     latitude=45.0, rain_height=DEFAULT_RAIN_HEIGHT, station_height=0.0):
+    """
+    P.618-13 斜路径雨衰 (dB)，时间概率 p 下被超过的衰减
+    :param frequency: 频率 (GHz)
+    :param elevation: 路径仰角 θ (度)
+    :param rain_rate: 0.01% 时间概率的降雨率 R0.01 (mm/h)
+    :param exceedance_percentage: 时间概率 p (%)，0.001~5
+    :param latitude: 地面站纬度 φ (度)
+    :param rain_height: 雨顶高度 hR (km)
+    :param station_height: 地面站海拔 hs (km)
+    """
+    theta = np.radians(np.asarray(elevation, dtype=float))
+    rain_rate = np.asarray(rain_rate, dtype=float)
+    p = np.asarray(exceedance_percentage, dtype=float)
+    latitude = np.abs(np.asarray(latitude, dtype=float))
+    f = np.asarray(frequency, dtype=float)
+    if np.any((p < 0.001) | (p > 5)):
+        raise ValueError("P.618 雨衰时间概率适用范围为 0.001%~5%")
+    sin_theta = np.sin(theta)
+
+    # 步骤2：雨顶以下的斜路径长度
+    height = np.maximum(np.asarray(rain_height, dtype=float) - station_height, 0.0)
+    slant = np.where(theta >= np.radians(5), height / sin_theta,
+                     2 * height / (np.sqrt(sin_theta ** 2 + 2 * height / EFFECTIVE_EARTH_RADIUS) + sin_theta))
+    # 步骤3：水平投影
+    horizontal = slant * np.cos(theta)
+    # 步骤5：比衰减
+    gamma = specific_attenuation(f, rain_rate, polarization_tilt, np.degrees(theta))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 步骤6：水平缩短因子
+        r001 = 1 / (1 + 0.78 * np.sqrt(horizontal * gamma / f) - 0.38 * (1 - np.exp(-2 * horizontal)))
+        # 步骤7：垂直调整因子
+        zeta = np.arctan2(height, horizontal * r001)
+        rain_length = np.where(zeta > theta, horizontal * r001 / np.cos(theta), height / sin_theta)
+        chi = np.where(latitude < 36, 36 - latitude, 0.0)
+        v001 = 1 / (1 + np.sqrt(sin_theta) * (31 * (1 - np.exp(-np.degrees(theta) / (1 + chi)))
+                                              * np.sqrt(rain_length * gamma) / f ** 2 - 0.45))
+        # 步骤8、9：0.01% 时间概率的雨衰
+        a001 = gamma * rain_length * v001
+        # 步骤10：换算到时间概率 p
+        beta = np.where((p >= 1) | (latitude >= 36), 0.0,
+                        np.where(theta >= np.radians(25), -0.005 * (latitude - 36),
+                                 -0.005 * (latitude - 36) + 1.8 - 4.25 * sin_theta))
+        exponent = 0.655 + 0.033 * np.log(p) - 0.045 * np.log(a001) - beta * (1 - p) * sin_theta
+        attenuation = a001 * (p / 0.01) ** (-exponent)
+    return np.where((a001 > 0) & np.isfinite(attenuation), attenuation, 0.0)
@@ -0,0 +1,189 @@
+"""
+ReportWriter.py
+功能：
+1. 生成链路预算Excel仿真报告（无界面依赖，供GUI和批量/基准测试共用）。
+2. 多场景流式报告：基于openpyxl的write-only工作簿和预注册的命名样式，每个场景写一行，
+   行写出后即不再保留在内存中，内存占用不随场景数增长，导出时间随场景数线性增长。
+"""
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Border, Side, Alignment, NamedStyle
+from openpyxl.utils import get_column_letter
+
+from LinkResult import as_record
+from parameters import PARAM_MAPPING, RESULT_CATEGORIES
+
+# 报告样式
+REPORT_TITLE = "卫星链路预算仿真报告"
+TITLE_FONT = Font(name='微软雅黑', size=14, bold=True)
+HEADER_FONT = Font(name='微软雅黑', size=12, bold=True)
+THIN_BORDER = Border(left=Side(style='thin'),
+                     right=Side(style='thin'),
+                     top=Side(style='thin'),
+                     bottom=Side(style='thin'))
+CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+
+
+def input_rows_from_params(param_values):
+    """把 {参数键: 数值} 转为报告的 (中文名, 单位, 值) 行，顺序与 PARAM_MAPPING 一致"""
+    return [
+        (PARAM_MAPPING[param]["ch_name"], PARAM_MAPPING[param]["unit"], param_values[param])
+        for param in PARAM_MAPPING if param in param_values
+    ]
+
+
+def result_rows(results, link_type):
+    """按 RESULT_CATEGORIES 生成结果的 (标签, 单位, 值) 行，results 可以是字典、LinkResult 或 LinkResultBatch"""
+    results = as_record(results)
+    link_category = "卫星链路" if "星" in link_type else "地面链路"
+    return [
+        (item["label"], item["unit"], results.get(item["key"], 0))
+        for category in RESULT_CATEGORIES[link_category].values()
+        for item in category
+    ]
+
+
+def write_report(file_path, input_rows, results, link_type):
+    """
+    生成单场景Excel报告
+    :param input_rows: [(中文名, 单位, 值), ...] 输入参数行
+    :param results: 计算结果字典 / LinkResult / LinkResultBatch（为None时不写结果部分）
+    :param link_type: 链路类型
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "仿真报告"
+
+    # 写入报告标题
+    ws.merge_cells('A1:C1')
+    title_cell = ws['A1']
+    title_cell.value = REPORT_TITLE
+    title_cell.font = TITLE_FONT
+    title_cell.alignment = CENTER_ALIGNMENT
+    title_cell.border = THIN_BORDER
+
+    ws.append([])  # 空行
+
+    # 写入输入参数
+    ws.append(["输入参数", "单位", "值"])
+    for column in "ABC":
+        ws[column + str(ws.max_row)].font = HEADER_FONT
+    for row in input_rows:
+        ws.append(list(row))
+
+    # 设置列宽
+    ws.column_dimensions['A'].width = 30
+    ws.column_dimensions['B'].width = 15
+    ws.column_dimensions['C'].width = 20
+
+    # 写入计算结果
+    if results is not None:
+        ws.append([])  # 空行
+        ws.append(["计算结果", "单位", "值"])
+        for column in "ABC":
+            ws[column + str(ws.max_row)].font = HEADER_FONT
+        for row in result_rows(results, link_type):
+            ws.append(list(row))
+
+    # 应用边框样式到所有单元格
+    for row in ws.iter_rows():
+        for cell in row:
+            cell.border = THIN_BORDER
+
+    wb.save(file_path)
+
+
+def _named_style(name, font):
+    style = NamedStyle(name=name)
+    style.font = font
+    style.border = THIN_BORDER
+    style.alignment = CENTER_ALIGNMENT if name == "report_title" else Alignment()
+    return style
+
+
+class StreamingReportWriter:
+    """
+    多场景流式Excel报告（write-only模式）
+    表头：场景编号 + 输入参数列 + 结果列；每个场景一行
+    用法：
+    with StreamingReportWriter(path, input_params=["frequency", ...], link_type="星-地下行") as writer:
+        for input_values, results in scenarios:
+            writer.write_scenario(input_values, results)
+    """
+
+    def __init__(self, file_path, input_params, link_type, title=REPORT_TITLE):
+        self.file_path = file_path
+        self.input_params = list(input_params)
+        link_category = "卫星链路" if "星" in link_type else "地面链路"
+        self.result_items = [item for category in RESULT_CATEGORIES[link_category].values() for item in category]
+        self.row_count = 0
+
+        self.wb = Workbook(write_only=True)
+        # 预先注册命名样式，之后每个单元格只引用样式名
+        for style in (_named_style("report_title", TITLE_FONT),
+                      _named_style("report_header", HEADER_FONT),
+                      _named_style("report_data", Font(name='微软雅黑', size=11))):
+            self.wb.add_named_style(style)
+        self.ws = self.wb.create_sheet("仿真报告")
+        # write-only模式下列宽需在写入任何行之前设置
+        self.ws.column_dimensions['A'].width = 10
+        for index in range(len(self.input_params) + len(self.result_items)):
+            self.ws.column_dimensions[get_column_letter(index + 2)].width = 18
+
+        self.ws.append([self._cell(title, "report_title")])
+        self.ws.append([])
+        headers = ["场景"]
+        headers += [f"{PARAM_MAPPING[param]['ch_name']} ({PARAM_MAPPING[param]['unit']})"
+                    if param in PARAM_MAPPING else param for param in self.input_params]
+        headers += [f"{item['label']} ({item['unit']})" for item in self.result_items]
+        self.ws.append([self._cell(header, "report_header") for header in headers])
+
+    def _cell(self, value, style):
+        cell = WriteOnlyCell(self.ws, value=value)
+        cell.style = style
+        return cell
+
+    def write_scenario(self, input_values, results):
+        """写入一个场景：input_values 为 {参数键: 值}，results 为结果字典或 LinkResult"""
+        self.row_count += 1
+        row = [self._cell(self.row_count, "report_data")]
+        row += [self._cell(_excel_value(input_values.get(param)), "report_data") for param in self.input_params]
+        row += [self._cell(_excel_value(results.get(item["key"])), "report_data") for item in self.result_items]
+        self.ws.append(row)
+
+    def write_batch(self, input_columns, result_columns):
+        """写入一批场景：两个参数均为 {键: 等长数组/标量}，result_columns 也可以是 LinkResultBatch"""
+        keys = self.input_params + [item["key"] for item in self.result_items]
+        sources = [input_columns] * len(self.input_params) + [result_columns] * len(self.result_items)
+        columns = [np.atleast_1d(np.asarray(source[key])) if key in source else np.array([None])
+                   for key, source in zip(keys, sources)]
+        # 一次性转为Python列表，避免逐元素索引NumPy数组
+        columns = [column.tolist() for column in np.broadcast_arrays(*columns)]
+        for values in zip(*columns):
+            self.row_count += 1
+            row = [self._cell(self.row_count, "report_data")]
+            row += [self._cell(_excel_value(value), "report_data") for value in values]
+            self.ws.append(row)
+
+    def close(self):
+        self.wb.save(self.file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def _excel_value(value):
+    """把NumPy标量和非有限值转换为Excel可写的值"""
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not (value == value and abs(value) != float("inf")):
+        return str(value)
+    return value
@@ -3,9 +3,14 @@ SafeMath.py
 ------------------------
 安全数学函数库
 ------------------------
+纯计算核心（evaluate / safe_eval_array）不依赖tkinter，失败时抛出FormulaError；
+safe_eval 为界面适配层，仅在需要弹窗时才导入tkinter.messagebox，
+因此无界面服务器和批量计算进程导入本模块时不会加载Tk。
 """
+import ast
 import math
-from tkinter import messagebox
+from functools import lru_cache
+import numpy as np
 # ------------------------
 # 安全数学函数白名单（全角度制支持）
 # ------------------------
@@ -31,32 +36,139 @@ SAFE_MATH = {
     'inf': math.inf,    # 无穷大
 }
 
-# 修正参数中的中文逗号为英文逗号
-def safe_eval(expr, sign_massagebox=True):
+# 数组版本的数学函数（映射到NumPy ufunc，角度制与SAFE_MATH一致）
+ARRAY_MATH = {
+    'sin': lambda x: np.sin(np.radians(x)),  # 角度制正弦函数
+    'cos': lambda x: np.cos(np.radians(x)),  # 角度制余弦函数
+    'tan': lambda x: np.tan(np.radians(x)),  # 角度制正切函数
+    'arcsin': lambda x: np.degrees(np.arcsin(x)),  # 反正弦（返回角度）
+    'arccos': lambda x: np.degrees(np.arccos(x)),  # 反余弦（返回角度）
+    'arctan': lambda x: np.degrees(np.arctan(x)),  # 反正切（返回角度）
+    'sinrad': np.sin,  # 弧度制正弦函数
+    'cosrad': np.cos,  # 弧度制余弦函数
+    'tanrad': np.tan,  # 弧度制正切函数
+    'deg2rad': np.radians,  # 角度转弧度
+    'rad2deg': np.degrees,  # 弧度转角度
+    'pi': math.pi,  # π常量
+    'e': math.e,    # 自然常数e
+    'sqrt': np.sqrt,  # 平方根
+    'log': np.log10,  # 常用对数（底数10）
+    'ln': np.log,     # 自然对数（底数e）
+    'inf': math.inf,  # 无穷大
+    'abs': np.abs,    # 绝对值函数
+}
+
+# 表达式求值命名空间（导入时构建一次）
+SAFE_NAMESPACE = {
+    **SAFE_MATH,
+    '__builtins__': None,  # 禁用内置函数
+    'abs': abs,  # 绝对值函数
+    '+': lambda x, y: x + y,  # 加法
+    '-': lambda x, y: x - y,  # 减法
+    '*': lambda x, y: x * y,  # 乘法
+    '/': lambda x, y: x / y if y != 0 else 0,  # 除法（防止除零）
+    '**': lambda x, y: x ** y,  # 幂运算
+    '^': lambda x, y: x ** y,  # 幂运算（用^表示）
+    '%': lambda x, y: x % y if y != 0 else 0,  # 取模（防止除零）
+}
+
+# 编译缓存容量（按表达式文本缓存code对象）
+COMPILE_CACHE_SIZE = 4096
+
+
+class FormulaError(ValueError):
+    """表达式解析或求值失败"""
+
+    def __init__(self, expr, reason):
+        super().__init__(f"表达式解析失败: {reason}")
+        self.expr = expr
+        self.reason = reason
+
+
+class _ExpressionValidator(ast.NodeVisitor):
+    """编译期检查：禁止属性访问、双下划线名称和赋值表达式"""
+
+    def visit_Attribute(self, node):
+        raise ValueError(f"不允许属性访问: .{node.attr}")
+
+    def visit_Name(self, node):
+        if node.id.startswith('__') or node.id.endswith('__'):
+            raise ValueError(f"不允许的名称: {node.id}")
+        self.generic_visit(node)
+
+    def visit_NamedExpr(self, node):
+        raise ValueError("不允许赋值表达式")
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expr):
+    """解析并校验表达式，返回可重复求值的code对象（LRU缓存）"""
+    tree = ast.parse(expr.strip(), mode='eval')
+    _ExpressionValidator().visit(tree)
+    return compile(tree, '<safe_eval>', 'eval')
+
+
+def evaluate(expr):
     """
-    安全表达式求值函数
+    安全表达式求值（纯计算核心）
     限制可执行的函数和操作符，防止代码注入风险
-    返回表达式计算结果或None（计算失败时）
+    表达式首次出现时经AST校验后编译，之后直接复用缓存的code对象
+    失败时抛出FormulaError
     """
     try:
-        safe_namespace = {
-            **SAFE_MATH,
-            '__builtins__': None,  # 禁用内置函数
-            'abs': abs,  # 绝对值函数
-            '+': lambda x, y: x + y,  # 加法
-            '-': lambda x, y: x - y,  # 减法
-            '*': lambda x, y: x * y,  # 乘法
-            '/': lambda x, y: x / y if y != 0 else 0,  # 除法（防止除零）
-            '**': lambda x, y: x ** y,  # 幂运算
-            '^': lambda x, y: x ** y,  # 幂运算（用^表示）
-            '%': lambda x, y: x % y if y != 0 else 0,  # 取模（防止除零）
-        }
-        return eval(expr, {'__builtins__': {}}, safe_namespace)
+        return eval(compile_expression(expr), {'__builtins__': {}}, SAFE_NAMESPACE)
     except Exception as e:
+        raise FormulaError(expr, str(e)) from e
+
+
+def show_formula_error(error):
+    """界面适配：弹窗显示公式错误（延迟导入tkinter）"""
+    from tkinter import messagebox
+    messagebox.showerror("公式错误", str(error))
+
+
+# 修正参数中的中文逗号为英文逗号
+def safe_eval(expr, sign_massagebox=True):
+    """
+    安全表达式求值函数（界面适配层）
+    返回表达式计算结果或None（计算失败时），sign_massagebox为True时弹窗提示错误
+    """
+    try:
+        return evaluate(expr)
+    except FormulaError as e:
         if sign_massagebox:
-            messagebox.showerror("公式错误", f"表达式解析失败: {str(e)}")
+            show_formula_error(e)
         return None
 
+
+def expression_names(expr):
+    """返回表达式中引用的变量名（不含内置数学函数和常量）"""
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except SyntaxError as e:
+        raise FormulaError(expr, str(e)) from e
+    return {node.id for node in ast.walk(tree)
+            if isinstance(node, ast.Name) and node.id not in ARRAY_MATH}
+
+
+def safe_eval_array(expr, variables=None):
+    """
+    向量化表达式求值：变量名对应数组列，一次求值得到整列结果
+    例如 safe_eval_array("P_tx - 30 + G_ant", {"P_tx": p_tx, "G_ant": g_ant})
+    与safe_eval共用编译缓存和AST校验；失败时抛出FormulaError（不弹窗）
+    """
+    namespace = dict(ARRAY_MATH)
+    for name, value in (variables or {}).items():
+        if not name.isidentifier() or name.startswith('__') or name.endswith('__'):
+            raise FormulaError(expr, f"非法变量名: {name}")
+        namespace[name] = np.asarray(value, dtype=float)
+    try:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.asarray(eval(compile_expression(expr), {'__builtins__': {}}, namespace), dtype=float)
+    except Exception as e:
+        raise FormulaError(expr, str(e)) from e
+
+
 def format_result(value):
     """
     智能格式化结果，最多保留两位小数，去掉多余的0
@@ -0,0 +1,340 @@
+"""
+Scenario.py
+功能：
+1. 场景文件格式（带版本号的 JSON，读取时也支持 TOML）：描述链路类型、参数值或公式、FLAG_DEFAULTS 中可选参数的启用状态、
+   地面链路的场景/链路状态，以及雨衰、气体衰减、天线方向图等模型选项。界面（保存/加载场景）和 BatchRunner（--scenario）共用。
+2. Scenario.load / Scenario.from_dict 读取时按 PARAM_MAPPING 校验一次（参数名可用中文名），
+   compile() 把公式求值并按启用状态、链路类型组装为 CompiledScenario；CompiledScenario 可反复计算，不再解析任何内容。
+3. assemble_input_params 是 参数值 → perform_calculations 输入字典 的唯一实现（原界面 _get_input_params 与
+   BatchRunner.build_input_columns 中的重复逻辑），三处路径共用。
+4. ScenarioLibrary 按目录建立场景库：创建时只列出文件名，按名称首次访问时才读取、校验和编译，编译结果按 LRU 缓存，
+   适用于数千个场景文件。
+
+场景文件示例（scenario.json）：
+{
+    "version": 1,
+    "name": "LEO 下行 Ka",
+    "link_type": "星-地下行",
+    "params": {"frequency": 20, "bandwidth": 100, "satellite_eirp": "56-3", "卫星扫描角": 30},
+    "flags": {"rain_rate": true},
+    "options": {"rain_model": "P.618", "atmospheric_model": "P.676"}
+}
+地面链路另有 "scenario"（城市宏蜂窝UMa / 农村宏蜂窝RMa）和 "los_condition"（LoS / NLoS / LoS/NLoS概率加权）。
+未给出的参数取 PARAM_MAPPING 默认值，未给出的启用状态取 FLAG_DEFAULTS。
+"""
+
+import json
+import math
+import os
+import types
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from AntennaPattern import build_pattern
+from LinkCalculator import (LinkCalculator, SATELLITE_LINK_TYPES, RAIN_MODEL_PARAMS, GAS_MODEL_PARAMS,
+                            BEAM_GEOMETRY_PARAMS)
+from SafeMath import evaluate
+from parameters import PARAM_MAPPING, PARAM_GROUPS, FLAG_DEFAULTS
+
+try:
+    import tomllib
+except ImportError:  # Python 3.11 以前没有 tomllib，此时只支持 JSON 场景文件
+    tomllib = None
+
+SCENARIO_FORMAT_VERSION = 1
+LINK_TYPES = ["星-地下行", "星-地上行", "地-地下行", "地-地上行"]
+TERRESTRIAL_SCENARIOS = ["城市宏蜂窝UMa", "农村宏蜂窝RMa"]
+LOS_CONDITIONS = ["LoS", "NLoS", "LoS/NLoS概率加权"]
+DEFAULT_SCENARIO = TERRESTRIAL_SCENARIOS[0]
+DEFAULT_LOS_CONDITION = LOS_CONDITIONS[0]
+
+# 模型选项：选项名 → 允许的取值（None 表示数值，"pattern" 表示方向图描述）
+OPTION_CHOICES = {"rain_model": ("P.618",), "atmospheric_model": ("P.676",), "beam_pattern": "pattern"}
+OPTION_CHOICES.update({name: None for name in RAIN_MODEL_PARAMS + GAS_MODEL_PARAMS + BEAM_GEOMETRY_PARAMS
+                       + ("off_axis_angle", "scan_roll_off")})
+
+# 收发端通用键 → 在 PARAM_GROUPS 中的位置
+GENERIC_PARAMS = {"tx_eirp": ("tx_params", 0), "rx_antenna_gain": ("rx_params", 0),
+                  "rx_noise_figure": ("rx_params", 1), "rx_noise_temp": ("rx_params", 2)}
+PARAM_ALIASES = {info["ch_name"]: param for param, info in PARAM_MAPPING.items()}
+
+
+def default_value(param, link_type):
+    """取参数在指定链路类型下的默认值（字符串，可能是公式）"""
+    value = PARAM_MAPPING[param]["default_value"]
+    return value.get(link_type, "0") if isinstance(value, dict) else value
+
+
+def link_params(link_type):
+    """链路类型用到的全部参数（与界面输入框一一对应）"""
+    config = PARAM_GROUPS[link_type]
+    base_config = PARAM_GROUPS[config["base"]]
+    params = [param for group in ("common", "optional", "beam_params", "interference_params")
+              for param in base_config[group]]
+    return params + config["tx_params"] + config["rx_params"]
+
+
+def assemble_input_params(link_type, value, optional_value):
+    """
+    按链路类型把参数组装为 perform_calculations 的输入字典
+    :param value: value(param, link_param=None) → 数值；link_param 为按链路类型选择的参数（如 satellite_eirp），
+                  param 为其通用键（如 tx_eirp）
+    :param optional_value: optional_value(param, disabled_value) → 数值，参数未启用时应返回 disabled_value
+    """
+    config = PARAM_GROUPS[link_type]
+    base_config = PARAM_GROUPS[config["base"]]
+    # 基础参数
+    input_params = {param: value(param) for param in base_config["common"]}
+    # 可选参数
+    for param in base_config["optional"] + base_config["beam_params"]:
+        input_params[param] = optional_value(param, 0)
+    # 干扰参数特殊处理
+    input_params["interference_psd"] = optional_value("interference_psd", -math.inf)
+    # 发射端 / 接收端参数
+    input_params["tx_eirp"] = value("tx_eirp", config["tx_params"][0])
+    rx_ant, rx_nf, rx_nt = config["rx_params"]
+    input_params["rx_antenna_gain"] = value("rx_antenna_gain", rx_ant)
+    input_params["rx_noise_figure"] = value("rx_noise_figure", rx_nf)
+    input_params["rx_noise_temp"] = value("rx_noise_temp", rx_nt)
+    return input_params
+
+
+def parse_value(value):
+    """数值或公式字符串 → float"""
+    if isinstance(value, bool):
+        raise ValueError(f"参数值应为数值或公式: {value}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float(evaluate(str(value)))
+
+
+class CompiledScenario:
+    """编译后的场景：input_params 已是数值（只读映射），可反复计算"""
+
+    __slots__ = ("name", "link_type", "input_params", "options", "source")
+
+    def __init__(self, name, link_type, input_params, options, source=None):
+        self.name = name
+        self.link_type = link_type
+        self.input_params = types.MappingProxyType(input_params)
+        self.options = types.MappingProxyType(options)
+        self.source = source
+
+    def run(self, calculator=None):
+        """单点计算，返回结果字典"""
+        calculator = calculator or LinkCalculator()
+        return calculator.perform_calculations(self.input_params, self.link_type)
+
+    def run_batch(self, overrides=None, calculator=None):
+        """批量计算：overrides 中的参数（标量或数组）覆盖场景值，返回列式结果字典"""
+        calculator = calculator or LinkCalculator()
+        return calculator.perform_calculations_batch(dict(self.input_params, **(overrides or {})), self.link_type)
+
+    def __repr__(self):
+        return f"CompiledScenario({self.name!r}, {self.link_type!r})"
+
+
+@dataclass
+class Scenario:
+    """
+    场景描述（校验后的原始内容，参数值保留公式字符串）
+    params: {参数键: 数值或公式}，键已规范为 PARAM_MAPPING 的参数键
+    flags: {可选参数: 是否启用}，只包含文件中给出的项
+    options: 模型选项（rain_model、atmospheric_model、beam_pattern 等），原样传入 input_params
+    """
+    link_type: str
+    params: dict = field(default_factory=dict)
+    flags: dict = field(default_factory=dict)
+    scenario: str = None
+    los_condition: str = None
+    options: dict = field(default_factory=dict)
+    name: str = ""
+    source: str = None
+
+    @classmethod
+    def from_dict(cls, data, source=None):
+        """校验场景字典并规范参数名，出错时抛出 ValueError（消息带文件路径）"""
+        where = f"场景 {source}: " if source else "场景: "
+        if not isinstance(data, dict):
+            raise ValueError(f"{where}内容应为对象")
+        version = data.get("version")
+        if not isinstance(version, int) or isinstance(version, bool):
+            raise ValueError(f"{where}缺少整数版本号 version")
+        if version > SCENARIO_FORMAT_VERSION:
+            raise ValueError(f"{where}格式版本 {version} 高于当前支持的版本 {SCENARIO_FORMAT_VERSION}")
+        unknown = set(data) - {"version", "name", "link_type", "params", "flags", "scenario", "los_condition", "options"}
+        if unknown:
+            raise ValueError(f"{where}未知字段 {sorted(unknown)}")
+
+        link_type = data.get("link_type")
+        if link_type not in LINK_TYPES:
+            raise ValueError(f"{where}链路类型应为 {LINK_TYPES} 之一: {link_type}")
+        config = PARAM_GROUPS[link_type]
+        allowed = set(link_params(link_type))
+
+        params = {}
+        for key, value in data.get("params", {}).items():
+            param = PARAM_ALIASES.get(key, key)
+            if param in GENERIC_PARAMS:
+                group, index = GENERIC_PARAMS[param]
+                param = config[group][index]
+            if param not in PARAM_MAPPING:
+                raise ValueError(f"{where}未知参数 {key}")
+            if param not in allowed:
+                raise ValueError(f"{where}参数 {key} 不适用于链路类型 {link_type}")
+            if param in params:
+                raise ValueError(f"{where}参数 {key} 重复")
+            if not isinstance(value, (int, float, str)) or isinstance(value, bool):
+                raise ValueError(f"{where}参数 {key} 的值应为数值或公式字符串")
+            params[param] = value
+
+        flags = {}
+        for key, value in data.get("flags", {}).items():
+            param = PARAM_ALIASES.get(key, key)
+            if param not in FLAG_DEFAULTS:
+                raise ValueError(f"{where}未知可选参数标志 {key}，可选: {list(FLAG_DEFAULTS)}")
+            if not isinstance(value, bool):
+                raise ValueError(f"{where}可选参数标志 {key} 应为 true/false")
+            flags[param] = value
+
+        scenario, los_condition = data.get("scenario"), data.get("los_condition")
+        if link_type in SATELLITE_LINK_TYPES:
+            if scenario is not None or los_condition is not None:
+                raise ValueError(f"{where}scenario / los_condition 只适用于地面链路")
+        else:
+            if scenario is not None and scenario not in TERRESTRIAL_SCENARIOS:
+                raise ValueError(f"{where}地面场景应为 {TERRESTRIAL_SCENARIOS} 之一: {scenario}")
+            if los_condition is not None and los_condition not in LOS_CONDITIONS:
+                raise ValueError(f"{where}链路状态应为 {LOS_CONDITIONS} 之一: {los_condition}")
+
+        options = dict(data.get("options", {}))
+        for key, value in options.items():
+            if key not in OPTION_CHOICES:
+                raise ValueError(f"{where}未知模型选项 {key}，可选: {list(OPTION_CHOICES)}")
+            choices = OPTION_CHOICES[key]
+            if choices == "pattern":
+                try:
+                    build_pattern(value)
+                except (TypeError, KeyError, ValueError) as e:
+                    raise ValueError(f"{where}方向图描述 {key} 无效: {e}") from e
+            elif choices is None:
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    raise ValueError(f"{where}模型选项 {key} 应为数值")
+            elif value not in choices:
+                raise ValueError(f"{where}模型选项 {key} 应为 {list(choices)} 之一: {value}")
+
+        name = data.get("name") or (os.path.splitext(os.path.basename(source))[0] if source else "")
+        return cls(link_type, params, flags, scenario, los_condition, options, name, source)
+
+    @classmethod
+    def load(cls, path):
+        """读取并校验场景文件（.json，或 Python 3.11+ 上的 .toml）"""
+        if path.lower().endswith(".toml"):
+            if tomllib is None:
+                raise RuntimeError("读取 TOML 场景需要 Python 3.11 及以上版本")
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        return cls.from_dict(data, source=path)
+
+    def to_dict(self):
+        data = {"version": SCENARIO_FORMAT_VERSION}
+        if self.name:
+            data["name"] = self.name
+        data.update({"link_type": self.link_type, "params": dict(self.params), "flags": dict(self.flags)})
+        if self.link_type not in SATELLITE_LINK_TYPES:
+            data["scenario"] = self.scenario or DEFAULT_SCENARIO
+            data["los_condition"] = self.los_condition or DEFAULT_LOS_CONDITION
+        if self.options:
+            data["options"] = dict(self.options)
+        return data
+
+    def save(self, path):
+        """保存为 JSON 场景文件"""
+        if not path.lower().endswith(".json"):
+            raise ValueError("场景文件只支持保存为 .json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+
+    def enabled(self, param):
+        return self.flags.get(param, FLAG_DEFAULTS.get(param, True))
+
+    def compile(self):
+        """公式求值、应用启用状态和默认值，返回 CompiledScenario"""
+        where = f"场景 {self.source}: " if self.source else "场景: "
+        values = {}
+        for param in link_params(self.link_type):
+            raw = self.params.get(param, default_value(param, self.link_type))
+            try:
+                values[param] = parse_value(raw)
+            except ValueError as e:
+                raise ValueError(f"{where}参数 {param} 的值 {raw!r} 无效: {e}") from e
+
+        input_params = assemble_input_params(
+            self.link_type,
+            lambda param, link_param=None: values[link_param or param],
+            lambda param, disabled_value: values[param] if self.enabled(param) else disabled_value,
+        )
+        if self.link_type not in SATELLITE_LINK_TYPES:
+            input_params["scenario"] = self.scenario or DEFAULT_SCENARIO
+            input_params["los_condition"] = self.los_condition or DEFAULT_LOS_CONDITION
+        input_params.update(self.options)
+        return CompiledScenario(self.name, self.link_type, input_params, dict(self.options), self.source)
+
+
+class ScenarioLibrary:
+    """
+    场景库：目录下的 .json / .toml 场景文件（不递归）
+    创建时只列出文件，按名称（文件名去掉扩展名）首次访问时读取和编译，编译结果按 LRU 缓存 cache_size 个
+    """
+
+    def __init__(self, directory, cache_size=1024):
+        self.directory = directory
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.paths = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() not in (".json", ".toml") or not entry.is_file():
+                    continue
+                if stem in self.paths:
+                    raise ValueError(f"场景库中存在同名场景: {self.paths[stem]} 与 {entry.path}")
+                self.paths[stem] = entry.path
+        self.paths = dict(sorted(self.paths.items()))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def load(self, name):
+        """读取并校验场景（不编译、不缓存）"""
+        if name not in self.paths:
+            raise KeyError(f"场景库中没有场景: {name}")
+        return Scenario.load(self.paths[name])
+
+    def __getitem__(self, name):
+        """返回编译后的场景，命中缓存时不再读取文件"""
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            return self._cache[name]
+        compiled = self.load(name).compile()
+        self._cache[name] = compiled
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def items(self):
+        """逐个生成 (名称, CompiledScenario)，按需读取"""
+        for name in self.paths:
+            yield name, self[name]
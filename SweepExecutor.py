@@ -0,0 +1,143 @@
+"""
+SweepExecutor.py
+功能：
+1. 多进程参数扫描执行器：把大规模参数网格切分为若干块，分发给 concurrent.futures.ProcessPoolExecutor。
+2. 结果写入内存映射（np.memmap）文件，各工作进程直接写入自己负责的行区间，
+   不需要把逐行的结果字典 pickle 回主进程。
+
+参数网格：
+- grid 中取值为标量的参数在所有点上相同；
+- 取值为一维数组的参数构成网格的一个轴，所有轴做笛卡尔积（与 np.meshgrid(..., indexing="ij") 展平后的顺序一致）；
+- 工作进程只接收各轴的取值和 [start, stop) 区间，通过 np.unravel_index 自行还原本块参数，避免传输整网格；
+- 全部参数均为标量时只有一个网格点，结果为 0 维数组。
+
+结果文件：
+未指定 result_path 时在临时目录创建结果文件，close()（或退出 with 语句）时删除，
+因此应在 close 之前用完（或复制）run 返回的结果。
+
+示例：
+with SweepExecutor(workers=8, chunk_size=250000) as executor:
+    results = executor.run({"satellite_scan_angle": np.linspace(0, 60, 1000),
+                            "frequency": np.linspace(1, 30, 100), "tx_eirp": 56, ...}, "星-地下行")
+    results["c_to_n"]  # 形状为 (1000, 100) 的只读视图
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from LinkCalculator import LinkCalculator, SATELLITE_LINK_TYPES
+
+SATELLITE_RESULT_KEYS = [
+    "path_loss", "total_loss", "noise_psd", "received_signal_psd", "c_to_n", "c_to_n_plus_i",
+    "gt_ratio", "achievable_rate", "terminal_elevation_angle", "distance", "rain_fade",
+]
+TERRESTRIAL_RESULT_KEYS = SATELLITE_RESULT_KEYS[:8] + ["distance"]
+
+
+def result_keys(link_type):
+    """返回指定链路类型下 perform_calculations_batch 的结果列"""
+    return SATELLITE_RESULT_KEYS if link_type in SATELLITE_LINK_TYPES else TERRESTRIAL_RESULT_KEYS
+
+
+def split_grid(grid):
+    """把网格拆分为 (标量参数, 轴参数名列表, 各轴取值列表)"""
+    scalars, axis_names, axes = {}, [], []
+    for name, value in grid.items():
+        if isinstance(value, str) or np.ndim(value) == 0:
+            scalars[name] = value
+        else:
+            axis = np.asarray(value, dtype=float)
+            if axis.ndim != 1:
+                raise ValueError(f"网格参数 {name} 必须是一维数组")
+            axis_names.append(name)
+            axes.append(axis)
+    return scalars, axis_names, axes
+
+
+def _sweep_worker(task):
+    """工作进程：计算 [start, stop) 区间并写入内存映射结果文件"""
+    path, total, keys, scalars, axis_names, axes, link_type, start, stop = task
+    shape = tuple(len(axis) for axis in axes)
+    # 没有扫描轴时只有一个网格点，np.unravel_index 不接受 0 维形状
+    index = np.unravel_index(np.arange(start, stop), shape) if shape else ()
+    input_params = dict(scalars)
+    for name, axis, axis_index in zip(axis_names, axes, index):
+        input_params[name] = axis[axis_index]
+
+    columns = LinkCalculator().perform_calculations_batch(input_params, link_type)
+    out = np.memmap(path, dtype=np.float64, mode="r+", shape=(len(keys), total))
+    for row, key in enumerate(keys):
+        out[row, start:stop] = columns[key]
+    out.flush()
+    del out
+    return stop - start
+
+
+class SweepExecutor:
+    """基于进程池和内存映射结果缓冲区的参数扫描执行器"""
+
+    def __init__(self, workers=None, chunk_size=100000, result_path=None):
+        """
+        :param workers: 工作进程数，默认等于 CPU 核数
+        :param chunk_size: 每个任务计算的网格点数
+        :param result_path: 结果内存映射文件路径，默认在临时目录创建，close() 时删除
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size 必须大于 0")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.result_path = result_path
+        self._temp_paths = []
+
+    def close(self):
+        """删除 run 在临时目录创建的结果文件（此后不应再使用 run 返回的结果）"""
+        while self._temp_paths:
+            try:
+                os.remove(self._temp_paths.pop())
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def run(self, grid, link_type):
+        """
+        执行参数扫描
+        :param grid: 参数网格字典，标量为固定参数，一维数组为扫描轴
+        :param link_type: 链路类型
+        :return: 结果字典，每个键对应形状为各轴长度的 np.memmap 只读视图（无扫描轴时为 0 维）
+        """
+        scalars, axis_names, axes = split_grid(grid)
+        shape = tuple(len(axis) for axis in axes)
+        total = int(np.prod(shape, dtype=np.int64))
+        keys = result_keys(link_type)
+
+        path = self.result_path
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="sweep_", suffix=".dat")
+            os.close(fd)
+            self._temp_paths.append(path)
+        out = np.memmap(path, dtype=np.float64, mode="w+", shape=(len(keys), total))
+        out.flush()
+        del out
+
+        tasks = [
+            (path, total, keys, scalars, axis_names, axes, link_type, start, min(start + self.chunk_size, total))
+            for start in range(0, total, self.chunk_size)
+        ]
+        if self.workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                _sweep_worker(task)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for _ in pool.map(_sweep_worker, tasks):
+                    pass
+
+        results = np.memmap(path, dtype=np.float64, mode="r", shape=(len(keys), total))
+        return {key: results[row].reshape(shape) for row, key in enumerate(keys)}
@@ -0,0 +1,63 @@
+"""
+BatchRunner 批量计算和结果文件写出测试
+"""
+
+import csv
+
+import numpy as np
+import pytest
+
+from BatchRunner import RESULT_KEYS, run_batch
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_csv_results_independent_of_chunk_size(tmp_path):
+    input_path = tmp_path / "in.csv"
+    write_csv(input_path, [{"frequency": "12", "satellite_scan_angle": "0"},
+                           {"frequency": "20", "satellite_scan_angle": "30"},
+                           {"frequency": "30", "satellite_scan_angle": "45"}])
+    outputs = []
+    for chunk_size in (1, 10):
+        output_path = tmp_path / f"out_{chunk_size}.csv"
+        assert run_batch(str(input_path), str(output_path), "星-地下行", chunk_size=chunk_size) == (3, 0)
+        with open(output_path, newline="", encoding="utf-8-sig") as f:
+            outputs.append(list(csv.DictReader(f)))
+    assert outputs[0] == outputs[1]
+    c_to_n = [float(row["c_to_n"]) for row in outputs[0]]
+    assert all(np.isfinite(c_to_n)) and c_to_n[0] > c_to_n[2]
+
+
+def test_parquet_error_row_after_clean_chunk(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    input_path, output_path = tmp_path / "in.csv", tmp_path / "out.parquet"
+    # 第一块全部成功（error 列全空），第二块有出错行
+    write_csv(input_path, [{"frequency": "12"}, {"frequency": "14"}, {"frequency": "abc"}])
+    assert run_batch(str(input_path), str(output_path), "星-地下行", chunk_size=2) == (3, 1)
+
+    table = pq.read_table(output_path)
+    assert str(table.schema.field("error").type) == "string"
+    assert str(table.schema.field("link_type").type) == "string"
+    assert all(str(table.schema.field(key).type) == "double" for key in RESULT_KEYS)
+    errors = table.column("error").to_pylist()
+    assert errors[:2] == [None, None] and errors[2]
+    c_to_n = np.array(table.column("c_to_n").to_pylist(), dtype=float)
+    assert np.isfinite(c_to_n[:2]).all() and np.isnan(c_to_n[2])
+
+
+def test_parquet_numeric_input_columns(tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    input_path, output_path = tmp_path / "in.parquet", tmp_path / "out.parquet"
+    pq.write_table(pyarrow.table({"frequency": [12.0, 14.0, 20.0], "satellite_scan_angle": [0.0, 10.0, 20.0]}),
+                   input_path)
+    assert run_batch(str(input_path), str(output_path), "星-地下行", chunk_size=2) == (3, 0)
+
+    table = pq.read_table(output_path)
+    assert str(table.schema.field("frequency").type) == "double"
+    assert table.column("frequency").to_pylist() == [12.0, 14.0, 20.0]
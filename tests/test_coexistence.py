@@ -0,0 +1,60 @@
+"""
+邻频共存分析和 ACIR 计算测试
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from Coexistence import adjacent_channel_interference, pair_acir
+from LinkCalculator import LinkCalculator
+
+
+def test_calculate_acir():
+    calculator = LinkCalculator()
+    acir = calculator.calculate_acir(45.0, 33.0)
+    assert isinstance(acir, float)
+    assert acir == pytest.approx(-10 * math.log10(10 ** -4.5 + 10 ** -3.3))
+    with pytest.raises(ValueError):
+        calculator.calculate_acir(0, 33.0)
+    # 数组中 ACLR/ACS 为 0 的元素为 NaN，不影响其余元素
+    array = calculator.calculate_acir(np.array([45.0, 0.0, 45.0]), np.array([33.0, 33.0, 0.0]))
+    assert array[0] == pytest.approx(acir) and np.isnan(array[1:]).all()
+
+
+VICTIMS = {"frequency": np.array([2.0, 2.0125, 2.025]), "bandwidth": 5.0,
+           "received_signal_psd": np.array([-90.0, -95.0, -100.0]), "noise_psd": -107.0, "acs": 33.0}
+AGGRESSORS = {"frequency": np.array([2.0, 2.0075, 2.0175]), "bandwidth": 5.0, "tx_psd": 20.0,
+              "aclr": np.array([45.0, 45.0, 0.0]), "aclr2": 50.0}
+
+
+def test_pair_acir_by_channel_offset():
+    victim_index = np.array([0, 0, 2, 1, 2])
+    aggressor_index = np.array([0, 1, 2, 0, 0])
+    acir = pair_acir(VICTIMS, AGGRESSORS, victim_index, aggressor_index)
+    calculator = LinkCalculator()
+    assert acir[0] == 0.0                                                # 同频
+    assert acir[1] == pytest.approx(calculator.calculate_acir(45, 33))   # 第一邻道
+    assert np.isnan(acir[2])                                             # 第一邻道，ACLR 未给出
+    assert acir[3] == pytest.approx(calculator.calculate_acir(50, 33))   # 第二邻道
+    assert acir[4] == np.inf                                             # 超出第二邻道
+
+
+def test_adjacent_channel_interference_aggregates_per_victim():
+    victim_index = np.array([0, 0, 1, 2])
+    aggressor_index = np.array([1, 1, 0, 1])
+    coupling = np.array([120.0, 125.0, 130.0, 110.0])
+    result = adjacent_channel_interference(VICTIMS, AGGRESSORS, victim_index, aggressor_index, coupling, chunk_size=3)
+    acir = LinkCalculator().calculate_acir(45, 33)
+    expected = 10 * np.log10(10 ** ((20 - 120 - acir) / 10) + 10 ** ((20 - 125 - acir) / 10))
+    assert result["leaked_interference_psd"][0] == pytest.approx(expected)
+    assert np.all(result["degradation"][np.isfinite(result["degradation"])] >= 0)
+    assert result["i_to_n"][0] == pytest.approx(expected + 107)
+
+
+def test_missing_aclr_marks_only_affected_victim():
+    result = adjacent_channel_interference(VICTIMS, AGGRESSORS, np.array([0, 2]), np.array([1, 2]), 120.0)
+    assert np.isfinite(result["leaked_interference_psd"][0])
+    assert np.isneginf(result["leaked_interference_psd"][1])
+    assert np.isnan(result["leaked_interference_psd"][2])
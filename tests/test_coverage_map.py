@@ -0,0 +1,29 @@
+"""
+覆盖图测试
+"""
+
+import numpy as np
+
+from CoverageMap import CoverageGrid, WalkerConstellation, _received_psd, coverage_map, max_central_angle
+from LinkCalculator import LinkCalculator
+from Scenario import Scenario
+
+PARAMS = dict(Scenario("星-地下行").compile().input_params)
+
+
+def test_coverage_point_at_the_horizon():
+    calculator = LinkCalculator(geometry_cache_size=0)
+    central_angle = max_central_angle(550, 0.0, calculator.earth_radius) * np.array([0.0, 0.5, 1.0])
+    elevation, received = _received_psd(calculator, PARAMS, central_angle, 550)
+    np.testing.assert_allclose(elevation, [90.0, elevation[1], 0.0], atol=1e-5)
+    assert np.isfinite(received).all() and received[0] > received[1] > received[2]
+
+
+def test_coverage_map_in_memory_and_memmap(tmp_path):
+    constellation = WalkerConstellation(total=24, planes=4, phasing=1, altitude=550, inclination=53)
+    grid = CoverageGrid(lat_min=-30, lat_max=30, lon_min=0, lon_max=60, resolution=5.0)
+    in_memory = coverage_map(constellation, grid, PARAMS, min_elevation=0.0)
+    assert in_memory.shape == (5,) + grid.shape
+    output_path = str(tmp_path / "coverage.npy")
+    mapped = coverage_map(constellation, grid, PARAMS, output_path=output_path, min_elevation=0.0, tile_rows=3)
+    np.testing.assert_array_equal(np.asarray(mapped), in_memory)
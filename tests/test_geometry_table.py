@@ -0,0 +1,62 @@
+"""
+GeometryTable 几何查找表测试
+"""
+
+import numpy as np
+import pytest
+
+from GeometryTable import HORIZON_BAND, GeometryTable, build_geometry_table
+from LinkCalculator import LinkCalculator
+from Scenario import Scenario
+
+HEIGHTS = [400.0, 550.0, 1200.0]
+
+
+@pytest.fixture(scope="module")
+def table():
+    return build_geometry_table(HEIGHTS, resolution=0.01)
+
+
+def test_lookup_accuracy_up_to_horizon(table):
+    exact = LinkCalculator(geometry_cache_size=0)
+    for height, max_angle in zip(table.heights, table.max_angle):
+        scan_angle = np.linspace(0.0, max_angle, 20001)[:-1]
+        elevation, distance = table.lookup(scan_angle, height)
+        expected_elevation, expected_distance = exact.calculate_geometric_parameters(scan_angle, height)
+        inner = scan_angle <= max_angle - HORIZON_BAND
+        np.testing.assert_allclose(elevation[inner], expected_elevation[inner], atol=1e-4)
+        np.testing.assert_allclose(distance[inner], expected_distance[inner], atol=0.011)
+        np.testing.assert_allclose(elevation[~inner], expected_elevation[~inner], atol=1e-9)
+        np.testing.assert_allclose(distance[~inner], expected_distance[~inner], rtol=1e-12)
+
+
+def test_lookup_propagates_nan(table):
+    elevation, distance = table.lookup(np.array([np.nan, 10.0, 10.0]), np.array([550.0, 550.0, np.nan]))
+    assert np.isnan(elevation[[0, 2]]).all() and np.isnan(distance[[0, 2]]).all()
+    assert np.isfinite(elevation[1]) and np.isfinite(distance[1])
+    assert np.isnan(table.free_space_loss(np.nan, 550.0, 20.0))
+    with pytest.raises(ValueError):
+        table.lookup(10.0, 600.0)
+    with pytest.raises(ValueError):
+        table.lookup(np.array([10.0, 80.0]), 550.0)
+
+
+def test_scalar_and_batch_paths_both_use_table(table):
+    calculator = LinkCalculator(geometry_table=table)
+    params = dict(Scenario("星-地下行").compile().input_params, satellite_height=550.0)
+    scan_angle = np.array([0.0, 30.0, 60.0, 65.5, float(table.max_angle[1]) - 0.005])
+    batch = calculator.perform_calculations_batch(dict(params, satellite_scan_angle=scan_angle), "星-地下行")
+    for i, angle in enumerate(scan_angle):
+        scalar = calculator.perform_calculations(dict(params, satellite_scan_angle=float(angle)), "星-地下行")
+        for key, value in scalar.items():
+            assert isinstance(value, float)
+            assert value == pytest.approx(batch[key][i], rel=1e-12), key
+
+
+def test_save_and_memory_mapped_load(table, tmp_path):
+    path = str(tmp_path / "shells.npz")
+    table.save(path)
+    loaded = GeometryTable.load(path)
+    assert isinstance(loaded.elevation, np.memmap)
+    scan_angle = np.linspace(0.0, 57.0, 101)
+    np.testing.assert_array_equal(loaded.lookup(scan_angle, 1200.0), table.lookup(scan_angle, 1200.0))
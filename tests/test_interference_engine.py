@@ -0,0 +1,49 @@
+"""
+同频干扰聚合引擎测试
+"""
+
+import numpy as np
+
+from CoverageMap import unit_vectors
+from InterferenceEngine import BeamSet, InterferenceEngine
+
+
+def make_engine(beam_count=60, terminal_chunk=1024, beam_chunk=1024, seed=0):
+    rng = np.random.default_rng(seed)
+    latitude, longitude = rng.uniform(-8, 8, beam_count), rng.uniform(-8, 8, beam_count)
+    satellite_position = unit_vectors(latitude, longitude) * (6371 + 550)
+    beams = BeamSet.from_ground_points(satellite_position, latitude + rng.uniform(-1, 1, beam_count),
+                                       longitude + rng.uniform(-1, 1, beam_count), eirp_density=34)
+    return InterferenceEngine(beams, frequency=2.0, terminal_chunk=terminal_chunk, beam_chunk=beam_chunk)
+
+
+def terminals(count=500, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-8, 8, count), rng.uniform(-8, 8, count), rng.integers(0, 60, count)
+
+
+def test_serving_signal_matches_full_matrix():
+    engine = make_engine()
+    latitude, longitude, serving = terminals()
+    result = engine.evaluate(latitude, longitude, serving, rx_noise_figure=7, rx_noise_temp=290)
+    matrix = engine.received_psd(engine._terminal_positions(latitude, longitude), slice(None))
+    expected = matrix[np.arange(len(serving)), serving]
+    finite = np.isfinite(expected)
+    np.testing.assert_allclose(result["received_signal_psd"][finite], expected[finite], rtol=1e-12)
+    assert np.all(np.isneginf(result["received_signal_psd"][~finite]))
+
+
+def test_aggregate_independent_of_chunking_and_excludes_serving_beam():
+    latitude, longitude, serving = terminals()
+    results = [make_engine(terminal_chunk=tc, beam_chunk=bc).aggregate(latitude, longitude, exclude=serving, top_k=4)
+               for tc, bc in [(1024, 1024), (37, 11)]]
+    np.testing.assert_allclose(results[0]["interference_psd"], results[1]["interference_psd"], rtol=1e-12)
+    np.testing.assert_array_equal(results[0]["top_beams"], results[1]["top_beams"])
+    assert not np.any(results[0]["top_beams"] == serving[:, None])
+
+    engine = make_engine()
+    matrix = engine.received_psd(engine._terminal_positions(latitude, longitude), slice(None))
+    matrix[np.arange(len(serving)), serving] = -np.inf
+    with np.errstate(divide="ignore"):
+        expected = 10 * np.log10((10 ** (matrix / 10)).sum(axis=1))
+    np.testing.assert_allclose(results[0]["interference_psd"], expected, rtol=1e-12)
@@ -0,0 +1,100 @@
+"""
+LinkCalculator 标量路径、批量路径和 LinkGraph 的一致性测试
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from ChannelModel_3GPP38901 import pathLoss_3GPP38901, pathLoss_3GPP38901_batch
+from LinkCalculator import LinkCalculator, LinkGraph
+from Scenario import Scenario
+
+SATELLITE_PARAMS = dict(Scenario("星-地下行").compile().input_params,
+                        frequency=20.0, satellite_scan_angle=30.0, satellite_height=550.0, rain_rate=25.0,
+                        interference_psd=-120.0)
+TERRESTRIAL_PARAMS = dict(Scenario("地-地下行").compile().input_params, frequency=3.5, distance=1.2)
+
+SATELLITE_OPTIONS = [
+    {},
+    {"rain_model": "P.618", "latitude": 30.0, "exceedance_percentage": 0.1},
+    {"atmospheric_model": "P.676"},
+    {"scan_roll_off": 1.2},
+    {"beam_pattern": {"type": "S.1528", "max_gain": 40, "half_beamwidth": 1.5}, "beam_scan_angle": 29.0},
+    {"beam_pattern": {"type": "S.1528", "max_gain": 40, "half_beamwidth": 1.5}, "off_axis_angle": 0.8},
+    {"pointing_loss": 0.7},
+    {"interference_psd": -np.inf},
+]
+
+
+def assert_results_close(scalar, batch, index=0):
+    assert set(scalar) == set(batch)
+    for key, value in scalar.items():
+        assert isinstance(value, float), key
+        assert value == pytest.approx(float(np.ravel(batch[key])[index]), rel=1e-12, abs=1e-9), key
+
+
+@pytest.mark.parametrize("geometry_cache_size", [65536, 0])
+@pytest.mark.parametrize("options", SATELLITE_OPTIONS)
+def test_satellite_scalar_matches_batch(options, geometry_cache_size):
+    calculator = LinkCalculator(geometry_cache_size=geometry_cache_size)
+    params = dict(SATELLITE_PARAMS, **options)
+    scalar = calculator.perform_calculations(params, "星-地下行")
+    batch = calculator.perform_calculations_batch(dict(params, satellite_scan_angle=np.array([0.0, 30.0])), "星-地下行")
+    assert_results_close(scalar, batch, index=1)
+    json.dumps(scalar)  # 标量结果是普通字典
+
+
+@pytest.mark.parametrize("scenario", ["农村宏蜂窝RMa", "城市宏蜂窝UMa"])
+@pytest.mark.parametrize("los_condition", ["LoS", "NLoS"])
+@pytest.mark.parametrize("distance", [0.05, 1.2, 4.0])
+def test_terrestrial_scalar_matches_batch(scenario, los_condition, distance):
+    calculator = LinkCalculator()
+    params = dict(TERRESTRIAL_PARAMS, scenario=scenario, los_condition=los_condition, distance=distance)
+    scalar = calculator.perform_calculations(params, "地-地下行")
+    batch = calculator.perform_calculations_batch(dict(params, distance=np.array([distance, 2.0])), "地-地下行")
+    assert_results_close(scalar, batch)
+
+
+@pytest.mark.parametrize("scenario", ["农村宏蜂窝RMa", "城市宏蜂窝UMa"])
+@pytest.mark.parametrize("los_condition", ["LoS", "NLoS"])
+def test_38901_batch_matches_scalar_model(scenario, los_condition):
+    frequency = np.array([0.9, 3.5, 6.0, 28.0])
+    distance = np.array([15.0, 300.0, 1500.0, 4500.0])
+    batch = pathLoss_3GPP38901_batch(frequency[:, None], distance[None, :], scenario, los_condition)
+    for i, f in enumerate(frequency):
+        for j, d in enumerate(distance):
+            assert batch[i, j] == pytest.approx(pathLoss_3GPP38901(f, d, scenario, los_condition), rel=1e-12)
+
+
+@pytest.mark.parametrize("link_type, params", [("星-地下行", dict(SATELLITE_PARAMS, rain_model="P.618")),
+                                               ("地-地下行", TERRESTRIAL_PARAMS)])
+def test_link_graph_matches_perform_calculations(link_type, params):
+    calculator = LinkCalculator()
+    graph = LinkGraph(calculator, link_type)
+    graph.update(params)
+    assert_results_close(graph.results(), calculator.perform_calculations(params, link_type))
+
+
+def test_link_graph_recomputes_only_downstream_nodes():
+    calculator = LinkCalculator()
+    graph = LinkGraph(calculator, "星-地下行")
+    graph.update(SATELLITE_PARAMS)
+    graph.results()
+    before = dict(graph.recompute_counts)
+    graph.set("rain_rate", 60.0)
+    results = graph.results()
+    changed = {name for name, count in graph.recompute_counts.items() if count != before[name]}
+    assert "rain_fade" in changed and "total_loss" in changed and "achievable_rate" in changed
+    assert not changed & {"geometry", "path_loss", "noise_psd", "gt_ratio"}
+    assert_results_close(results, calculator.perform_calculations(dict(SATELLITE_PARAMS, rain_rate=60.0), "星-地下行"))
+
+
+def test_pointing_loss_adds_to_total_loss():
+    calculator = LinkCalculator()
+    options = {"beam_pattern": {"type": "S.1528", "max_gain": 40, "half_beamwidth": 1.5}, "off_axis_angle": 0.8}
+    base = calculator.perform_calculations(dict(SATELLITE_PARAMS, **options), "星-地下行")
+    pointed = calculator.perform_calculations(dict(SATELLITE_PARAMS, pointing_loss=1.5, **options), "星-地下行")
+    assert pointed["total_loss"] - base["total_loss"] == pytest.approx(1.5)
+    assert base["c_to_n"] - pointed["c_to_n"] == pytest.approx(1.5)
@@ -0,0 +1,71 @@
+"""
+蒙特卡洛可用度仿真和流式直方图测试
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from MonteCarlo import MonteCarlo, StreamingHistogram, sample_distribution, wilson_interval
+from Scenario import Scenario
+
+PARAMS = dict(Scenario("星-地下行").compile().input_params, frequency=20.0, rx_antenna_gain=30.0)
+
+
+def test_histogram_quantiles_match_numpy():
+    values = np.random.default_rng(0).normal(5.0, 3.0, 100_000)
+    histogram = StreamingHistogram(-20.0, 30.0, 0.01)
+    for chunk in np.array_split(values, 7):
+        histogram.add(chunk)
+    assert histogram.total == values.size
+    for q in (0.001, 0.1, 0.5, 0.9):
+        assert histogram.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.02)
+
+
+def test_histogram_counts_out_of_range_separately():
+    histogram = StreamingHistogram(0.0, 10.0, 1.0)
+    histogram.add(np.array([-5.0, -np.inf, 0.5, 3.2, 9.9, 10.5, 11.0, 50.0, np.inf, np.nan]))
+    assert (histogram.underflow, histogram.overflow) == (2, 3)
+    assert histogram.counts.sum() == 4 and histogram.total == 9
+    assert histogram.quantile(0.1) == -math.inf
+    assert histogram.quantile(0.5) == 9.0
+    assert histogram.quantile(0.9) == math.inf
+    values, probability = histogram.exceedance()
+    # 尾部保留超出上限的 3/9 概率，不在范围边界处降为 0
+    assert probability[-1] == pytest.approx(3 / 9)
+    assert probability[0] == pytest.approx(6 / 9) and values[0] == 1.0
+    assert math.isnan(StreamingHistogram(0.0, 1.0, 0.1).quantile(0.5))
+
+
+def test_sample_distribution():
+    rng = np.random.default_rng(1)
+    values = sample_distribution({"dist": "normal", "mean": 0.3, "std": 0.1, "min": 0}, rng, 10_000)
+    assert values.min() >= 0 and values.mean() == pytest.approx(0.3, abs=0.01)
+    rain = sample_distribution({"dist": "lognormal", "median": 8, "sigma": 1, "probability": 0.1}, rng, 10_000)
+    assert np.mean(rain > 0) == pytest.approx(0.1, abs=0.01)
+    with pytest.raises(ValueError):
+        sample_distribution({"dist": "gamma"}, rng, 10)
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high
+
+
+def test_monte_carlo_is_reproducible_and_counts_out_of_range():
+    distributions = {"rain_rate": {"dist": "lognormal", "median": 10, "sigma": 1.0, "probability": 0.2},
+                     "pointing_loss": {"dist": "exponential", "scale": 0.5}}
+    results = [MonteCarlo(PARAMS, "星-地下行", distributions, threshold=0.0, seed=7, fade_range=(0.0, 5.0))
+               .run(max_trials=20_000, batch_size=5_000) for _ in range(2)]
+    assert results[0]["availability"] == results[1]["availability"]
+    assert results[0]["percentiles"] == results[1]["percentiles"]
+    underflow, overflow = results[0]["fade_out_of_range"]
+    assert underflow == 0 and overflow > 0
+    _, probability = results[0]["fade_exceedance"]
+    assert probability[-1] == pytest.approx(overflow / 20_000)
+
+
+def test_percentile_outside_metric_range_is_infinite():
+    mc = MonteCarlo(PARAMS, "星-地下行", {"scintillation_loss": {"dist": "uniform", "low": 0, "high": 1}},
+                    seed=1, metric_range=(100.0, 120.0))
+    result = mc.run(max_trials=1_000, batch_size=1_000)
+    assert result["metric_out_of_range"] == (1_000, 0)
+    assert all(value == -math.inf for value in result["percentiles"].values())
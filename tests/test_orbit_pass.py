@@ -0,0 +1,38 @@
+"""
+圆轨道过境仿真测试
+"""
+
+import numpy as np
+
+import OrbitPass
+from LinkCalculator import LinkCalculator
+from OrbitPass import CircularOrbit, GroundTerminal, PassStatistics, simulate_pass
+from Scenario import Scenario
+
+PARAMS = dict(Scenario("星-地下行").compile().input_params)
+
+
+def test_pass_statistics_over_one_day():
+    orbit = CircularOrbit(altitude=550, inclination=53)
+    terminal = GroundTerminal(latitude=30.0, longitude=10.0)
+    stats = PassStatistics(cn_threshold=-100)
+    for chunk in simulate_pass(orbit, terminal, PARAMS, duration=86400, step=10, chunk_size=1000):
+        visible = chunk["elevation"] > 0
+        assert np.isfinite(chunk["c_to_n"][visible]).all() and np.isnan(chunk["c_to_n"][~visible]).all()
+        stats.update(chunk)
+    assert stats.passes
+    for record in stats.passes:
+        assert record["los"] > record["aos"] and 0 < record["max_elevation"] <= 90
+
+
+def test_pass_survives_samples_at_the_horizon(monkeypatch):
+    # 仰角极小的历元换算出的扫描角因舍入等于地平线扫描角，不应中断过境仿真
+    elevation = np.array([-1.0, 1e-12, 1e-9, 1e-7, 30.0])
+    monkeypatch.setattr(OrbitPass, "look_angles",
+                        lambda orbit, terminal, t, earth_radius: (elevation[:len(t)], np.full(len(t), 2000.0)))
+    orbit = CircularOrbit(altitude=550, inclination=53)
+    chunk = next(simulate_pass(orbit, GroundTerminal(0.0, 0.0), PARAMS, duration=4, step=1))
+    calculator = LinkCalculator()
+    assert np.all(chunk["scan_angle"][1:] < calculator.horizon_scan_angle(550))
+    assert np.isnan(chunk["c_to_n"][0]) and np.isfinite(chunk["c_to_n"][1:]).all()
+
@@ -0,0 +1,111 @@
+"""
+ITU-R P.838/P.618 雨衰和 P.676 气体衰减参考值测试
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from GasAbsorption import gaseous_attenuation, line_by_line_attenuation, specific_attenuation as gas_specific_attenuation
+from LinkCalculator import LinkCalculator
+from RainModel import _cached_coefficients, rain_attenuation, rain_coefficients
+from Scenario import Scenario
+
+# P.838-3 表5 的系数 (kH, kV, αH, αV)
+P838_TABLE = {
+    10: (0.01217, 0.01129, 1.2571, 1.2156),
+    20: (0.09164, 0.09611, 1.0568, 0.9847),
+    30: (0.2403, 0.2291, 0.9485, 0.9129),
+}
+
+
+@pytest.mark.parametrize("frequency", sorted(P838_TABLE))
+def test_p838_coefficients_match_table(frequency):
+    np.testing.assert_allclose(_cached_coefficients(frequency), P838_TABLE[frequency], rtol=1e-3)
+
+
+def p618_step_by_step(f, elevation, rain_rate, p, latitude, rain_height, tilt=45.0):
+    """按 P.618-13 §2.2.1.1 步骤逐项手算（单点，仰角 ≥ 5°）"""
+    theta = math.radians(elevation)
+    kh, kv, ah, av = P838_TABLE[f]
+    k = (kh + kv + (kh - kv) * math.cos(theta) ** 2 * math.cos(math.radians(2 * tilt))) / 2
+    alpha = (kh * ah + kv * av + (kh * ah - kv * av) * math.cos(theta) ** 2 * math.cos(math.radians(2 * tilt))) / (2 * k)
+    slant = rain_height / math.sin(theta)
+    horizontal = slant * math.cos(theta)
+    gamma = k * rain_rate ** alpha
+    r001 = 1 / (1 + 0.78 * math.sqrt(horizontal * gamma / f) - 0.38 * (1 - math.exp(-2 * horizontal)))
+    zeta = math.atan(rain_height / (horizontal * r001))
+    rain_length = horizontal * r001 / math.cos(theta) if zeta > theta else slant
+    chi = 36 - abs(latitude) if abs(latitude) < 36 else 0.0
+    v001 = 1 / (1 + math.sqrt(math.sin(theta)) * (31 * (1 - math.exp(-elevation / (1 + chi)))
+                                                  * math.sqrt(rain_length * gamma) / f ** 2 - 0.45))
+    a001 = gamma * rain_length * v001
+    if p >= 1 or abs(latitude) >= 36:
+        beta = 0.0
+    elif elevation >= 25:
+        beta = -0.005 * (abs(latitude) - 36)
+    else:
+        beta = -0.005 * (abs(latitude) - 36) + 1.8 - 4.25 * math.sin(theta)
+    exponent = 0.655 + 0.033 * math.log(p) - 0.045 * math.log(a001) - beta * (1 - p) * math.sin(theta)
+    return a001 * (p / 0.01) ** (-exponent)
+
+
+@pytest.mark.parametrize("f, elevation, rain_rate, p, latitude", [
+    (20, 30.0, 50.0, 0.01, 45.0),
+    (20, 40.0, 30.0, 0.1, 20.0),
+    (30, 15.0, 80.0, 0.5, 10.0),
+    (10, 60.0, 20.0, 1.0, 50.0),
+])
+def test_p618_matches_step_by_step(f, elevation, rain_rate, p, latitude):
+    expected = p618_step_by_step(f, elevation, rain_rate, p, latitude, rain_height=4.36)
+    result = rain_attenuation(f, elevation, rain_rate, exceedance_percentage=p, latitude=latitude, rain_height=4.36)
+    assert float(result) == pytest.approx(expected, rel=2e-3)
+
+
+def test_p618_behaviour():
+    p = np.array([0.001, 0.01, 0.1, 1.0, 5.0])
+    attenuation = rain_attenuation(20, 30, 50, exceedance_percentage=p)
+    assert np.all(np.diff(attenuation) < 0)
+    assert rain_attenuation(20, 30, 0) == 0
+    with pytest.raises(ValueError):
+        rain_attenuation(20, 30, 50, exceedance_percentage=10)
+    # 低仰角斜路径长度考虑地球曲率，不会随 1/sinθ 发散
+    assert np.isfinite(rain_attenuation(20, 1.0, 50))
+
+
+def test_rain_coefficients_polarization():
+    kh, kv, ah, av = P838_TABLE[20]
+    np.testing.assert_allclose(rain_coefficients(20, polarization_tilt=0.0, elevation=0.0), (kh, ah), rtol=1e-3)
+    np.testing.assert_allclose(rain_coefficients(20, polarization_tilt=90.0, elevation=0.0), (kv, av), rtol=1e-3)
+
+
+def test_p676_specific_attenuation_reference_values():
+    # 标准大气（1013.25 hPa、15℃、7.5 g/m³）：60 GHz 氧气吸收峰约 14.5 dB/km，22.235 GHz 水汽线约 0.18 dB/km
+    oxygen, _ = line_by_line_attenuation(60.0)
+    _, water = line_by_line_attenuation(22.235)
+    assert 13.5 < oxygen < 15.5
+    assert water == pytest.approx(0.18, rel=0.05)
+    # 表格插值与逐线计算一致
+    np.testing.assert_allclose(gas_specific_attenuation(np.array([22.235, 60.0])),
+                               line_by_line_attenuation(np.array([22.235, 60.0])), rtol=1e-3)
+
+
+def test_p676_slant_path_cosecant_law():
+    frequency = np.array([12.0, 20.0, 30.0])
+    np.testing.assert_allclose(gaseous_attenuation(frequency, 30.0), 2 * gaseous_attenuation(frequency, 90.0))
+    # 低仰角分支有限且随仰角减小而增大
+    low = gaseous_attenuation(20.0, np.array([1.0, 3.0, 4.999]))
+    assert np.all(np.isfinite(low)) and np.all(np.diff(low) < 0)
+
+
+def test_detailed_calculation_shows_p618_rain_step():
+    params = dict(Scenario("星-地上行").compile().input_params, frequency=20.0, satellite_scan_angle=30.0,
+                  satellite_height=550.0, rain_rate=50.0, rain_model="P.618", latitude=45.0)
+    calculator = LinkCalculator()
+    steps = calculator.detailed_calculation(params)
+    rain_step = next(step for step in steps if step["步骤"] == "雨衰")
+    assert "P.618" in rain_step["公式"]
+    results = calculator.perform_calculations(params, "星-地上行")
+    expected = rain_attenuation(20.0, results["terminal_elevation_angle"], 50.0, latitude=45.0)
+    assert rain_step["结果"] == f"{float(expected):.2f}dB"
@@ -0,0 +1,47 @@
+"""
+RainClimatology 双线性插值测试
+夹具 data/rain_climatology_grid.npz：纬度 -90..90、经度 0..330（步长30°，经度首尾相接），
+降雨率为线性场 2 + 0.1*纬度 + 0.05*经度
+"""
+
+import os
+
+import numpy as np
+
+from RainClimatology import RainClimatology
+
+GRID_PATH = os.path.join(os.path.dirname(__file__), "data", "rain_climatology_grid.npz")
+
+
+def linear_field(latitude, longitude):
+    return 2 + 0.1 * np.asarray(latitude) + 0.05 * np.asarray(longitude)
+
+
+def test_lookup_matches_linear_field():
+    climatology = RainClimatology.load(GRID_PATH)
+    assert climatology.wraps
+    latitude = np.array([-90.0, -47.5, 0.0, 12.3, 59.9, 90.0])
+    longitude = np.array([0.0, 17.0, 145.5, 299.0, 330.0, 222.2])
+    np.testing.assert_allclose(climatology.lookup(latitude, longitude), linear_field(latitude, longitude))
+    assert isinstance(climatology.lookup(12.3, 17.0), float)
+    np.testing.assert_allclose(climatology.lookup(12.3, 17.0), linear_field(12.3, 17.0))
+
+
+def test_lookup_wraps_longitude():
+    climatology = RainClimatology.load(GRID_PATH)
+    # 等价经度得到相同结果
+    np.testing.assert_allclose(climatology.lookup(20.0, -60.0), climatology.lookup(20.0, 300.0))
+    np.testing.assert_allclose(climatology.lookup(20.0, 400.0), climatology.lookup(20.0, 40.0))
+    # 330° 与 360°(=0°) 之间在最后一列和第一列之间线性插值
+    latitude = 20.0
+    for longitude, weight in [(345.0, 0.5), (-15.0, 0.5), (337.5, 0.25)]:
+        expected = (1 - weight) * linear_field(latitude, 330.0) + weight * linear_field(latitude, 0.0)
+        np.testing.assert_allclose(climatology.lookup(latitude, longitude), expected)
+
+
+def test_lookup_non_finite_coordinates():
+    climatology = RainClimatology.load(GRID_PATH)
+    result = climatology.lookup([np.nan, 10.0, 10.0, 10.0], [10.0, np.nan, np.inf, 10.0])
+    assert np.isnan(result[:3]).all()
+    np.testing.assert_allclose(result[3], linear_field(10.0, 10.0))
+    assert np.isnan(climatology.lookup(np.nan, 0.0))
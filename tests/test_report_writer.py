@@ -0,0 +1,48 @@
+"""
+流式 Excel 报告测试
+"""
+
+import numpy as np
+import pytest
+
+from LinkCalculator import LinkCalculator
+from Scenario import Scenario
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from ReportWriter import StreamingReportWriter  # noqa: E402
+
+INPUT_PARAMS = ["frequency", "satellite_scan_angle", "interference_psd"]
+
+
+def read_rows(path):
+    return list(openpyxl.load_workbook(path).active.iter_rows(values_only=True))
+
+
+def test_write_scenario_converts_inputs_and_results(tmp_path):
+    params = dict(Scenario("星-地下行").compile().input_params)
+    results = LinkCalculator().perform_calculations(params, "星-地下行")
+    path = str(tmp_path / "report.xlsx")
+    with StreamingReportWriter(path, INPUT_PARAMS, "星-地下行") as writer:
+        writer.write_scenario({"frequency": np.float64(1.81), "satellite_scan_angle": np.int64(30),
+                               "interference_psd": -np.inf}, results)
+        writer.write_scenario({"frequency": float("nan"), "satellite_scan_angle": None}, results)
+    rows = read_rows(path)
+    assert rows[3][:4] == (1, 1.81, 30, "-inf")
+    assert rows[4][:4] == (2, "nan", None, None)
+    assert isinstance(rows[3][1], float) and rows[3][4] is not None
+
+
+def test_write_batch_matches_write_scenario(tmp_path):
+    params = dict(Scenario("星-地下行").compile().input_params)
+    scan_angle = np.array([0.0, 20.0, 40.0])
+    results = LinkCalculator().perform_calculations_batch(dict(params, satellite_scan_angle=scan_angle), "星-地下行")
+    inputs = {"frequency": params["frequency"], "satellite_scan_angle": scan_angle, "interference_psd": -np.inf}
+    batch_path, scenario_path = str(tmp_path / "batch.xlsx"), str(tmp_path / "scenario.xlsx")
+    with StreamingReportWriter(batch_path, INPUT_PARAMS, "星-地下行") as writer:
+        writer.write_batch(inputs, results)
+    with StreamingReportWriter(scenario_path, INPUT_PARAMS, "星-地下行") as writer:
+        for i in range(len(scan_angle)):
+            writer.write_scenario({key: np.broadcast_to(value, scan_angle.shape)[i] for key, value in inputs.items()},
+                                  {key: value[i] for key, value in results.items()})
+    assert read_rows(batch_path) == read_rows(scenario_path)
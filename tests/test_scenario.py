@@ -0,0 +1,103 @@
+"""
+场景文件读写、编译和场景库测试
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from LinkCalculator import LinkCalculator
+from Scenario import Scenario, ScenarioLibrary
+
+SATELLITE_SCENARIO = {
+    "version": 1,
+    "name": "LEO 下行 Ka",
+    "link_type": "星-地下行",
+    "params": {"frequency": 20, "bandwidth": 100, "卫星扫描角": 30, "satellite_height": "500+50"},
+    "flags": {"rain_rate": True},
+    "options": {"rain_model": "P.618", "latitude": 30.0, "atmospheric_model": "P.676"},
+}
+TERRESTRIAL_SCENARIO = {
+    "version": 1,
+    "name": "RMa 上行",
+    "link_type": "地-地上行",
+    "params": {"distance": 0.8},
+    "scenario": "农村宏蜂窝RMa",
+    "los_condition": "NLoS",
+}
+
+
+@pytest.mark.parametrize("data", [SATELLITE_SCENARIO, TERRESTRIAL_SCENARIO])
+def test_save_load_round_trip(tmp_path, data):
+    scenario = Scenario.from_dict(data)
+    path = tmp_path / "scenario.json"
+    scenario.save(str(path))
+    loaded = Scenario.load(str(path))
+    assert loaded.to_dict() == scenario.to_dict()
+    assert loaded.compile().input_params == scenario.compile().input_params
+    assert loaded.to_dict() == Scenario.from_dict(json.loads(path.read_text(encoding="utf-8"))).to_dict()
+
+
+def test_compile_and_run():
+    compiled = Scenario.from_dict(SATELLITE_SCENARIO).compile()
+    params = compiled.input_params
+    assert params["satellite_height"] == 550
+    assert params["satellite_scan_angle"] == 30
+    assert params["rain_model"] == "P.618" and params["latitude"] == 30.0
+    with pytest.raises(TypeError):
+        params["frequency"] = 1
+
+    results = compiled.run()
+    assert results == LinkCalculator().perform_calculations(dict(params), compiled.link_type)
+    batch = compiled.run_batch({"satellite_scan_angle": np.array([0.0, 30.0])})
+    assert batch["c_to_n"][1] == pytest.approx(results["c_to_n"], rel=1e-12)
+
+
+def test_terrestrial_defaults():
+    params = Scenario("地-地下行").compile().input_params
+    assert params["scenario"] == "城市宏蜂窝UMa" and params["los_condition"] == "LoS"
+    compiled = Scenario.from_dict(TERRESTRIAL_SCENARIO).compile()
+    assert compiled.input_params["scenario"] == "农村宏蜂窝RMa"
+    assert compiled.input_params["los_condition"] == "NLoS"
+
+
+@pytest.mark.parametrize("change", [
+    {"version": None},
+    {"version": 99},
+    {"link_type": "星-星"},
+    {"params": {"no_such_param": 1}},
+    {"params": {"frequency": True}},
+    {"flags": {"rain_rate": "yes"}},
+    {"options": {"rain_model": "P.999"}},
+    {"options": {"latitude": "north"}},
+    {"scenario": "城市宏蜂窝UMa"},
+    {"unknown_field": 1},
+])
+def test_invalid_scenarios_raise(change):
+    with pytest.raises(ValueError):
+        Scenario.from_dict(dict(SATELLITE_SCENARIO, **change))
+
+
+def test_invalid_formula_raises_on_compile():
+    scenario = Scenario.from_dict(dict(SATELLITE_SCENARIO, params={"frequency": "20+"}))
+    with pytest.raises(ValueError):
+        scenario.compile()
+    with pytest.raises(ValueError):
+        scenario.save("scenario.toml")
+
+
+def test_library_loads_lazily_and_caches(tmp_path):
+    for name, data in [("ka_down", SATELLITE_SCENARIO), ("rma_up", TERRESTRIAL_SCENARIO)]:
+        Scenario.from_dict(data).save(str(tmp_path / f"{name}.json"))
+    (tmp_path / "notes.txt").write_text("不是场景文件", encoding="utf-8")
+
+    library = ScenarioLibrary(str(tmp_path), cache_size=1)
+    assert list(library) == ["ka_down", "rma_up"] and "notes" not in library
+    first = library["ka_down"]
+    assert library["ka_down"] is first
+    library["rma_up"]
+    assert library["ka_down"] is not first
+    assert dict(library["ka_down"].input_params) == dict(first.input_params)
+    with pytest.raises(KeyError):
+        library["missing"]
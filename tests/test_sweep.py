@@ -0,0 +1,67 @@
+"""
+参数扫描（LinkCalculator.run_sweep / SweepExecutor）测试
+"""
+
+import glob
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from LinkCalculator import LinkCalculator
+from Scenario import Scenario
+from SweepExecutor import SweepExecutor, result_keys
+
+BASE_PARAMS = dict(Scenario("星-地下行").compile().input_params, rain_rate=20.0)
+
+
+def temp_result_files():
+    return set(glob.glob(os.path.join(tempfile.gettempdir(), "sweep_*.dat")))
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 7), (2, 11), (2, 100000)])
+def test_sweep_matches_batch_on_meshgrid(workers, chunk_size):
+    scan_angle = np.linspace(0.0, 50.0, 6)
+    frequency = np.array([2.0, 12.0, 20.0, 30.0])
+    before = temp_result_files()
+    calculator = LinkCalculator()
+    # 扫描轴按网格字典中的键顺序排列
+    fixed = {key: value for key, value in BASE_PARAMS.items() if key not in ("satellite_scan_angle", "frequency")}
+    results = calculator.run_sweep(dict(satellite_scan_angle=scan_angle, frequency=frequency, **fixed),
+                                   "星-地下行", workers=workers, chunk_size=chunk_size)
+    assert temp_result_files() <= before
+
+    grid_scan, grid_frequency = np.meshgrid(scan_angle, frequency, indexing="ij")
+    expected = calculator.perform_calculations_batch(
+        dict(BASE_PARAMS, satellite_scan_angle=grid_scan, frequency=grid_frequency), "星-地下行")
+    assert set(results) == set(result_keys("星-地下行"))
+    for key, value in results.items():
+        assert value.shape == (6, 4)
+        np.testing.assert_allclose(value, expected[key], rtol=1e-12, err_msg=key)
+
+
+def test_sweep_all_scalar_grid():
+    calculator = LinkCalculator()
+    results = calculator.run_sweep(BASE_PARAMS, "星-地下行", workers=1)
+    expected = calculator.perform_calculations(BASE_PARAMS, "星-地下行")
+    for key, value in results.items():
+        assert value.shape == ()
+        assert float(value) == pytest.approx(expected[key], rel=1e-12)
+
+
+def test_sweep_result_path_and_cleanup(tmp_path):
+    grid = dict(Scenario("地-地下行").compile().input_params, distance=np.array([0.1, 0.5, 2.0]))
+    result_path = tmp_path / "sweep.dat"
+    results = LinkCalculator().run_sweep(grid, "地-地下行", workers=1, result_path=str(result_path))
+    assert isinstance(results["c_to_n"], np.memmap) and result_path.exists()
+    np.testing.assert_allclose(results["distance"], [0.1, 0.5, 2.0])
+
+    before = temp_result_files()
+    executor = SweepExecutor(workers=1)
+    executor.run(grid, "地-地下行")
+    assert len(temp_result_files() - before) == 1
+    executor.close()
+    assert temp_result_files() <= before
+    with pytest.raises(ValueError):
+        SweepExecutor(chunk_size=0)
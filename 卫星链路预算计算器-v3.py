@@ -5,7 +5,7 @@
 1. 支持输入链路预算参数，包括频率、距离、高度、极化方式等。
 2. 计算链路预算结果，包括信号强度、噪声功率、信噪比、链路长度等。
 3. 支持导出链路预算结果到Excel文件。
-依赖库 pip install customtkinter openpyxl
+依赖库 pip install customtkinter openpyxl numpy
 打包命令：pyinstaller --onefile --windowed  --hidden-import customtkinter  --hidden-import openpyxl --collect-all customtkinter  D:\GitHub\SatelliteLinkBudget\SatelliteLinkBudget-v3.py
 
 ######################
@@ -37,15 +37,16 @@ pyinstaller --onefile --windowed  --hidden-import customtkinter  --hidden-import
 
 import tkinter as tk
 import customtkinter as ctk
-from openpyxl import Workbook
-from openpyxl.styles import Font, Border, Side, Alignment  # Add this import
 from tkinter import filedialog, messagebox
 from datetime import datetime
-import math
-from LinkCalculator import LinkCalculator, UnitConverter
+import os
+from LinkCalculator import LinkCalculator, LinkGraph, UnitConverter
 from SafeMath import safe_eval, format_result
 from IOHandler import InputHandler, ResultDisplay
-from parameters import PARAM_MAPPING, PARAM_GROUPS, RESULT_CATEGORIES
+from ReportWriter import write_report
+from LiveWorker import LiveWorker
+from Scenario import Scenario, link_params, default_value, assemble_input_params
+from parameters import PARAM_MAPPING
 
 
 ctk.set_appearance_mode("System")  # 跟随系统主题
@@ -60,6 +61,9 @@ GROUP_TITLE_COLOR = "#165DFF"
 STATUS_BAR_FONT = ("微软雅黑", 10)
 STATUS_BAR_BG_COLOR = "#f0f0f0"
 STATUS_BAR_TEXT_COLOR = "#333"
+# 实时计算：输入停止变化后的等待时间、结果轮询间隔（约60帧/秒）
+LIVE_DEBOUNCE_MS = 300
+LIVE_POLL_MS = 16
 
 class SatelliteLinkBudgetCalculator:
     def __init__(self, root):
@@ -67,6 +71,13 @@ class SatelliteLinkBudgetCalculator:
         self.root.title("卫星链路预算计算器")
         self.root.geometry("1024x768")  # 设置默认窗口尺寸
         self.gt_label = None  # 用于显示G/T值的标签
+        # 实时计算状态：后台线程、线程内使用的依赖图、防抖/轮询定时器
+        self.live_worker = None
+        self._live_graphs = {}
+        self._live_after_id = None
+        self._live_poll_id = None
+        # 加载场景带入的模型选项（rain_model、beam_pattern 等），界面上没有对应输入框，计算时原样并入输入参数
+        self.scenario_options = {}
         self._init_ui()
         
 
@@ -141,6 +152,8 @@ class SatelliteLinkBudgetCalculator:
             ("输出计算报告", self.generate_report, "#36B37E", 120),
             ("详细计算公式", self.show_detailed_calculation, "#36B37E", 120),  # 新增按钮
             ("单位转换器", self.show_unit_converter, "#FFA500", 120),  # 新增按钮
+            ("保存场景", self.save_scenario, "#6B7280", 100),
+            ("加载场景", self.load_scenario, "#6B7280", 100),
         ]
         for text, command, color, width in buttons:
             button = ctk.CTkButton(
@@ -160,6 +173,12 @@ class SatelliteLinkBudgetCalculator:
         )
         self.theme_switch.pack(side=tk.LEFT, padx=10)
 
+        self.live_switch = ctk.CTkSwitch(
+            self.right_button_frame, text="实时计算", command=self.toggle_live_mode,
+            font=STATUS_BAR_FONT
+        )
+        self.live_switch.pack(side=tk.LEFT, padx=10)
+
     def _create_content_frames(self):
         """创建内容框架"""
         self.content_frame = ctk.CTkFrame(self.main_frame)
@@ -186,6 +205,7 @@ class SatelliteLinkBudgetCalculator:
     def change_link_type(self, link_type):
         """切换链路类型时更新输入处理器"""
         self._clear_input_frame()
+        self.scenario_options = {}
         params = self._setup_link_defaults(link_type)
         
         # 创建新的输入处理器时传递当前链路类型
@@ -197,6 +217,11 @@ class SatelliteLinkBudgetCalculator:
         
         self._setup_input_handler(params)
         self._setup_gt_display(link_type)
+        # 每种链路类型对应一张依赖图，参数变化时只重算下游节点
+        self.link_graph = LinkGraph(LinkCalculator(), link_type)
+        if self.live_switch.get():
+            self.input_handler.on_change = self._on_param_change
+            self._on_param_change(None)
 
     def _clear_input_frame(self):
         """清除输入框"""
@@ -205,27 +230,7 @@ class SatelliteLinkBudgetCalculator:
 
     def _setup_link_defaults(self, link_type):
         """从PARAM_GROUPS智能组合链路参数"""
-        config = PARAM_GROUPS[link_type]
-        base_config = PARAM_GROUPS[config["base"]]
-        
-        def get_param(param):
-            value = PARAM_MAPPING[param]["default_value"]
-            return value.get(link_type, value) if isinstance(value, dict) else value
-
-        # 合并基础参数
-        merged_params = {
-            param: get_param(param)
-            for group in ["common", "optional", "beam_params", "interference_params"]
-            for param in base_config[group]
-        }
-        
-        # 添加收发端参数
-        merged_params.update({
-            param: get_param(param)
-            for param in config["tx_params"] + config["rx_params"]
-        })
-        
-        return merged_params
+        return {param: default_value(param, link_type) for param in link_params(link_type)}
 
     def _setup_input_handler(self, params):
         """设置输入处理器"""
@@ -237,55 +242,33 @@ class SatelliteLinkBudgetCalculator:
         self.input_handler.create_input_form(self.input_frame)
 
 
-    def _get_input_params(self):
-        """获取输入参数（完整版）"""
+    def _get_input_params(self, live=False):
+        """获取输入参数（完整版）
+        live=True 时用于实时计算：只读取输入框当前内容，不触发失焦格式化、不弹窗，无效输入抛出 ValueError
+        """
         # 主要作用：
         # ① 收集用户实际输入的数值
         # ② 处理参数间的依赖关系
         # ③ 返回用于链路计算的有效参数集合
-        self.input_handler.trigger_all_focus_out()
+        if live:
+            get_value = self.input_handler.peek_numeric_value
+        else:
+            self.input_handler.trigger_all_focus_out()
+            get_value = self.input_handler.get_numeric_value
         link_type = self.link_type_var.get()
-        
-        # 获取参数配置
-        config = PARAM_GROUPS[link_type]
-        base_config = PARAM_GROUPS[config["base"]]
-        
-        # 合并参数组
-        all_params = {
-            "common": base_config["common"],
-            "optional": base_config["optional"],
-            "beam_params": base_config["beam_params"],
-            "interference_params": base_config["interference_params"],
-            "tx": config["tx_params"],
-            "rx": config["rx_params"]
-        }
-        # 基础参数
-        input_params = {
-            param: self.input_handler.get_numeric_value(param) 
-            for param in all_params["common"]
-        }
-        # 可选参数
-        for param in all_params["optional"]+all_params["beam_params"]:
-            input_params[param] = self.input_handler.get_numeric_value(param) if self.input_handler.flags[param].get() else 0
-
-        # 干扰参数特殊处理
-        input_params["interference_psd"] =   self.input_handler.get_numeric_value("interference_psd") if self.input_handler.flags["interference_psd"].get() else -math.inf  # 新增干扰参数
-
-        # 发射端参数
-        tx_param = all_params["tx"][0]
-        input_params["tx_eirp"] = self.input_handler.get_numeric_value(tx_param)
+        flags = self.input_handler.flags
 
-        # 接收端参数
-        rx_ant, rx_nf, rx_nt = all_params["rx"]
-        input_params.update({
-            "rx_antenna_gain": self.input_handler.get_numeric_value(rx_ant),
-            "rx_noise_figure": self.input_handler.get_numeric_value(rx_nf),
-            "rx_noise_temp": self.input_handler.get_numeric_value(rx_nt)
-        })
+        # 与场景文件、批量计算共用同一组装规则
+        input_params = assemble_input_params(
+            link_type,
+            lambda param, link_param=None: get_value(link_param or param),
+            lambda param, disabled_value: get_value(param) if flags[param].get() else disabled_value,
+        )
 
         if link_type in ["地-地上行", "地-地下行"]:
             # 合并进地面信道状态信息 
             input_params.update(self.input_handler.get_terrestrial_link_parameters()) 
+        input_params.update(self.scenario_options)
 
         return input_params
 
@@ -294,14 +277,9 @@ class SatelliteLinkBudgetCalculator:
             self.status_var.set("正在计算...")
             input_params = self._get_input_params()
 
-            calculator = LinkCalculator()
-            link_type = self.link_type_var.get()
-            # 执行计算
-            self.results_temp = calculator.perform_calculations(input_params, link_type)  # 将结果保存为类属性
-
-            # 更新G/T值显示
-            if self.gt_label and "gt_ratio" in self.results_temp:
-                self.gt_label.configure(text=format_result(self.results_temp["gt_ratio"]))
+            # 执行计算（依赖图增量计算，未变化的环节沿用缓存值）
+            self.link_graph.update(input_params)
+            self._show_results(self.link_graph.results())
             """
             if self.link_type_var.get() == "星-地上行": # 星-地上行链路
                 results["链路性能"].append(("卫星G/T值", self.results_temp["gt_ratio"], "dB/K"))
@@ -310,14 +288,81 @@ class SatelliteLinkBudgetCalculator:
             elif self.link_type_var.get() =="地-地上行": # 地-地上行链路
                 results["链路性能"].append(("基站G/T值", self.results_temp["gt_ratio"], "dB/K"))
             """
-            self.result_display.update_results(self.results_temp, self.link_type_var.get())
             self.status_var.set("计算完成")
         except Exception as e:
             messagebox.showerror("计算错误", f"计算过程中出现错误: {str(e)}")
             self.status_var.set("计算失败，请检查输入")
 
+    def _show_results(self, results):
+        """显示计算结果并保存为类属性（报告生成使用）"""
+        self.results_temp = results
+
+        # 更新G/T值显示
+        if self.gt_label and "gt_ratio" in self.results_temp:
+            self.gt_label.configure(text=format_result(self.results_temp["gt_ratio"]))
+        self.result_display.update_results(self.results_temp, self.link_type_var.get())
+
+    def toggle_live_mode(self):
+        """开关实时计算：输入变化经防抖后提交后台线程计算，结果由主线程定时轮询显示"""
+        if self.live_switch.get():
+            if self.live_worker is None:
+                self.live_worker = LiveWorker(self._live_compute)
+            self.input_handler.on_change = self._on_param_change
+            self._on_param_change(None)
+            self._poll_live_results()
+        else:
+            self.input_handler.on_change = None
+            for after_id in (self._live_after_id, self._live_poll_id):
+                if after_id is not None:
+                    self.root.after_cancel(after_id)
+            self._live_after_id = self._live_poll_id = None
+            self.live_worker.cancel()
+            self.status_var.set("实时计算已关闭")
+
+    def _on_param_change(self, param):
+        """输入变化回调：重新开始防抖计时"""
+        if self._live_after_id is not None:
+            self.root.after_cancel(self._live_after_id)
+        self._live_after_id = self.root.after(LIVE_DEBOUNCE_MS, self._submit_live_calculation)
+
+    def _submit_live_calculation(self):
+        """在主线程收集参数（不修改输入框），提交后台计算"""
+        self._live_after_id = None
+        try:
+            input_params = self._get_input_params(live=True)
+        except ValueError as e:
+            self.live_worker.cancel()
+            self.status_var.set(f"实时计算等待有效输入：{e}")
+            return
+        self.live_worker.submit((self.link_type_var.get(), input_params))
+        self.status_var.set("正在计算...")
+
+    def _live_compute(self, payload):
+        """后台线程中执行：每种链路类型一张线程内独享的依赖图"""
+        link_type, input_params = payload
+        graph = self._live_graphs.get(link_type)
+        if graph is None:
+            graph = self._live_graphs[link_type] = LinkGraph(LinkCalculator(), link_type)
+        graph.update(input_params)
+        return link_type, graph.results()
+
+    def _poll_live_results(self):
+        """主线程定时取回后台结果，过期结果已由 LiveWorker 丢弃"""
+        finished = self.live_worker.poll()
+        if finished is not None:
+            _, result, error = finished
+            if error is not None:
+                self.status_var.set(f"计算失败，请检查输入：{error}")
+            elif result[0] == self.link_type_var.get():
+                self._show_results(result[1])
+                self.status_var.set("计算完成（实时）")
+        self._live_poll_id = self.root.after(LIVE_POLL_MS, self._poll_live_results)
+
     def reset(self):
+        if self.live_worker is not None:
+            self.live_worker.cancel()
         self.input_handler.reset_params()
+        self.scenario_options = {}
         # 清空G/T值显示
         if hasattr(self, 'gt_label') and self.gt_label:
             self.gt_label.configure(text="0.00")
@@ -327,6 +372,40 @@ class SatelliteLinkBudgetCalculator:
         self.result_frame.update_idletasks()
         self.status_var.set("所有参数和结果已重置")
 
+    def save_scenario(self):
+        """把当前链路类型、参数（保留公式）、勾选状态和地面场景选择保存为场景文件"""
+        try:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("场景文件", "*.json")],
+                initialfile=f"{self.link_type_var.get()}_场景.json"
+            )
+            if not file_path:
+                return
+            self.input_handler.trigger_all_focus_out()
+            name = os.path.splitext(os.path.basename(file_path))[0]
+            self.input_handler.to_scenario(self.scenario_options, name).save(file_path)
+            self.status_var.set(f"场景已保存: {file_path}")
+        except ValueError as e:
+            messagebox.showerror("错误", f"保存场景失败: {e}")
+
+    def load_scenario(self):
+        """加载场景文件：切换到场景的链路类型并填入参数、勾选状态、地面场景选择和模型选项"""
+        file_path = filedialog.askopenfilename(filetypes=[("场景文件", "*.json *.toml")])
+        if not file_path:
+            return
+        try:
+            scenario = Scenario.load(file_path)
+        except (OSError, ValueError, RuntimeError) as e:
+            messagebox.showerror("错误", f"加载场景失败: {e}")
+            return
+        if scenario.link_type != self.link_type_var.get():
+            self.link_type_var.set(scenario.link_type)
+            self.change_link_type(scenario.link_type)
+        self.scenario_options = dict(scenario.options)
+        self.input_handler.apply_scenario(scenario)
+        self.status_var.set(f"已加载场景: {scenario.name or file_path}")
+
     def generate_report(self):
         try:
             # 获取当前时间作为文件名的一部分
@@ -340,44 +419,9 @@ class SatelliteLinkBudgetCalculator:
             if not file_path:  # 如果用户取消选择，直接返回
                 return
 
-            # 创建一个新的 Excel 工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "仿真报告"
-
-            # 设置表格样式
-            header_font = Font(name='微软雅黑', size=12, bold=True)
-            data_font = Font(name='微软雅黑', size=11)
-            border = Border(left=Side(style='thin'), 
-                         right=Side(style='thin'), 
-                         top=Side(style='thin'), 
-                         bottom=Side(style='thin'))
-            alignment = Alignment(horizontal='center', vertical='center')
-
-            # 定义参数标签 (英文参数名 -> 中文名称)
-            param_labels = {
-                param: (PARAM_MAPPING[param]["ch_name"], PARAM_MAPPING[param]["unit"])
-                for param in PARAM_MAPPING
-            }
-
-            # 写入报告标题
-            ws.merge_cells('A1:C1')
-            title_cell = ws['A1']
-            title_cell.value = "卫星链路预算仿真报告"
-            title_cell.font = Font(name='微软雅黑', size=14, bold=True)
-            title_cell.alignment = alignment
-            title_cell.border = border
-
-            ws.append([])  # 空行
-
-            # 写入输入参数
-            ws.append(["输入参数", "单位", "值"])
-            ws['A'+str(ws.max_row)].font = header_font
-            ws['B'+str(ws.max_row)].font = header_font
-            ws['C'+str(ws.max_row)].font = header_font
-
-            # 写入输入参数并应用样式
-            for param, (label, unit) in param_labels.items():
+            # 收集输入参数（中文名, 单位, 值）
+            input_rows = []
+            for param in PARAM_MAPPING:
                 if param in self.input_handler.params:
                     flag_key = {
                         "atmospheric_loss": "atmospheric_loss",
@@ -395,50 +439,12 @@ class SatelliteLinkBudgetCalculator:
                         value = self.input_handler.params[param].get()
                         try:
                             numeric_value = float(safe_eval(value)) if value else 0
-                            ws.append([label, unit, numeric_value])
                         except:
-                            ws.append([label, unit, 0])
-
-            # 设置列宽
-            ws.column_dimensions['A'].width = 30
-            ws.column_dimensions['B'].width = 15
-            ws.column_dimensions['C'].width = 20
-
-            # 写入计算结果
-            if hasattr(self, "results_temp"):
-                ws.append([])  # 空行
-                ws.append(["计算结果", "单位", "值"])
-                ws['A'+str(ws.max_row)].font = header_font
-                ws['B'+str(ws.max_row)].font = header_font
-                ws['C'+str(ws.max_row)].font = header_font
-
-                """
-                # 根据链路类型添加G/T值
-                if self.link_type_var.get() == "星-地上行":
-                    result_items.append(("卫星G/T值", "dB/K"))
-                elif self.link_type_var.get() == "星-地下行" or self.link_type_var.get() == "地-地下行":
-                    result_items.append(("终端G/T值", "dB/K"))
-                else:  # 地对地场景
-                    result_items.append(("基站G/T值", "dB/K"))
-                """
-                # 根据链路类型选择结果分类
-                link_category = "卫星链路" if "星" in self.link_type_var.get() else "地面链路"
-                for category in RESULT_CATEGORIES[link_category].values():
-                    for item in category:
-                        key = item["key"]
-                        ws.append([
-                            item["label"],
-                            item["unit"],
-                            self.results_temp.get(key, 0)
-                        ])            
-
-            # 应用边框样式到所有单元格
-            for row in ws.iter_rows():
-                for cell in row:
-                    cell.border = border
-
-            # 保存 Excel 文件
-            wb.save(file_path)
+                            numeric_value = 0
+                        input_rows.append((PARAM_MAPPING[param]["ch_name"], PARAM_MAPPING[param]["unit"], numeric_value))
+
+            # 写入Excel报告（含计算结果）
+            write_report(file_path, input_rows, getattr(self, "results_temp", None), self.link_type_var.get())
             messagebox.showinfo("报告生成成功", f"仿真报告已保存至:\n{file_path}")
         except Exception as e:
             messagebox.showerror("报告生成失败", f"生成仿真报告时出错:\n{str(e)}")